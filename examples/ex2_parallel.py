@@ -6,14 +6,16 @@ Authors: Soesja Brunink & Gijs G. Hendrickx
 from examples._example_plot import create_figure
 from src.processing import map_ecotopes
 
-# TODO: for parallel computations, the `map_ecotopes()`-function must be called within the `if __name__ == '__main__'`-
-#  statement for the `multiprocessing`-package to work properly.
+# for parallel computations with processes (`executor='processes'`, default) or `dask` (`executor='dask'`), the
+# `map_ecotopes()`-function must be called within the `if __name__ == '__main__'`-statement to work properly; this is
+# not required when using threads (`executor='threads'`).
 if __name__ == '__main__':
     # map ecotopes based on hydrodynamic output data: 'file-name-0_map.nc', 'file-name-1_map.nc'
     results = map_ecotopes(
         'file-name-0_map.nc', 'file-name-1_map.nc',
         wd='directory/to/output/files',
-        n_cores=2
+        n_cores=2,
+        executor='processes',
     )
 
     # plot spatial distribution of ecotopes, i.e., an ecotope-map
@@ -36,14 +36,16 @@ setup(
     install_requires=[
         'netCDF4',
         'numpy',
-        'shapely',
+        'shapely>=2.0',
         'typer',
         'xarray',
     ],
     extras_require={
         'examples': ['matplotlib'],
-        'develop': ['matplotlib', 'pytest', 'pytest-cov', 'pylint'],
-        'testing': ['pytest', 'pytest-cov', 'pylint'],
+        'tolerance': ['scipy'],
+        'dask': ['dask[distributed]'],
+        'develop': ['matplotlib', 'pytest', 'pytest-cov', 'pylint', 'scipy'],
+        'testing': ['pytest', 'pytest-cov', 'pylint', 'scipy'],
     },
     entry_points={
         'console_scripts': [
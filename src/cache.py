@@ -0,0 +1,231 @@
+"""
+On-disk cache of pre-processed output data of hydrodynamic model.
+
+Author: Gijs G. Hendrickx
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import typing
+import zipfile
+
+import numpy as np
+import shapely
+
+from src import (
+    _globals as glob,
+    preprocessing as pre
+)
+
+_LOG = logging.getLogger(__name__)
+
+
+class StatisticsCache:
+    """On-disk cache of pre-processed map-data (see `src.preprocessing.process_map_data()`), such that repeated runs on
+    the same map-file (e.g., with modified ecotope-thresholds) do not have to read and process the map-file again. Every
+    entry is stored as a `*.npz`-file, named after a key that combines the map-file (path, size, and modification time),
+    the map-configuration, and the settings of the pre-processing (see `.key()`).
+
+    The cache is limited in size (`max_size`) and/or age of its entries (`max_age`): the entries that are used least
+    recently are removed first.
+    """
+    _SUFFIX = '.npz'
+    _MASK = '__mask'
+
+    def __init__(self, directory: str, max_size: typing.Union[int, str] = None, max_age: float = None) -> None:
+        """
+        :param directory: directory of the cache
+        :param max_size: maximum size of the cache, e.g., '1GB', defaults to None
+        :param max_age: maximum age of the cache entries since their last use [days], defaults to None
+
+        :type directory: str
+        :type max_size: int, str, optional
+        :type max_age: float, optional
+        """
+        self.directory = directory
+        self._max_size = None if max_size is None else pre.parse_memory(max_size)
+        self._max_age = max_age
+
+    @staticmethod
+    def key(file: str, **settings) -> str:
+        """Key of a cache entry, based on the map-file (path, size, and modification time), the map-configuration
+        (`model_config`, defaults to `src._globals.MODEL_CONFIG`), and the settings of the pre-processing. Arrays and
+        geometries in the settings (e.g., `roi_polygon`) are serialised exactly (see `._serialise()`).
+
+        :param file: file name of map-data
+        :param settings: map-configuration (`model_config`), and settings of pre-processing, e.g., `time_axis`
+
+        :type file: str
+        :type settings: any
+
+        :return: key of cache entry
+        :rtype: str
+        """
+        stat = os.stat(file)
+        settings.setdefault('model_config', glob.MODEL_CONFIG)
+        key = dict(file=os.path.abspath(file), size=stat.st_size, mtime=stat.st_mtime_ns, **settings)
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=StatisticsCache._serialise).encode()).hexdigest()
+
+    @staticmethod
+    def _serialise(value: typing.Any) -> typing.Any:
+        """JSON-serialisable representation of a setting that is not natively serialisable. Arrays and geometries are
+        represented exactly, i.e., by their data type, shape, and (a hash of) their data, and by their well-known binary
+        (WKB), respectively; their string representations are truncated and/or rounded.
+
+        :param value: setting
+        :type value: any
+
+        :return: serialisable representation of setting
+        :rtype: any
+        """
+        if isinstance(value, shapely.Geometry):
+            return {'wkb': shapely.to_wkb(value, hex=True)}
+        if isinstance(value, (np.ndarray, np.generic)):
+            array = np.ascontiguousarray(value)
+            if array.dtype.hasobject:
+                return {'shape': array.shape, 'data': array.tolist()}
+            return {
+                'dtype': array.dtype.str, 'shape': array.shape, 'data': hashlib.sha256(array.tobytes()).hexdigest()
+            }
+        return str(value)
+
+    def _path(self, key: str) -> str:
+        """
+        :param key: key of cache entry
+        :type key: str
+
+        :return: file name of cache entry
+        :rtype: str
+        """
+        return os.path.join(self.directory, f'{key}{self._SUFFIX}')
+
+    def load(self, key: str) -> typing.Optional[typing.Dict[str, np.ndarray]]:
+        """Load cache entry. A cache entry that cannot be read is ignored (and overwritten when stored again).
+
+        :param key: key of cache entry
+        :type key: str
+
+        :return: cached data (if any)
+        :rtype: dict[str, numpy.ndarray], None
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as f:
+                data = {
+                    k: np.ma.masked_array(f[k], mask=f[f'{k}{self._MASK}']) if f'{k}{self._MASK}' in f else f[k]
+                    for k in f.files if not k.endswith(self._MASK)
+                }
+
+            # mark cache entry as used
+            os.utime(path)
+
+        # cache entry not (or no longer) present, e.g., removed by another process
+        except FileNotFoundError:
+            _LOG.info(f'No cached map-data: {key}')
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            _LOG.warning(f'Cached map-data could not be read ({e}): {path}')
+            return None
+
+        _LOG.info(f'Cached map-data used: {path}')
+        return data
+
+    def n_cells(self, key: str) -> typing.Optional[int]:
+        """Number of grid cells of a cache entry, which only requires its (x,y)-coordinates to be read.
+
+        :param key: key of cache entry
+        :type key: str
+
+        :return: number of grid cells (if cached)
+        :rtype: int, None
+        """
+        try:
+            with np.load(self._path(key), allow_pickle=False) as f:
+                return len(f['x_coordinates'])
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+    def store(self, key: str, data: typing.Dict[str, np.ndarray]) -> None:
+        """Store cache entry, after which the cache is limited in size and age of its entries (see `.evict()`). The
+        entry is written to a temporary file first, such that an incomplete entry is never read.
+
+        :param key: key of cache entry
+        :param data: data to cache
+
+        :type key: str
+        :type data: dict[str, numpy.ndarray]
+        """
+        arrays = {}
+        for k, v in data.items():
+            if np.ma.isMaskedArray(v):
+                arrays[k] = np.ma.getdata(v)
+                arrays[f'{k}{self._MASK}'] = np.ma.getmaskarray(v)
+            else:
+                arrays[k] = np.asarray(v)
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, mode='wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp, self._path(key))
+        finally:
+            # remove temporary file if it could not be stored
+            if os.path.exists(temp):
+                os.remove(temp)
+        _LOG.info(f'Map-data cached: {self._path(key)}')
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove cache entries that exceed the maximum age since their last use, and remove the least recently used
+        entries until the cache does not exceed its maximum size.
+        """
+        if not os.path.isdir(self.directory):
+            return
+
+        # cache entries: least recently used first
+        entries = []
+        for file in os.listdir(self.directory):
+            if file.endswith(self._SUFFIX):
+                path = os.path.join(self.directory, file)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    # removed by another process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        # maximum age
+        if self._max_age is not None:
+            expired = time.time() - self._max_age * 86400
+            for entry in [e for e in entries if e[0] < expired]:
+                self._remove(entry[2])
+                entries.remove(entry)
+
+        # maximum size
+        if self._max_size is not None:
+            size = sum(e[1] for e in entries)
+            for _, entry_size, path in entries:
+                if size <= self._max_size:
+                    break
+                self._remove(path)
+                size -= entry_size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Remove cache entry.
+
+        :param path: file name of cache entry
+        :type path: str
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        else:
+            _LOG.info(f'Cached map-data removed: {path}')
@@ -0,0 +1,403 @@
+"""
+Calibration of the ecotope-labelling against existing ecotope-maps.
+
+Author: Gijs G. Hendrickx
+"""
+import copy
+import itertools
+import logging
+import time
+import typing
+
+import numpy as np
+
+from src import (
+    _globals as glob,
+    labelling as lab,
+    performance as pf,
+    preprocessing as pre,
+    processing as prc,
+    session as se
+)
+
+_LOG = logging.getLogger(__name__)
+
+# calibration parameters aside from the ecotope configuration, with their labelling setting (if any)
+_PARAMETERS = {
+    'friction_coefficient': 'c_friction',
+    'shields': 'shields',
+    'chezy': 'chezy',
+    'relative_density': 'r_density',
+    'mlws': None,
+    'mhwn': None,
+}
+
+
+class CalibrationResult(typing.NamedTuple):
+    """Result of the calibration: the best performing parameters, and the performance of all candidates."""
+    parameters: typing.Dict[str, float]
+    score: float
+    candidates: typing.List[typing.Tuple[typing.Dict[str, float], float]]
+
+    def curve(self, parameter: str) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Trade-off curve of a calibration parameter, i.e., the best performance per value of the parameter (over all
+        values of the other parameters).
+
+        :param parameter: calibration parameter
+        :type parameter: str
+
+        :return: parameter values, and best performance
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        values = np.array([c[parameter] for c, _ in self.candidates])
+        scores = np.array([s for _, s in self.candidates])
+        unique = np.unique(values)
+        best = np.array([
+            np.nanmax(scores[values == v]) if np.any(np.isfinite(scores[values == v])) else np.nan for v in unique
+        ])
+        return unique, best
+
+
+def calibrate(
+        *f_map: str, reference: typing.Union[glob.TypeXYLabel, tuple], parameters: typing.Dict[str, typing.Sequence],
+        **kwargs
+) -> CalibrationResult:
+    """Calibrate the ecotope-labelling against an existing ecotope-map (`reference`) by a grid search over the
+    parameters, maximising the agreement as determined by `src.performance.Comparison`. The model data is read and
+    pre-processed only once (or retrieved from the cache, see `src.processing.map_ecotopes()`), after which every
+    candidate only requires the (vectorised) relabelling of the label-characters it affects (see
+    `src.session.LabellingSession`) of the grid cells present in the reference.
+
+    The calibration parameters are either entries of the ecotope configuration, defined by their keys joined by a
+    slash, e.g., 'hydrodynamics/littoral' or 'depth-2/sub-littoral/depth-deep'; or any of the following parameters:
+    {'friction_coefficient', 'shields', 'chezy', 'relative_density', 'mlws', 'mhwn'}.
+    >>> parameters = {
+    ...     'hydrodynamics/littoral': [.1, .2, .3],
+    ...     'friction_coefficient': [1000, 1300, 1600],
+    ... }
+
+    :param f_map: file name(s) of hydrodynamic model output data (*.nc)
+    :param reference: ground-truth ecotope-labels
+    :param parameters: calibration parameters, with their candidate values
+    :param kwargs: optional arguments
+        enable_wild_card: the wild card character reflects a match, defaults to True
+        level: level of assessment, when `None` full assessment is executed, defaults to None
+        tolerance: maximum distance between matching (x,y)-coordinates of reference and model data (see
+            `src.performance.Comparison`), defaults to None
+        wild_card: wild-card character in ecotope-labels, defaults to 'x'
+        optional arguments to `src.processing.extract_model_data()`
+        optional arguments to `src.processing.label_settings()`
+
+    :type f_map: str
+    :type reference: dict[tuple[float, float], str], tuple
+    :type parameters: dict[str, sequence[float]]
+    :type kwargs: optional
+        enable_wild_card: bool
+        level: int
+        tolerance: float
+        wild_card: str
+
+    :return: calibration result
+    :rtype: CalibrationResult
+
+    :raise ValueError: if a calibration parameter is unknown
+    :raise ValueError: if the friction coefficient is combined with the Shields parameter, Chezy coefficient, and/or
+        relative density
+    :raise ValueError: if `level` is negative
+    :raise ValueError: if the reference and the model data have no (x,y)-coordinates in common
+    :raise ValueError: if the reference contains ecotope-labels that cannot be packed (see `src.labelling.Ecotopes`)
+    """
+    # start time
+    t0 = time.perf_counter()
+
+    # ecotope configuration and labelling settings
+    config, settings = _configuration(parameters, **kwargs)
+    if kwargs.get('level') is not None and kwargs['level'] < 0:
+        msg = f'Level of comparison must be positive, negative value given: {kwargs["level"]}'
+        raise ValueError(msg)
+
+    # extract model data: only grid cells present in reference
+    model_data, reference = _align(prc.extract_model_data(*f_map, **kwargs), reference, **kwargs)
+
+    # grid search
+    wild_card = kwargs.get('wild_card', 'x') if kwargs.get('enable_wild_card', True) else False
+    candidates = _grid_search(
+        parameters, model_data, reference, config, settings, level=kwargs.get('level'), wild_card=wild_card,
+        mlws=kwargs.get('mlws'), mhwn=kwargs.get('mhwn')
+    )
+
+    # best performing candidate
+    scores = np.array([s for _, s in candidates], dtype=float)
+    if np.all(np.isnan(scores)):
+        best, score = {}, np.nan
+    else:
+        best, score = candidates[int(np.nanargmax(scores))]
+
+    # computation time
+    t1 = time.perf_counter()
+    _LOG.info(f'Calibration of {len(candidates)} candidates in {t1 - t0:.1f} seconds: {best} ({score:.4f})')
+
+    # return calibration result
+    return CalibrationResult(best, score, candidates)
+
+
+def _configuration(parameters: typing.Dict[str, typing.Sequence], **kwargs) -> typing.Tuple[dict, dict]:
+    """Ecotope configuration and labelling settings to which the calibration parameters are applied. When the Shields
+    parameter, the Chezy coefficient, and/or the relative density are calibrated, the grain sizes are estimated from
+    these parameters instead of from the (default) friction coefficient.
+
+    :param parameters: calibration parameters, with their candidate values
+    :param kwargs: optional arguments
+        friction_coefficient: proxy friction coefficient combining `shields`, `chezy`, and `relative_density`,
+            defaults to None
+        optional arguments to `src.processing.ecotope_config()`
+        optional arguments to `src.processing.label_settings()`
+
+    :type parameters: dict[str, sequence[float]]
+    :type kwargs: optional
+        friction_coefficient: float
+
+    :return: ecotope configuration, and labelling settings
+    :rtype: tuple[dict, dict]
+
+    :raise ValueError: if a calibration parameter is unknown
+    :raise ValueError: if the friction coefficient is combined with the Shields parameter, Chezy coefficient, and/or
+        relative density
+    """
+    # labelling settings
+    settings = prc.label_settings(**kwargs)
+    config = prc.ecotope_config(**kwargs)
+    for parameter in parameters:
+        _validate_parameter(parameter, config)
+
+    # friction parameters: the friction coefficient overrules the others
+    friction = [p for p in ('shields', 'chezy', 'relative_density') if p in parameters]
+    if friction:
+        if 'friction_coefficient' in parameters or kwargs.get('friction_coefficient') is not None:
+            msg = f'Calibration of {friction} has no effect when combined with a friction coefficient, ' \
+                  f'which combines these parameters'
+            raise ValueError(msg)
+        settings['c_friction'] = None
+
+    # return configuration and settings
+    return config, settings
+
+
+def _align(
+        model_data: typing.Dict[str, np.ndarray], reference: typing.Union[glob.TypeXYLabel, tuple], **kwargs
+) -> typing.Tuple[typing.Dict[str, np.ndarray], lab.Ecotopes]:
+    """Align the model data with the reference, i.e., select the grid cells present in the reference.
+
+    :param model_data: pre-processed model data
+    :param reference: ground-truth ecotope-labels
+    :param kwargs: optional arguments
+        tolerance: maximum distance between matching (x,y)-coordinates of reference and model data (see
+            `src.performance.Comparison`), defaults to None
+        wild_card: wild-card character in ecotope-labels, defaults to 'x'
+
+    :type model_data: dict[str, numpy.ndarray]
+    :type reference: dict[tuple[float, float], str], tuple
+    :type kwargs: optional
+        tolerance: float
+        wild_card: str
+
+    :return: model data of grid cells present in the reference, and their packed ground-truth ecotope-labels
+    :rtype: tuple[dict[str, numpy.ndarray], src.labelling.Ecotopes]
+
+    :raise ValueError: if the reference and the model data have no (x,y)-coordinates in common
+    :raise ValueError: if the reference contains ecotope-labels that cannot be packed (see `src.labelling.Ecotopes`)
+    """
+    x, y = np.ma.getdata(model_data['x_coordinates']), np.ma.getdata(model_data['y_coordinates'])
+    comparison = pf.Comparison(
+        reference, (x, y, np.arange(len(x))), wild_card=kwargs.get('wild_card', 'x'), tolerance=kwargs.get('tolerance')
+    )
+    labels, index = comparison.aligned
+    if index.size == 0:
+        msg = 'Reference and model data have no (x,y)-coordinates in common'
+        raise ValueError(msg)
+    _LOG.info(f'Calibration based on {len(index)} grid cells')
+    return {k: v[index] for k, v in model_data.items()}, lab.Ecotopes.from_labels(labels)
+
+
+def _validate_parameter(parameter: str, config: dict) -> None:
+    """Validate a calibration parameter, which is either an entry of the ecotope configuration, or a labelling setting.
+
+    :param parameter: calibration parameter
+    :param config: ecotope configuration
+
+    :type parameter: str
+    :type config: dict
+
+    :raise ValueError: if the calibration parameter is unknown
+    """
+    if parameter in _PARAMETERS:
+        return
+
+    entry = config
+    for key in parameter.split('/'):
+        if not isinstance(entry, dict) or key not in entry:
+            msg = f'Unknown calibration parameter: {parameter}; ' \
+                  f'use an entry of the ecotope configuration (e.g., \'hydrodynamics/littoral\'), or one of ' \
+                  f'{tuple(_PARAMETERS)}'
+            raise ValueError(msg)
+        entry = entry[key]
+    if isinstance(entry, dict):
+        msg = f'Calibration parameter must be a single value of the ecotope configuration; {parameter} is not'
+        raise ValueError(msg)
+
+
+def _grid_search(
+        parameters: typing.Dict[str, typing.Sequence], model_data: typing.Dict[str, np.ndarray],
+        reference: lab.Ecotopes, config: dict, settings: dict, **kwargs
+) -> typing.List[typing.Tuple[typing.Dict[str, float], float]]:
+    """Evaluate the performance of all calibration candidates, i.e., the fraction of matching ecotope-labels. The grid
+    cells are labelled in a labelling session, such that only the label-characters affected by a candidate are
+    relabelled.
+
+    :param parameters: calibration parameters, with their candidate values
+    :param model_data: pre-processed model data
+    :param reference: packed ground-truth ecotope-labels
+    :param config: ecotope configuration
+    :param settings: labelling settings
+    :param kwargs: optional arguments
+        level: level of assessment, when `None` full assessment is executed, defaults to None
+        wild_card: wild-card character in ecotope-labels (or `False` to disable), defaults to 'x'
+        optional arguments to `._candidate_settings()`
+
+    :type parameters: dict[str, sequence[float]]
+    :type model_data: dict[str, numpy.ndarray]
+    :type reference: src.labelling.Ecotopes
+    :type config: dict
+    :type settings: dict
+    :type kwargs: optional
+        level: int
+        wild_card: str, bool
+
+    :return: calibration candidates and their performance, `NaN` for an invalid ecotope configuration
+    :rtype: list[tuple[dict[str, float], float]]
+    """
+    session = se.LabellingSession(
+        model_data, settings['label_config'], substratum_1=settings['substratum_1'],
+        grain_sizes=_grain_sizes(model_data, settings)
+    )
+
+    candidates = []
+    for values in itertools.product(*parameters.values()):
+        candidate = dict(zip(parameters, values))
+        try:
+            labelling = _candidate_settings(candidate, config, settings, **kwargs)
+        except ValueError as e:
+            _LOG.debug(f'Invalid calibration candidate {candidate}: {e}')
+            candidates.append((candidate, np.nan))
+            continue
+
+        # ecotope-labelling
+        session.update(labelling['label_config'], grain_sizes=_grain_sizes(model_data, labelling))
+
+        # performance
+        match = _match(reference, session.ecotopes, kwargs.get('level'), wild_card=kwargs.get('wild_card', 'x'))
+        candidates.append((candidate, float(np.mean(match))))
+        _LOG.debug(f'Calibration candidate {candidate}: {candidates[-1][1]:.4f}')
+
+    # return candidates
+    return candidates
+
+
+def _candidate_settings(candidate: typing.Dict[str, float], config: dict, settings: dict, **kwargs) -> dict:
+    """Labelling settings of a calibration candidate, incl. the compiled ecotope configuration.
+
+    :param candidate: calibration parameters
+    :param config: ecotope configuration
+    :param settings: labelling settings
+    :param kwargs: optional arguments
+        mhwn: mean high water, neap tide, defaults to None
+        mlws: mean low water, spring tide, defaults to None
+
+    :type candidate: dict[str, float]
+    :type config: dict
+    :type settings: dict
+    :type kwargs: optional
+        mhwn: float
+        mlws: float
+
+    :return: labelling settings
+    :rtype: dict
+
+    :raise ValueError: if the ecotope configuration of the candidate is invalid
+    """
+    tide = dict(mlws=kwargs.get('mlws'), mhwn=kwargs.get('mhwn'))
+    config = copy.deepcopy(config)
+    settings = settings.copy()
+
+    # update configuration and settings
+    for parameter, value in candidate.items():
+        if parameter in tide:
+            tide[parameter] = value
+        elif parameter in _PARAMETERS:
+            settings[_PARAMETERS[parameter]] = value
+        else:
+            *keys, key = parameter.split('/')
+            entry = config
+            for k in keys:
+                entry = entry[k]
+            entry[key] = value
+
+    # compile configuration
+    settings['label_config'] = lab.compile_config(config, **tide)
+    return settings
+
+
+def _grain_sizes(model_data: typing.Dict[str, np.ndarray], settings: dict) -> np.ndarray:
+    """Grain sizes as included in the model data, or as estimated from the labelling settings (see
+    `src.processing.label_ecotopes()`).
+
+    :param model_data: pre-processed model data
+    :param settings: labelling settings
+
+    :type model_data: dict[str, numpy.ndarray]
+    :type settings: dict
+
+    :return: grain sizes [um]
+    :rtype: numpy.ndarray
+    """
+    grain_sizes = model_data.get('grain_size')
+    if grain_sizes is None:
+        grain_sizes = pre.grain_size_estimation(
+            model_data['median_velocity'], **{k: settings[k] for k in ('shields', 'chezy', 'r_density', 'c_friction')}
+        )
+    return grain_sizes
+
+
+def _match(
+        reference: lab.Ecotopes, ecotopes: lab.Ecotopes, level: typing.Union[int, None],
+        wild_card: typing.Union[str, bool] = 'x'
+) -> np.ndarray:
+    """Compare ground-truth and predicted packed ecotope-labels up to a given level of detail, i.e., the number of
+    label-characters to assess (see `src.labelling.Ecotopes.CHARACTERS`), without constructing the ecotope-labels.
+
+    :param reference: packed ground-truth ecotope-labels
+    :param ecotopes: packed predicted ecotope-labels
+    :param level: level of assessment, when `None` full assessment is executed
+    :param wild_card: wild-card character in ground-truth ecotope-labels (or `False` to disable), defaults to 'x'
+
+    :type reference: src.labelling.Ecotopes
+    :type ecotopes: src.labelling.Ecotopes
+    :type level: int, None
+    :type wild_card: str, bool, optional
+
+    :return: matching ecotope-labels
+    :rtype: numpy.ndarray[bool]
+    """
+    # full assessment: packed ecotope-labels are compared at once
+    if level is None and not wild_card:
+        return reference.codes == ecotopes.codes
+
+    # assessment per label-character
+    match = np.ones(len(reference), dtype=bool)
+    for position, alphabet in enumerate(lab.Ecotopes.CHARACTERS[:level]):
+        data = reference.character(position)
+        matches = data == ecotopes.character(position)
+        if wild_card in alphabet:
+            matches |= data == alphabet.index(wild_card)
+        match &= matches
+    return match
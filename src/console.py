@@ -51,46 +51,70 @@ def __print_statements() -> None:
 @app_emma.command(name='run', help='execution of EMMA with customisation of the basic optional arguments')
 def run(
         map_files: te.Annotated[typing.List[str], typer.Argument(help='hydrodynamic output map-file(s)')],
+        executor: te.Annotated[str, typer.Option(
+            '--executor', '-e', help='executor for parallel computation {serial, threads, processes, dask}'
+        )] = None,
         export: te.Annotated[bool, typer.Option(help='export model data to [wd]')] = True,
         f_eco_config: te.Annotated[str, typer.Option(help='ecotope configuration file')] = 'emma.json',
         f_map_config: te.Annotated[str, typer.Option(help='map configuration file')] = 'dfm1.json',
         log: te.Annotated[str, typer.Option(
             '--log', '-l', autocompletion=__log_levels, callback=__log_levels, help='level of log statements'
         )] = 'WARNING',
+        max_memory: te.Annotated[str, typer.Option(
+            '--max-memory', help='memory budget for reading map-file(s) in chunks, e.g., 4GB'
+        )] = None,
         n_cores: te.Annotated[int, typer.Option(
             '--cores', '-n', min=1, help='number of cores for parallel computation'
         )] = 1,
+        time_stride: te.Annotated[int, typer.Option(
+            '--time-stride', min=1, help='stride of the time-steps read from map-file(s), e.g., for a quick preview'
+        )] = None,
+        time_window: te.Annotated[typing.Tuple[str, str], typer.Option(
+            '--time-window', help='time-window read from map-file(s), e.g., 2020-01-01 2020-01-15T12:00'
+        )] = (None, None),
         wd: te.Annotated[str, typer.Option(help='working directory')] = None,
 ) -> None:
     """Run EMMA with limited modifications from the command-line. For the full spectrum of customisation, EMMA should be
     executed using Python, and calling the `src.processing.map_ecotopes`-function.
 
     :param map_files: file name(s) of hydrodynamic model output data (*.nc)
+    :param executor: executor for parallel computation, defaults to None
     :param export: export data, defaults to True
     :param f_eco_config: file name of ecotopes configuration file, defaults to 'emma.json'
     :param f_map_config: file name of mapping configuration file, defaults to 'dfm1.json'
     :param log: log-level {'DEBUG', 'INFO', 'WARNING', 'CRITICAL'}, defaults to 'WARNING'
+    :param max_memory: memory budget for reading map-file(s) in chunks, defaults to None
     :param n_cores: number of cores available for parallel computations, defaults to 1
+    :param time_stride: stride of the time-steps read from map-file(s), defaults to None
+    :param time_window: time-window read from map-file(s), defined by its start and end date-times, defaults to None
     :param wd: working directory, defaults to None
 
     :type map_files: list[str]
+    :type executor: str, optional
     :type export: bool, optional
     :type f_eco_config: str, optional
     :type f_map_config: str, optional
     :type log: str, optional
+    :type max_memory: str, optional
     :type n_cores: int, optional
+    :type time_stride: int, optional
+    :type time_window: tuple[str, str], optional
     :type wd: str, optional
     """
     __print_statements()
     # noinspection PyArgumentList
     processing.map_ecotopes(
         *map_files,
+        executor=executor,
         f_export=export,
         f_eco_config=f_eco_config,
         f_map_config=f_map_config,
         export_log=export,
         log_level=log,
+        max_memory=max_memory,
         n_cores=n_cores,
+        time_stride=time_stride,
+        time_window=None if time_window == (None, None) else time_window,
         wd=wd,
         wd_config=wd,
         wd_export=wd,
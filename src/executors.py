@@ -0,0 +1,214 @@
+"""
+Executors for (parallel) computations, shared by the mapping of ecotopes and the transformation of polygon-data, and
+buffers in shared memory to which out-of-process executors can write their results.
+
+All executors follow the `concurrent.futures.Executor`-interface:
+ 1. 'serial': tasks are executed one-by-one in the calling process;
+ 2. 'threads': tasks are executed by a pool of threads, which suffices for computations dominated by `numpy` (releasing
+    the GIL);
+ 3. 'processes': tasks are executed by a pool of processes;
+ 4. 'dask': tasks are executed by a local `dask.distributed`-cluster (requires `dask[distributed]`).
+
+Author: Gijs G. Hendrickx
+"""
+import concurrent.futures as cf
+import ctypes
+import logging
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import typing
+
+import numpy as np
+
+_LOG = logging.getLogger(__name__)
+
+EXECUTORS = 'serial', 'threads', 'processes', 'dask'
+
+
+class SerialExecutor(cf.Executor):
+    """Executor executing the tasks directly, i.e., in the calling process and in order of submission."""
+
+    def submit(self, fn: typing.Callable, *args, **kwargs) -> cf.Future:  # pylint: disable=arguments-differ
+        """Execute a task.
+
+        :param fn: function
+        :param args: positional arguments to `fn`
+        :param kwargs: optional arguments to `fn`
+
+        :type fn: callable
+        :type args: any
+        :type kwargs: any
+
+        :return: (completed) future
+        :rtype: concurrent.futures.Future
+        """
+        future = cf.Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            future.set_exception(e)
+        return future
+
+
+class DaskExecutor(cf.Executor):
+    """Executor based on a local `dask.distributed`-cluster, which is closed together with the executor."""
+
+    def __init__(self, n_workers: int = 1) -> None:
+        """
+        :param n_workers: number of workers, defaults to 1
+        :type n_workers: int, optional
+
+        :raise ImportError: if `dask.distributed` is not installed
+        """
+        try:
+            from dask import distributed  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            msg = 'The `dask`-executor requires `dask.distributed`; install it by `pip install "dask[distributed]"`'
+            raise ImportError(msg) from e
+
+        self._client = distributed.Client(distributed.LocalCluster(n_workers=n_workers, threads_per_worker=1))
+        self._executor = self._client.get_executor()
+
+    def submit(self, fn: typing.Callable, *args, **kwargs) -> cf.Future:  # pylint: disable=arguments-differ
+        """Submit a task to the `dask.distributed`-cluster.
+
+        :param fn: function
+        :param args: positional arguments to `fn`
+        :param kwargs: optional arguments to `fn`
+
+        :type fn: callable
+        :type args: any
+        :type kwargs: any
+
+        :return: future
+        :rtype: concurrent.futures.Future
+        """
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Close the `dask.distributed`-cluster.
+
+        :param wait: wait for pending tasks, defaults to True
+        :param cancel_futures: cancel pending tasks, defaults to False
+
+        :type wait: bool, optional
+        :type cancel_futures: bool, optional
+        """
+        self._executor.shutdown(wait=wait)
+        cluster = self._client.cluster
+        self._client.close()
+        cluster.close()
+
+
+class SharedBuffer:
+    """One-dimensional array in shared memory, which can be written to by other processes (by its name). Arrays based
+    on this buffer (`numpy.asarray()`) refer to the shared memory without copying it; the shared memory is released
+    together with the last array referring to it.
+    """
+
+    def __init__(self, size: int, dtype: np.dtype) -> None:
+        """
+        :param size: number of elements
+        :param dtype: data type
+
+        :type size: int
+        :type dtype: numpy.dtype
+        """
+        self.size = int(size)
+        self.dtype = np.dtype(dtype)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(self.size * self.dtype.itemsize, 1))
+
+    def __del__(self) -> None:
+        """Release the shared memory."""
+        self._shm.close()
+
+    @property
+    def __array_interface__(self) -> dict:
+        """Array interface referring to the shared memory, without holding on to its buffer (which would prevent
+        releasing the shared memory).
+        """
+        pointer = ctypes.c_char.from_buffer(self._shm.buf)
+        address = ctypes.addressof(pointer)
+        del pointer
+        return {'shape': (self.size,), 'typestr': self.dtype.str, 'data': (address, False), 'version': 3}
+
+    @property
+    def name(self) -> str:
+        """
+        :return: name of the shared memory
+        :rtype: str
+        """
+        return self._shm.name
+
+    def unlink(self) -> None:
+        """Unlink the shared memory, i.e., no other processes can attach to it anymore. The memory itself remains
+        available until it is released.
+        """
+        self._shm.unlink()
+
+
+def get_executor(executor: str = None, n_workers: int = 1) -> cf.Executor:
+    """Get executor by name. By default, tasks are executed by a pool of processes when multiple workers are available,
+    and serially otherwise.
+
+    :param executor: executor {'serial', 'threads', 'processes', 'dask'}, defaults to None
+    :param n_workers: number of workers, defaults to 1
+
+    :type executor: str, optional
+    :type n_workers: int, optional
+
+    :return: executor
+    :rtype: concurrent.futures.Executor
+
+    :raise ValueError: if `executor` is unknown
+    :raise ImportError: if `executor='dask'` and `dask.distributed` is not installed
+    """
+    executor = executor_name(executor, n_workers)
+    _LOG.debug(f'Executor: {executor} ({n_workers} workers / {mp.cpu_count()} CPUs)')
+
+    if executor == 'serial':
+        return SerialExecutor()
+    if executor == 'threads':
+        return cf.ThreadPoolExecutor(max_workers=n_workers)
+    if executor == 'processes':
+        return cf.ProcessPoolExecutor(max_workers=n_workers)
+    return DaskExecutor(n_workers=n_workers)
+
+
+def in_process(executor: str = None, n_workers: int = 1) -> bool:
+    """Whether tasks of an executor are executed in the calling process, i.e., share its memory.
+
+    :param executor: executor {'serial', 'threads', 'processes', 'dask'}, defaults to None
+    :param n_workers: number of workers, defaults to 1
+
+    :type executor: str, optional
+    :type n_workers: int, optional
+
+    :return: tasks executed in calling process
+    :rtype: bool
+
+    :raise ValueError: if `executor` is unknown
+    """
+    return executor_name(executor, n_workers) in ('serial', 'threads')
+
+
+def executor_name(executor: str = None, n_workers: int = 1) -> str:
+    """Name of the executor, which defaults to a pool of processes when multiple workers are available, and serial
+    execution otherwise.
+
+    :param executor: executor {'serial', 'threads', 'processes', 'dask'}, defaults to None
+    :param n_workers: number of workers, defaults to 1
+
+    :type executor: str, optional
+    :type n_workers: int, optional
+
+    :return: executor
+    :rtype: str
+
+    :raise ValueError: if `executor` is unknown
+    """
+    executor = executor or ('processes' if n_workers > 1 else 'serial')
+    if executor not in EXECUTORS:
+        msg = f'`executor` must be one of {EXECUTORS}; {executor} is given.'
+        raise ValueError(msg)
+    return executor
@@ -3,18 +3,21 @@ Export ecotope-map.
 
 Author: Gijs G. Hendrickx
 """
+import itertools
 import logging
 import os
 
 import typing
 
+from src import labelling as lab
+
 _LOG = logging.getLogger(__name__)
 
 
 def export_output(output: tuple, file_name: str = None, wd: str = None) -> None:
     """Export output data as compuated by `src.processing.map_ecotopes()`.
 
-    :param output: output data (x-coordinates, y-coordinates, ecotope-labels)
+    :param output: output data (x-coordinates, y-coordinates, (packed) ecotope-labels)
     :param file_name: file name, defaults to None
     :param wd: working directory, defaults to None
 
@@ -168,7 +171,7 @@ def export2csv(
         x: typing.Sized, y: typing.Sized, ecotopes: typing.Sized, *, file_name: str = None, wd: str = None
 ) -> None:
     """Export ecotope-map to a *.csv-file, containing the x- and y-coordinates and their corresponding ecotope
-    (prediction).
+    (prediction). Packed ecotope-labels (`src.labelling.Ecotopes`) are formatted as strings per batch while writing.
 
     :param x: x-coordinates
     :param y: y-coordinates
@@ -178,7 +181,7 @@ def export2csv(
 
     :type x: iterable
     :type y: iterable
-    :type ecotopes: iterable
+    :type ecotopes: iterable, src.labelling.Ecotopes
     :type file_name: str, optional
     :type wd: str, optional
     """
@@ -187,10 +190,18 @@ def export2csv(
     # file specifications
     file = file_dir(file_name, wd)
 
-    # export data
+    # export data: per batch
+    batch = 2 ** 16
+    packed = isinstance(ecotopes, lab.Ecotopes)
+    x, y, labels = iter(x), iter(y), iter(ecotopes)
     with open(file, mode='w') as f:
-        for xi, yi, ei in zip(x, y, ecotopes):
-            f.write(f'{xi},{yi},{ei}\n')
+        for i in range(0, len(ecotopes), batch):
+            if packed:
+                # packed ecotope-labels are sliced to format only the current batch
+                rows = zip(itertools.islice(x, batch), itertools.islice(y, batch), ecotopes[i:i + batch].labels())
+            else:
+                rows = zip(itertools.islice(x, batch), itertools.islice(y, batch), itertools.islice(labels, batch))
+            f.write(''.join(f'{xi},{yi},{ei}\n' for xi, yi, ei in rows))
 
 
 @_file_name(default='ecotopes.nc')
@@ -4,6 +4,10 @@ Labelling of ecotopes.
 Authors: Soesja Brunink & Gijs G. Hendrickx
 """
 # pylint: disable=too-many-return-statements, inconsistent-return-statements
+import typing
+
+import numpy as np
+
 from src import _globals as glob
 
 
@@ -228,3 +232,644 @@ def substratum_2_code(code_substratum_1: str, code_hydrodynamics: str, grain_siz
         if grain_size <= glob.LABEL_CONFIG['substratum-2']['soft']['sand']:
             return 'z'
         return 'g'
+
+
+# compiled configuration
+
+
+class Thresholds(typing.NamedTuple):
+    """Bin edges and corresponding codes of a single classification, where `values` are assigned to `codes[i]` if
+    `edges[i - 1] <= values < edges[i]` (cf. `numpy.digitize`).
+    """
+    edges: np.ndarray
+    codes: np.ndarray
+
+    def classify(self, values: np.ndarray) -> np.ndarray:
+        """Classify values based on the bin edges.
+
+        :param values: values to classify
+        :type values: numpy.ndarray
+
+        :return: codes
+        :rtype: numpy.ndarray
+        """
+        return self.codes[np.digitize(values, self.edges)]
+
+
+class LabelConfig(typing.NamedTuple):
+    """Compiled ecotope-configuration: all thresholds of the ecotope-configuration translated to `Thresholds`, which are
+    validated once and used by the vectorised labelling functions.
+    """
+    salinity_variable: float
+    salinity: Thresholds
+    depth_1: Thresholds
+    hydrodynamics_stagnant: float
+    hydrodynamics_sub_littoral: Thresholds
+    hydrodynamics_littoral: Thresholds
+    depth_2_sub_littoral: Thresholds
+    depth_2_littoral: Thresholds
+    depth_2_supra_littoral: Thresholds
+    substratum_2_soft: Thresholds
+
+
+def _above(threshold: float) -> float:
+    """Bin edge representing a strict inequality (`values > threshold`), i.e., the smallest floating-point number larger
+    than the threshold.
+
+    :param threshold: threshold
+    :type threshold: float
+
+    :return: bin edge
+    :rtype: float
+    """
+    return np.nextafter(threshold, np.inf)
+
+
+def _thresholds(name: str, codes: str, *edges: float) -> Thresholds:
+    """Construct and validate a classification.
+
+    :param name: name of the classification (used in error-messages)
+    :param codes: codes, ordered from low to high values
+    :param edges: bin edges, ordered from low to high values
+
+    :type name: str
+    :type codes: str
+    :type edges: float
+
+    :return: classification
+    :rtype: Thresholds
+
+    :raise ValueError: if `edges` are not in ascending order
+    """
+    assert len(codes) == len(edges) + 1
+
+    edges = np.array(edges, dtype=float)
+    if np.any(np.diff(edges) < 0):
+        msg = f'Thresholds of `{name}` must be in ascending order; {edges} given'
+        raise ValueError(msg)
+
+    codes = np.array(list(codes))
+    edges.flags.writeable = False
+    codes.flags.writeable = False
+    return Thresholds(edges, codes)
+
+
+def _value(config: dict, *keys: str) -> float:
+    """Get a numeric value from the (nested) ecotope-configuration.
+
+    :param config: ecotope-configuration
+    :param keys: (nested) key-words
+
+    :type config: dict
+    :type keys: str
+
+    :return: configuration value
+    :rtype: float
+
+    :raise KeyError: if the key-word is missing from the configuration
+    :raise TypeError: if the configuration value is not numeric
+    """
+    value = config
+    for key in keys:
+        if not isinstance(value, dict) or key not in value:
+            msg = f'Ecotope-configuration is missing the key-word: {" > ".join(keys)}'
+            raise KeyError(msg)
+        value = value[key]
+
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        msg = f'Ecotope-configuration value of {" > ".join(keys)} must be numeric; {value} given'
+        raise TypeError(msg)
+
+    return float(value)
+
+
+def compile_config(config: dict = None, mlws: float = None, mhwn: float = None) -> LabelConfig:
+    """Compile the ecotope-configuration, as loaded by `config.config_file.load_config()`, to a validated, immutable
+    set of thresholds. When provided, the tidal characteristics (`mlws` and `mhwn`) replace the 'depth-1'-thresholds of
+    the configuration.
+
+    :param config: ecotope-configuration, defaults to None
+    :param mlws: mean low water, spring tide [m] (positive upwards), defaults to None
+    :param mhwn: mean high water, neap tide [m] (positive upwards), defaults to None
+
+    :type config: dict, optional
+    :type mlws: float, optional
+    :type mhwn: float, optional
+
+    :return: compiled ecotope-configuration
+    :rtype: LabelConfig
+
+    :raise ValueError: if the thresholds are not consistently ordered
+    """
+    # dynamic thresholds: both defined or both undefined
+    assert not (mlws is None) ^ (mhwn is None)
+
+    # default configuration
+    if config is None:
+        config = glob.LABEL_CONFIG
+
+    # static or quasi-static thresholds
+    if mlws is None and mhwn is None:
+        low_water = _value(config, 'depth-1', 'low-water')
+        high_water = _value(config, 'depth-1', 'high-water')
+    else:
+        low_water, high_water = float(mlws), float(mhwn)
+
+    # compile configuration
+    return LabelConfig(
+        salinity_variable=_value(config, 'salinity', 'variable'),
+        salinity=_thresholds(
+            'salinity', 'FBZ', _value(config, 'salinity', 'fresh'), _above(_value(config, 'salinity', 'marine'))
+        ),
+        # classification of the negative water depth, i.e., the bed level
+        depth_1=_thresholds('depth-1', '123', low_water, _above(high_water)),
+        hydrodynamics_stagnant=_value(config, 'hydrodynamics', 'stagnant'),
+        hydrodynamics_sub_littoral=_thresholds(
+            'hydrodynamics > sub-littoral', '21', _above(_value(config, 'hydrodynamics', 'sub-littoral'))
+        ),
+        hydrodynamics_littoral=_thresholds(
+            'hydrodynamics > littoral', '21', _above(_value(config, 'hydrodynamics', 'littoral'))
+        ),
+        depth_2_sub_littoral=_thresholds(
+            'depth-2 > sub-littoral', '321',
+            _value(config, 'depth-2', 'sub-littoral', 'depth-shallow'),
+            _value(config, 'depth-2', 'sub-littoral', 'depth-deep')
+        ),
+        depth_2_littoral=_thresholds(
+            'depth-2 > littoral', '321',
+            _above(_value(config, 'depth-2', 'littoral', 'inundation-lower')),
+            _value(config, 'depth-2', 'littoral', 'inundation-upper')
+        ),
+        depth_2_supra_littoral=_thresholds(
+            'depth-2 > supra-littoral', '4321',
+            _above(_value(config, 'depth-2', 'supra-littoral', 'frequency-3')),
+            _above(_value(config, 'depth-2', 'supra-littoral', 'frequency-2')),
+            _above(_value(config, 'depth-2', 'supra-littoral', 'frequency-1'))
+        ),
+        substratum_2_soft=_thresholds(
+            'substratum-2 > soft', 'sfzg',
+            _above(_value(config, 'substratum-2', 'soft', 'silt')),
+            _above(_value(config, 'substratum-2', 'soft', 'fines')),
+            _above(_value(config, 'substratum-2', 'soft', 'sand'))
+        ),
+    )
+
+
+# vectorised labelling
+
+
+def _as_array(values: typing.Optional[np.ndarray], shape: tuple = None) -> np.ndarray:
+    """Convert (masked) input data to a floating-point array in which unknown values are represented by `numpy.nan`,
+    i.e., masked values and `None`. When `values` is `None` altogether, an array of `numpy.nan` of the given shape is
+    returned.
+
+    :param values: input data
+    :param shape: shape of array if `values` is `None`, defaults to None
+
+    :type values: numpy.ndarray, None
+    :type shape: tuple, optional
+
+    :return: input data with unknown values as `numpy.nan`
+    :rtype: numpy.ndarray
+    """
+    if values is None:
+        return np.full(shape, np.nan)
+    return np.ma.filled(np.ma.asarray(values, dtype=float), np.nan)
+
+
+def salinity_codes(salinity_mean: np.ndarray, salinity_std: np.ndarray, config: LabelConfig) -> np.ndarray:
+    """Vectorised determination of ecotope-codes in the category 'salinity'; see `salinity_code()`. Unknown (i.e.,
+    masked or `numpy.nan`) mean salinities are labelled with 'x'.
+
+    :param salinity_mean: temporal mean salinity [psu]
+    :param salinity_std: temporal standard deviation of salinity [psu]
+    :param config: compiled ecotope-configuration
+
+    :type salinity_mean: numpy.ndarray
+    :type salinity_std: numpy.ndarray
+    :type config: LabelConfig
+
+    :return: salinity codes
+    :rtype: numpy.ndarray
+    """
+    mean = _as_array(salinity_mean)
+    std = _as_array(salinity_std, mean.shape)
+    return np.select(
+        [
+            np.isnan(mean),
+            config.salinity_variable * std > mean,
+        ],
+        ['x', 'V'],
+        default=config.salinity.classify(mean)
+    )
+
+
+def substratum_1_codes(substratum_type: np.ndarray) -> np.ndarray:
+    """Vectorised determination of ecotope-codes in the category 'substratum 1'; see `substratum_1_code()`.
+
+    :param substratum_type: hard or soft substratum
+    :type substratum_type: numpy.ndarray
+
+    :return: substratum 1 codes
+    :rtype: numpy.ndarray
+    """
+    substratum_type = np.asarray(substratum_type, dtype=object)
+    return np.select(
+        [
+            np.equal(substratum_type, None),
+            substratum_type == 'soft',
+        ],
+        ['x', '2'],
+        default='1'
+    )
+
+
+def depth_1_codes(water_depth: np.ndarray, config: LabelConfig) -> np.ndarray:
+    """Vectorised determination of ecotope-codes in the category 'depth 1'; see `depth_1_code()`. Unknown (i.e., masked
+    or `numpy.nan`) water depths are labelled with 'x'. Any tidal characteristics (i.e., `mlws` and `mhwn`) are included
+    in the compiled ecotope-configuration; see `compile_config()`.
+
+    :param water_depth: temporal mean water depth [m]
+    :param config: compiled ecotope-configuration
+
+    :type water_depth: numpy.ndarray
+    :type config: LabelConfig
+
+    :return: depth 1 codes
+    :rtype: numpy.ndarray
+    """
+    depth = _as_array(water_depth)
+    return np.where(np.isnan(depth), 'x', config.depth_1.classify(-depth))
+
+
+def hydrodynamics_codes(
+        velocity: typing.Optional[np.ndarray], code_depth_1: np.ndarray, config: LabelConfig
+) -> np.ndarray:
+    """Vectorised determination of ecotope-codes in the category 'hydrodynamic'; see `hydrodynamics_code()`. Unknown
+    (i.e., masked or `numpy.nan`) flow velocities are labelled with 'x'.
+
+    :param velocity: flow velocity [m/s]
+    :param code_depth_1: ecotope-codes of 'depth 1'
+    :param config: compiled ecotope-configuration
+
+    :type velocity: numpy.ndarray, None
+    :type code_depth_1: numpy.ndarray
+    :type config: LabelConfig
+
+    :return: hydrodynamics codes
+    :rtype: numpy.ndarray
+    """
+    code_depth_1 = np.asarray(code_depth_1)
+    velocity = _as_array(velocity, code_depth_1.shape)
+    return np.select(
+        [
+            np.isnan(velocity),
+            velocity == config.hydrodynamics_stagnant,
+            code_depth_1 == '1',
+        ],
+        ['x', '3', config.hydrodynamics_sub_littoral.classify(velocity)],
+        default=config.hydrodynamics_littoral.classify(velocity)
+    )
+
+
+# the ecotope-codes of 'depth 2' depend on three abiotic parameters, next to the preceding codes and the configuration
+def depth_2_codes(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        code_substratum_1: np.ndarray, code_depth_1: np.ndarray, water_depth: np.ndarray, inundated: np.ndarray,
+        frequency: np.ndarray, config: LabelConfig
+) -> np.ndarray:
+    """Vectorised determination of ecotope-codes in the category 'depth 2'; see `depth_2_code()`. Unknown (i.e., masked
+    or `numpy.nan`) water depths, inundation times, and flood frequencies are labelled with 'x'.
+
+    :param code_substratum_1: ecotope-codes of 'substratum 1'
+    :param code_depth_1: ecotope-codes of 'depth 1'
+    :param water_depth: temporal mean water depth [m]
+    :param inundated: temporal percentage of inundation [-]
+    :param frequency: annual frequency of flooding [n/yr]
+    :param config: compiled ecotope-configuration
+
+    :type code_substratum_1: numpy.ndarray
+    :type code_depth_1: numpy.ndarray
+    :type water_depth: numpy.ndarray
+    :type inundated: numpy.ndarray
+    :type frequency: numpy.ndarray
+    :type config: LabelConfig
+
+    :return: depth 2 codes
+    :rtype: numpy.ndarray
+
+    :raise NotImplementedError: if `code_depth_1` contains unknown codes
+    """
+    code_substratum_1, code_depth_1 = np.broadcast_arrays(code_substratum_1, code_depth_1)
+    water_depth = _as_array(water_depth, code_depth_1.shape)
+    inundated = _as_array(inundated, code_depth_1.shape)
+    frequency = _as_array(frequency, code_depth_1.shape)
+
+    # check validity of codes
+    hard = code_substratum_1 == '1'
+    if not np.all(np.isin(code_depth_1[~hard], ('x', '1', '2', '3'))):
+        raise NotImplementedError
+
+    # sub-littoral: water depth; littoral: inundation time; supra-littoral: flood frequency
+    sub_littoral = code_depth_1 == '1'
+    littoral = code_depth_1 == '2'
+    supra_littoral = code_depth_1 == '3'
+    return np.select(
+        [
+            hard,
+            code_depth_1 == 'x',
+            sub_littoral & np.isnan(water_depth),
+            littoral & np.isnan(inundated),
+            supra_littoral & np.isnan(frequency),
+            sub_littoral,
+            littoral,
+        ],
+        [
+            '', 'x', 'x', 'x', 'x',
+            config.depth_2_sub_littoral.classify(water_depth),
+            config.depth_2_littoral.classify(inundated),
+        ],
+        default=config.depth_2_supra_littoral.classify(frequency)
+    )
+
+
+def substratum_2_codes(
+        code_substratum_1: np.ndarray, code_hydrodynamics: np.ndarray, grain_size: typing.Optional[np.ndarray],
+        config: LabelConfig
+) -> np.ndarray:
+    """Vectorised determination of ecotope-codes in the category 'substratum 2'; see `substratum_2_code()`. Unknown
+    (i.e., masked or `numpy.nan`) grain sizes are labelled with 'x'.
+
+    :param code_substratum_1: ecotope-codes of 'substratum 1'
+    :param code_hydrodynamics: ecotope-codes of 'hydrodynamics'
+    :param grain_size: median grain size [um]
+    :param config: compiled ecotope-configuration
+
+    :type code_substratum_1: numpy.ndarray
+    :type code_hydrodynamics: numpy.ndarray
+    :type grain_size: numpy.ndarray, None
+    :type config: LabelConfig
+
+    :return: substratum 2 codes
+    :rtype: numpy.ndarray
+    """
+    code_substratum_1, code_hydrodynamics = np.broadcast_arrays(code_substratum_1, code_hydrodynamics)
+    grain_size = _as_array(grain_size, code_substratum_1.shape)
+
+    # hard substratum
+    hard = np.select(
+        [
+            code_hydrodynamics == 'x',
+            code_hydrodynamics == '1',
+        ],
+        ['x', '2'],
+        default='1'
+    )
+
+    # soft substratum
+    soft = np.where(np.isnan(grain_size), 'x', config.substratum_2_soft.classify(grain_size))
+
+    return np.select(
+        [
+            code_substratum_1 == '1',
+            code_substratum_1 == '2',
+        ],
+        [hard, soft],
+        default='x'
+    )
+
+
+# packed ecotope-labels
+
+
+class Ecotopes:
+    """Compact, integer-coded representation of ecotope-labels. Every ecotope-label is packed in a single unsigned
+    integer by combining the indices of its six label-characters in their respective alphabets (`CHARACTERS`) with a
+    mixed radix. The ecotope-labels as strings (e.g., 'Z2.222f') are only constructed on demand.
+    """
+    CHARACTERS = (
+        ('x', 'V', 'F', 'Z', 'B'),
+        ('x', '1', '2'),
+        ('x', '1', '2', '3'),
+        ('x', '1', '2', '3'),
+        ('', 'x', '1', '2', '3', '4'),
+        ('x', '1', '2', 's', 'f', 'z', 'g'),
+    )
+    _RADICES = np.array([len(c) for c in CHARACTERS])
+    _STRIDES = np.cumprod(np.r_[_RADICES[1:], 1][::-1])[::-1]
+    DTYPE = np.uint16
+
+    def __init__(self, codes: np.ndarray) -> None:
+        """
+        :param codes: packed ecotope-labels
+        :type codes: numpy.ndarray
+        """
+        self._codes = np.asarray(codes, dtype=self.DTYPE)
+
+    def __len__(self) -> int:
+        """Number of ecotope-labels."""
+        return len(self._codes)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        """Iterate over the ecotope-labels (as strings), which are constructed per batch to limit memory usage."""
+        batch = 2 ** 16
+        for i in range(0, len(self), batch):
+            yield from self[i:i + batch].labels()
+
+    def __getitem__(self, item: typing.Union[int, slice, np.ndarray]) -> typing.Union[str, 'Ecotopes']:
+        """Get ecotope-label (`int`-index) or a subset of ecotope-labels (otherwise).
+
+        :param item: index
+        :type item: int, slice, numpy.ndarray
+
+        :return: ecotope-label(s)
+        :rtype: str, Ecotopes
+        """
+        if isinstance(item, (int, np.integer)):
+            return self._label(self._codes[item])
+        return self.__class__(self._codes[item])
+
+    def __array__(self, dtype: np.dtype = None, copy: bool = None) -> np.ndarray:
+        """Ecotope-labels as array of strings, which are always newly constructed (i.e., `copy=False` is not
+        supported).
+        """
+        if copy is False:
+            msg = f'Ecotope-labels are constructed on demand; a copy of {self!r} cannot be avoided'
+            raise ValueError(msg)
+        labels = self.labels()
+        return labels if dtype is None else labels.astype(dtype, copy=False)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({len(self)} labels; {len(self.label_dictionary)} unique)'
+
+    @property
+    def codes(self) -> np.ndarray:
+        """
+        :return: packed ecotope-labels
+        :rtype: numpy.ndarray
+        """
+        return self._codes
+
+    @classmethod
+    def from_characters(cls, *characters: np.ndarray) -> 'Ecotopes':
+        """Pack the label-characters, as determined by the (vectorised) labelling functions.
+
+        :param characters: label-characters (six)
+        :type characters: numpy.ndarray
+
+        :return: packed ecotope-labels
+        :rtype: Ecotopes
+
+        :raise ValueError: if a label-character is not part of its alphabet
+        """
+        assert len(characters) == len(cls.CHARACTERS), \
+            f'Ecotope-labels consist of {len(cls.CHARACTERS)} characters; {len(characters)} given'
+
+        codes = np.zeros(np.shape(characters[0]), dtype=cls.DTYPE)
+        for i, chars in enumerate(characters):
+            codes += cls.from_position(i, chars)
+        return cls(codes)
+
+    @classmethod
+    def from_position(cls, position: int, characters: np.ndarray) -> np.ndarray:
+        """Packed contribution of the label-characters at a given position, such that the packed ecotope-labels are the
+        sum of the contributions of all positions.
+
+        :param position: position of label-character
+        :param characters: label-characters
+
+        :type position: int
+        :type characters: numpy.ndarray
+
+        :return: packed contribution
+        :rtype: numpy.ndarray
+
+        :raise ValueError: if a label-character is not part of its alphabet
+        """
+        return cls._index(position, characters).astype(cls.DTYPE) * cls.DTYPE(cls._STRIDES[position])
+
+    @classmethod
+    def from_labels(cls, labels: typing.Sequence[str]) -> 'Ecotopes':
+        """Pack ecotope-labels formatted as strings, e.g., 'Z2.222f' (soft substratum) or 'Z1.221' (hard substratum).
+
+        :param labels: ecotope-labels
+        :type labels: sequence[str]
+
+        :return: packed ecotope-labels
+        :rtype: Ecotopes
+
+        :raise ValueError: if a label-character is not part of its alphabet
+        :raise ValueError: if a label has no dot (.) as separator
+        """
+        labels = np.asarray(labels, dtype='U7')
+        chars = labels.view('U1').reshape(len(labels), -1)
+        if not np.all(chars[:, 2] == '.'):
+            msg = f'Ecotope-labels must have a dot (.) as third character: {labels[chars[:, 2] != "."][:5]}'
+            raise ValueError(msg)
+        no_depth_2 = chars[:, 6] == ''
+        return cls.from_characters(
+            chars[:, 0], chars[:, 1], chars[:, 3], chars[:, 4],
+            np.where(no_depth_2, '', chars[:, 5]),
+            np.where(no_depth_2, chars[:, 5], chars[:, 6]),
+        )
+
+    @classmethod
+    def concatenate(cls, ecotopes: typing.Iterable['Ecotopes']) -> 'Ecotopes':
+        """Concatenate packed ecotope-labels.
+
+        :param ecotopes: packed ecotope-labels
+        :type ecotopes: iterable[Ecotopes]
+
+        :return: packed ecotope-labels
+        :rtype: Ecotopes
+        """
+        return cls(np.concatenate([e.codes for e in ecotopes]))
+
+    @classmethod
+    def _index(cls, position: int, characters: np.ndarray) -> np.ndarray:
+        """Translate label-characters to their indices in the alphabet.
+
+        :param position: position of label-character
+        :param characters: label-characters
+
+        :type position: int
+        :type characters: numpy.ndarray
+
+        :return: indices
+        :rtype: numpy.ndarray
+
+        :raise ValueError: if a label-character is not part of its alphabet
+        """
+        alphabet = np.array(cls.CHARACTERS[position])
+        order = np.argsort(alphabet)
+        characters = np.asarray(characters, dtype=alphabet.dtype)
+        i_sorted = np.searchsorted(alphabet[order], characters).clip(max=len(alphabet) - 1)
+        index = order[i_sorted]
+        if not np.all(alphabet[index] == characters):
+            msg = f'Unknown label-character(s) at position {position}: {np.setdiff1d(characters, alphabet)}'
+            raise ValueError(msg)
+        return index
+
+    def character(self, position: int) -> np.ndarray:
+        """Indices of a label-character in its alphabet (`CHARACTERS[position]`).
+
+        :param position: position of label-character
+        :type position: int
+
+        :return: indices
+        :rtype: numpy.ndarray
+        """
+        return (self._codes // self._STRIDES[position] % self._RADICES[position]).astype(np.uint8)
+
+    def characters(self, position: int) -> np.ndarray:
+        """Label-characters at a given position.
+
+        :param position: position of label-character
+        :type position: int
+
+        :return: label-characters
+        :rtype: numpy.ndarray
+        """
+        return np.array(self.CHARACTERS[position])[self.character(position)]
+
+    @classmethod
+    def _label(cls, code: int) -> str:
+        """Construct a single ecotope-label from its packed representation.
+
+        :param code: packed ecotope-label
+        :type code: int
+
+        :return: ecotope-label
+        :rtype: str
+        """
+        c1, c2, c3, c4, c5, c6 = (
+            alphabet[int(code) // stride % radix]
+            for alphabet, stride, radix in zip(cls.CHARACTERS, cls._STRIDES, cls._RADICES)
+        )
+        return f'{c1}{c2}.{c3}{c4}{c5}{c6}'
+
+    @property
+    def label_dictionary(self) -> typing.Dict[int, str]:
+        """
+        :return: ecotope-labels present, with their packed representation as key
+        :rtype: dict[int, str]
+        """
+        return {int(c): self._label(c) for c in np.unique(self._codes)}
+
+    def counts(self) -> typing.Dict[str, int]:
+        """Number of instances per ecotope-label.
+
+        :return: ecotope-labels present, with their number of instances
+        :rtype: dict[str, int]
+        """
+        unique, counts = np.unique(self._codes, return_counts=True)
+        return {self._label(c): int(n) for c, n in zip(unique, counts)}
+
+    def labels(self) -> np.ndarray:
+        """Construct the ecotope-labels as strings, which only requires the unique ecotope-labels to be formatted.
+
+        :return: ecotope-labels
+        :rtype: numpy.ndarray
+        """
+        unique, inverse = np.unique(self._codes, return_inverse=True)
+        labels = np.array([self._label(c) for c in unique], dtype=str)
+        return labels[inverse].reshape(self._codes.shape)
@@ -7,24 +7,104 @@ import functools
 import json
 import logging
 import multiprocessing as mp
+import os
 import typing
 
 import numpy as np
+import shapely
 
 from shapely import geometry
 
-from src import _globals as glob
+from src import (
+    _globals as glob,
+    executors as ex,
+    labelling as lab
+)
 
 _LOG = logging.getLogger(__name__)
 
+# data type of *.csv-files with (x, y, label)-data (see `csv2arrays()`)
+_CSV_DTYPE = np.dtype([('x', np.float64), ('y', np.float64), ('label', 'U16')])
+
+
+class ConfusionMatrix(typing.NamedTuple):
+    """Confusion matrix of ground-truth (rows) and predicted (columns) classes, e.g., ecotope-labels or label-
+    characters, with metrics of their agreement.
+    """
+    classes: np.ndarray
+    matrix: np.ndarray
+
+    @property
+    def total(self) -> int:
+        """
+        :return: number of instances
+        :rtype: int
+        """
+        return int(self.matrix.sum())
+
+    @property
+    def accuracy(self) -> float:
+        """
+        :return: fraction of matching instances
+        :rtype: float
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return float(np.trace(self.matrix) / np.float64(self.total))
+
+    @property
+    def kappa(self) -> float:
+        """Cohen's kappa, i.e., the agreement corrected for the agreement expected by chance.
+
+        :return: Cohen's kappa
+        :rtype: float
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            expected = np.sum(self.matrix.sum(axis=1) * self.matrix.sum(axis=0)) / np.float64(self.total) ** 2
+            return float((self.accuracy - expected) / (1 - expected))
+
+    @property
+    def f1(self) -> np.ndarray:
+        """F1-score per class, i.e., the harmonic mean of precision and recall.
+
+        :return: F1-scores
+        :rtype: numpy.ndarray[float]
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return 2 * np.diag(self.matrix) / (self.matrix.sum(axis=1) + self.matrix.sum(axis=0))
+
+    @property
+    def macro_f1(self) -> float:
+        """
+        :return: unweighted mean of F1-scores of all classes
+        :rtype: float
+        """
+        return float(np.mean(self.f1)) if len(self.classes) else np.nan
+
+
+class ComparisonReport(typing.NamedTuple):
+    """Report of the comparison at all levels of detail (see `Comparison.report()`): the agreement per cumulative level
+    (`cumulative[i]` reflects `label[:i + 1]`) and per label-character (`specific[i]` reflects `label[i]`), and the
+    confusion matrices per label-character and of the full ecotope-labels.
+    """
+    cumulative: np.ndarray
+    specific: np.ndarray
+    characters: typing.List[ConfusionMatrix]
+    labels: ConfusionMatrix
+
 
 class Comparison:
     """Compare ecotope-map(s) considered as ground-truth to the map(s) as predicted by `EMMA` from hydrodynamic model
     results.
+
+    The (x,y)-coordinates of both maps are joined once, upon initiation, after which the ecotope-labels of the common
+    (x,y)-coordinates are compared character-wise as arrays: the comparison per level of detail is determined for all
+    levels at once, such that repeated executions (e.g., for different levels) are inexpensive.
     """
     _TypeXYLabel = glob.TypeXYLabel
 
-    def __init__(self, data: _TypeXYLabel, model: _TypeXYLabel, **kwargs) -> None:
+    def __init__(
+            self, data: typing.Union[_TypeXYLabel, tuple], model: typing.Union[_TypeXYLabel, tuple], **kwargs
+    ) -> None:
         """Both `data` and `model` must be formatted as follows: (x,y)-coordinates as key, and the ecotope-label as
         value (`str`). This corresponds with the formatting of the returned `dict` by `map_ecotopes()` (from
         `src.processing`).
@@ -32,44 +112,73 @@ class Comparison:
         ...     (0, 0): 'Z2.222f',
         ... }
 
+        Alternatively, `data` and `model` may be formatted as a tuple of arrays, i.e., (x, y, ecotopes), in which the
+        ecotope-labels may be packed (`src.labelling.Ecotopes`). This corresponds with the formatting of the returned
+        `tuple` by `map_ecotopes()` (from `src.processing`) when `return_ecotopes` is either 'tuple' or 'packed'.
+
+        By default, the (x,y)-coordinates of `data` and `model` must be exactly equal to be compared. When a `tolerance`
+        is specified, every (x,y)-coordinate of `data` is matched to the nearest (x,y)-coordinate of `model` within this
+        distance instead, e.g., to compare grids exported with different precisions (requires `scipy`).
+
         :param data: ground-truth ecotope-labels
         :param model: predicted ecotope-labels
         :param kwargs: optional arguments
+            tolerance: maximum distance between matching (x,y)-coordinates, defaults to None
             wild_card: wild-card character in ecotope-labels, defaults to 'x'
 
-        :type data: dict[tuple[float, float], str]
-        :type model: dict[tuple[float, float], str]
+        :type data: dict[tuple[float, float], str], tuple
+        :type model: dict[tuple[float, float], str], tuple
         :type kwargs: optional
+            tolerance: float
             wild_card: str
+
+        :raises ValueError: if `tolerance` is negative
+        :raises ImportError: if `tolerance` is specified and `scipy` is not installed
         """
         # initiate required arguments
-        self._data = data
-        self._model = model
+        self._input = data, model
 
         # initiate optional arguments
         self.wild_card: str = kwargs.get('wild_card', 'x')
+        tolerance: float = kwargs.get('tolerance')
+
+        # join (x,y)-coordinates
+        x_data, y_data, self._data_labels = _as_arrays(data)
+        x_model, y_model, self._model_labels = _as_arrays(model)
+        self._index, n_data, n_model = _join(x_data + 1j * y_data, x_model + 1j * y_model, tolerance=tolerance)
+        self._xy = list(zip(x_data[self._index[0]].tolist(), y_data[self._index[0]].tolist()))
+        self._matches: typing.Dict[typing.Union[str, bool], np.ndarray] = dict()
 
         # non-overlapping data
-        if not all(k in data for k in model):
+        if len(np.unique(self._index[1])) < n_model:
             _LOG.warning('Not all (x,y)-coordinates in `model` are present in `data`')
-        if not all(k in model for k in data):
+        if len(self._index[0]) < n_data:
             _LOG.warning('Not all (x,y)-coordinates in `data` are present in `model`')
 
-    @property
+    @functools.cached_property
     def data(self) -> _TypeXYLabel:
         """
         :return: ground-truth ecotope-labels
         :rtype: dict[tuple[float, float], str]
         """
-        return self._data
+        return _as_grid(self._input[0])
 
-    @property
+    @functools.cached_property
     def model(self) -> _TypeXYLabel:
         """
         :return: predicted ecotope-labels
         :rtype: dict[tuple[float, float], str]
         """
-        return self._model
+        return _as_grid(self._input[1])
+
+    @property
+    def aligned(self) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Ecotope-labels at the (x,y)-coordinates present in both `data` and `model`, in order of `data`.
+
+        :return: ground-truth and predicted ecotope-labels
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        return _subset(self._data_labels, self._index[0]), _subset(self._model_labels, self._index[1])
 
     def exec(self, level: typing.Union[int, None], **kwargs) -> glob.TypeXYBool:
         """Execute the comparison up to a given level of detail. This level of detail reflects the number of label-
@@ -97,62 +206,384 @@ class Comparison:
 
         :raises ValueError: if `level` exceeds ecotope-label components (if `specific_label=True`)
         :raises ValueError: if `level` is negative
-        :raises AssertionError: if (x,y)-coordinates, ground-truth ecotope-labels, and predicted ecotope-labels have
-            mismatching sizes
         """
         # optional arguments
         enable_wild_card: bool = kwargs.get('enable_wild_card', True)
         specific_label: bool = kwargs.get('specific_label', False)
 
-        # full assessment
-        if level is None:
-            level = 6
-
-        # check validity `level`-argument
-        if specific_label and (not 0 <= level <= 5):
-            msg = f'Ecotope-labels consists of six (6) items; ' \
-                  f'specific label comparison at index {level} is out of range'
-            raise ValueError(msg)
-        if level < 0:
-            msg = f'Level of comparison must be positive, negative value given: {level}'
-            raise ValueError(msg)
-
-        # filter and pack data: only (x,y)-coordinates present in data
-        filtered = [(k, v, self.model[k]) for k, v in self.data.items() if k in self.model]
-
-        # unpack filtered data
-        xy, data, model = zip(*filtered)
-        assert len(xy) == len(data) == len(model), \
-            f'Sizes of (x,y)-coordinates, ground-truth ecotope-labels, and predicted ecotope-labels must be equal; ' \
-            f'respective sizes are {len(xy)}, {len(data)}, and {len(model)}'
-
-        # decompose labels
-        data = np.array(data).view('U1').reshape(len(data), -1)
-        model = np.array(model).view('U1').reshape(len(model), -1)
-
-        # remove dot from labels (if present)
-        data = data[:, ~np.all(data == '.', axis=0)]
-        model = model[:, ~np.all(model == '.', axis=0)]
-
-        # append empty string to match label-sizes (if required)
-        if data.shape < model.shape:
-            data = np.append(data, np.empty((len(data), 1), dtype=str), axis=1)
-        elif data.shape > model.shape:
-            model = np.append(model, np.empty((len(model), 1), dtype=str), axis=1)
-
         # compare labels
-        wild_card = self.wild_card if enable_wild_card else False
-        if specific_label:
-            result = (data[:, level] == model[:, level]) | (data[:, level] == wild_card)
-        else:
-            result = np.all((data[:, :level] == model[:, :level]) | (data[:, :level] == wild_card), axis=1)
+        matches = self._character_matches(self.wild_card if enable_wild_card else False)
+        result = _select_level(matches, level, specific_label=specific_label)
 
         # return spatial performance
-        return dict(zip(xy, result))
+        return dict(zip(self._xy, result.tolist()))
+
+    def report(self, **kwargs) -> ComparisonReport:
+        """Execute the comparison at all levels of detail at once, i.e., the agreement up to every level (cf.
+        `.exec(level)`) and of every label-character (cf. `.exec(level, specific_label=True)`), as fractions of the
+        (x,y)-coordinates compared. In addition, the confusion matrices per label-character and of the full ecotope-
+        labels are determined; these are based on the labels as given, i.e., a wild card is a class of its own. Levels
+        absent from all ecotope-labels (e.g., hard substratum only) have an agreement of NaN and a confusion matrix of
+        the empty class.
+
+        :param kwargs: optional arguments
+            enable_wild_card: the wild card character reflects a match, defaults to True
+
+        :type kwargs: optional
+            enable_wild_card: bool
+
+        :return: comparison report
+        :rtype: ComparisonReport
+        """
+        # optional arguments
+        enable_wild_card: bool = kwargs.get('enable_wild_card', True)
+
+        # agreement per level
+        matches = self._character_matches(self.wild_card if enable_wild_card else False)[:, :6]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cumulative = np.count_nonzero(np.logical_and.accumulate(matches, axis=1), axis=0) / len(matches)
+            specific = np.count_nonzero(matches, axis=0) / len(matches)
+
+        # levels absent from all ecotope-labels (e.g., hard substratum only)
+        n_missing = 6 - matches.shape[1]
+        cumulative = np.pad(cumulative, (0, n_missing), constant_values=np.nan)
+        specific = np.pad(specific, (0, n_missing), constant_values=np.nan)
+
+        # confusion matrices: per label-character (as character codes), absent characters form an empty class
+        data, model = self.aligned
+        label_codes = [np.pad(c, ((0, 0), (0, max(6 - c.shape[1], 0))))[:, :6] for c in _character_codes(data, model)]
+        characters = []
+        for codes in zip(*(c.T for c in label_codes)):
+            cm = confusion_matrix(*codes)
+            classes = np.array([chr(c) if c else '' for c in cm.classes], dtype=str)
+            characters.append(ConfusionMatrix(classes, cm.matrix))
+
+        # return comparison report
+        return ComparisonReport(cumulative, specific, characters, confusion_matrix(data, model))
+
+    def _character_matches(self, wild_card: typing.Union[str, bool]) -> np.ndarray:
+        """Character-wise comparison of the ecotope-labels, which is determined once per wild card.
+
+        :param wild_card: wild-card character in ground-truth ecotope-labels (or `False` to disable)
+        :type wild_card: str, bool
+
+        :return: matching characters
+        :rtype: numpy.ndarray[bool]
+        """
+        if wild_card not in self._matches:
+            self._matches[wild_card] = _match_characters(*self.aligned, wild_card=wild_card)
+        return self._matches[wild_card]
+
+
+def compare_labels(
+        data: typing.Sequence[str], model: typing.Sequence[str], level: typing.Union[int, None], **kwargs
+) -> np.ndarray:
+    """Compare ground-truth and predicted ecotope-labels up to a given level of detail (see `Comparison.exec()`).
+
+    :param data: ground-truth ecotope-labels
+    :param model: predicted ecotope-labels
+    :param level: level of assessment, when `None` full assessment is executed
+    :param kwargs: optional arguments
+        specific_label: assess a specific label only (defined by `level`), defaults to False
+        wild_card: wild-card character in ground-truth ecotope-labels (or `False` to disable), defaults to 'x'
+
+    :type data: sequence[str]
+    :type model: sequence[str]
+    :type level: int
+    :type kwargs: optional
+        specific_label: bool
+        wild_card: str, bool
+
+    :return: matching ecotope-labels
+    :rtype: numpy.ndarray[bool]
+
+    :raises ValueError: if `level` exceeds ecotope-label components (if `specific_label=True`)
+    :raises ValueError: if `level` is negative
+    """
+    # optional arguments
+    specific_label: bool = kwargs.get('specific_label', False)
+    wild_card: typing.Union[str, bool] = kwargs.get('wild_card', 'x')
+
+    # compare labels
+    _validate_level(level, specific_label)
+    matches = _match_characters(data, model, wild_card=wild_card)
+    return _select_level(matches, level, specific_label=specific_label)
+
+
+def confusion_matrix(data: typing.Sequence, model: typing.Sequence) -> ConfusionMatrix:
+    """Confusion matrix of ground-truth and predicted classes, e.g., ecotope-labels. The classes are encoded as integers
+    (`numpy.unique()`), such that the confusion matrix is counted at once (`numpy.bincount()`); classes that already
+    are small integers (`uint8`), e.g., character codes, are counted directly.
+
+    :param data: ground-truth classes
+    :param model: predicted classes
+
+    :type data: sequence
+    :type model: sequence
+
+    :return: confusion matrix
+    :rtype: ConfusionMatrix
+    """
+    data, model = np.asarray(data), np.asarray(model)
+
+    # small integers
+    if data.dtype == model.dtype == np.uint8:
+        n_classes = np.iinfo(np.uint8).max + 1
+        matrix = np.bincount(data.astype(int) * n_classes + model, minlength=n_classes ** 2)
+        matrix = matrix.reshape(n_classes, n_classes)
+        present = matrix.any(axis=0) | matrix.any(axis=1)
+        return ConfusionMatrix(np.flatnonzero(present).astype(np.uint8), matrix[np.ix_(present, present)])
+
+    # other classes
+    classes, inverse = np.unique(np.concatenate([data, model]), return_inverse=True)
+    n_classes = len(classes)
+    matrix = np.bincount(inverse[:len(data)] * n_classes + inverse[len(data):], minlength=n_classes ** 2)
+    return ConfusionMatrix(classes, matrix.reshape(n_classes, n_classes))
+
+
+def _validate_level(level: typing.Union[int, None], specific_label: bool) -> None:
+    """Check validity of the level of assessment.
+
+    :param level: level of assessment, when `None` full assessment is executed
+    :param specific_label: assess a specific label only (defined by `level`)
+
+    :type level: int, None
+    :type specific_label: bool
+
+    :raises ValueError: if `level` exceeds ecotope-label components (if `specific_label=True`)
+    :raises ValueError: if `level` is negative
+    """
+    # full assessment
+    if level is None:
+        level = 6
+
+    if specific_label and (not 0 <= level <= 5):
+        msg = f'Ecotope-labels consists of six (6) items; ' \
+              f'specific label comparison at index {level} is out of range'
+        raise ValueError(msg)
+    if level < 0:
+        msg = f'Level of comparison must be positive, negative value given: {level}'
+        raise ValueError(msg)
+
+
+def _characters(labels: typing.Sequence[str]) -> np.ndarray:
+    """Decompose ecotope-labels into their characters, as a matrix of character codes without the dots (.). Missing
+    characters of shorter labels are zero. The character codes are stored as `uint8` for (regular) ASCII-labels.
+
+    :param labels: ecotope-labels
+    :type labels: sequence[str]
+
+    :return: character codes
+    :rtype: numpy.ndarray[uint8], numpy.ndarray[uint32]
+    """
+    labels = np.asarray(labels, dtype=str)
+    codes = labels.view(np.uint32).reshape(len(labels), labels.itemsize // 4)
+    if codes.size and codes.max() <= np.iinfo(np.uint8).max:
+        codes = codes.astype(np.uint8)
+
+    # remove dot from labels (if present)
+    return codes[:, ~np.all(codes == ord('.'), axis=0)]
+
+
+def _character_codes(
+        data: typing.Sequence[str], model: typing.Sequence[str]
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Decompose ground-truth and predicted ecotope-labels into matrices of character codes of equal size (see
+    `_characters()`).
+
+    :param data: ground-truth ecotope-labels
+    :param model: predicted ecotope-labels
+
+    :type data: sequence[str]
+    :type model: sequence[str]
+
+    :return: character codes of ground-truth and predicted ecotope-labels
+    :rtype: tuple[numpy.ndarray, numpy.ndarray]
+    """
+    data, model = _characters(data), _characters(model)
+
+    # append empty characters to match label-sizes (if required)
+    n_characters = max(data.shape[1], model.shape[1])
+    data = np.pad(data, ((0, 0), (0, n_characters - data.shape[1])))
+    model = np.pad(model, ((0, 0), (0, n_characters - model.shape[1])))
+    return data, model
+
+
+def _match_characters(
+        data: typing.Sequence[str], model: typing.Sequence[str], wild_card: typing.Union[str, bool]
+) -> np.ndarray:
+    """Character-wise comparison of ground-truth and predicted ecotope-labels.
+
+    :param data: ground-truth ecotope-labels
+    :param model: predicted ecotope-labels
+    :param wild_card: wild-card character in ground-truth ecotope-labels (or `False` to disable)
+
+    :type data: sequence[str]
+    :type model: sequence[str]
+    :type wild_card: str, bool
+
+    :return: matching characters
+    :rtype: numpy.ndarray[bool]
+    """
+    data, model = _character_codes(data, model)
+
+    # compare characters
+    matches = data == model
+    if wild_card:
+        matches |= data == ord(wild_card)
+    return matches
+
+
+def _select_level(matches: np.ndarray, level: typing.Union[int, None], specific_label: bool = False) -> np.ndarray:
+    """Matching ecotope-labels up to a given level of detail, based on their matching characters.
+
+    :param matches: matching characters
+    :param level: level of assessment, when `None` full assessment is executed
+    :param specific_label: assess a specific label only (defined by `level`), defaults to False
+
+    :type matches: numpy.ndarray[bool]
+    :type level: int, None
+    :type specific_label: bool, optional
+
+    :return: matching ecotope-labels
+    :rtype: numpy.ndarray[bool]
+
+    :raises ValueError: if `level` exceeds ecotope-label components (if `specific_label=True`)
+    :raises ValueError: if `level` is negative
+    """
+    _validate_level(level, specific_label)
+    if specific_label:
+        return matches[:, level]
+    return np.all(matches[:, :6 if level is None else level], axis=1)
+
+
+def _as_grid(ecotopes: typing.Union[glob.TypeXYLabel, tuple]) -> glob.TypeXYLabel:
+    """Format the spatial distribution of ecotopes as {(x, y): label}-formatted data.
+
+    :param ecotopes: spatial distribution of ecotope-labels, either formatted as {(x, y): label} or (x, y, labels)
+    :type ecotopes: src._globals.TypeXYLabel, tuple
+
+    :return: spatial distribution of ecotope-labels
+    :rtype: src._globals.TypeXYLabel
+    """
+    if isinstance(ecotopes, dict):
+        return ecotopes
+
+    x, y, labels = ecotopes
+    return dict(zip(zip(x, y), labels))
+
+
+def _as_arrays(ecotopes: typing.Union[glob.TypeXYLabel, tuple]) -> typing.Tuple[np.ndarray, np.ndarray, typing.Any]:
+    """Format the spatial distribution of ecotopes as (x, y, labels)-formatted data.
+
+    :param ecotopes: spatial distribution of ecotope-labels, either formatted as {(x, y): label} or (x, y, labels)
+    :type ecotopes: src._globals.TypeXYLabel, tuple
+
+    :return: x-coordinates, y-coordinates, and ecotope-labels
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, any]
+    """
+    if isinstance(ecotopes, dict):
+        x, y = np.array(list(ecotopes), dtype=float).reshape(-1, 2).T
+        return x, y, list(ecotopes.values())
+
+    x, y, labels = ecotopes
+    return np.asarray(x, dtype=float), np.asarray(y, dtype=float), labels
+
+
+def _join(
+        xy_data: np.ndarray, xy_model: np.ndarray, tolerance: float = None
+) -> typing.Tuple[typing.Tuple[np.ndarray, np.ndarray], int, int]:
+    """Join the (x,y)-coordinates of the ground-truth and predicted ecotope-labels, packed as complex numbers (x + iy).
+    Coordinates that are present multiple times are represented by their last occurrence, as is the case for a `dict`.
+
+    :param xy_data: (x,y)-coordinates of ground-truth
+    :param xy_model: (x,y)-coordinates of prediction
+    :param tolerance: maximum distance between matching (x,y)-coordinates (see `_nearest()`), defaults to None
+
+    :type xy_data: numpy.ndarray[complex]
+    :type xy_model: numpy.ndarray[complex]
+    :type tolerance: float, optional
+
+    :return: indices of common (x,y)-coordinates in ground-truth and prediction (in order of ground-truth), and the
+        numbers of unique (x,y)-coordinates of ground-truth and prediction
+    :rtype: tuple[tuple[numpy.ndarray, numpy.ndarray], int, int]
+
+    :raises ValueError: if `tolerance` is negative
+    :raises ImportError: if `tolerance` is specified and `scipy` is not installed
+    """
+    # unique coordinates: last occurrence
+    unique_data, i_data = np.unique(xy_data[::-1], return_index=True)
+    unique_model, i_model = np.unique(xy_model[::-1], return_index=True)
+    i_data, i_model = len(xy_data) - 1 - i_data, len(xy_model) - 1 - i_model
+
+    # common coordinates
+    if tolerance is None:
+        _, i, j = np.intersect1d(unique_data, unique_model, assume_unique=True, return_indices=True)
+    else:
+        i, j = _nearest(unique_data, unique_model, tolerance)
+    order = np.argsort(i_data[i])
+    return (i_data[i][order], i_model[j][order]), len(unique_data), len(unique_model)
+
+
+def _nearest(
+        xy_data: np.ndarray, xy_model: np.ndarray, tolerance: float
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Match the (x,y)-coordinates of the ground-truth to the nearest (x,y)-coordinates of the prediction within a
+    given distance (inclusive), using a KD-tree of the prediction (`scipy.spatial.cKDTree`).
+
+    :param xy_data: (x,y)-coordinates of ground-truth
+    :param xy_model: (x,y)-coordinates of prediction
+    :param tolerance: maximum distance between matching (x,y)-coordinates
+
+    :type xy_data: numpy.ndarray[complex]
+    :type xy_model: numpy.ndarray[complex]
+    :type tolerance: float
+
+    :return: indices of matching (x,y)-coordinates in ground-truth and prediction
+    :rtype: tuple[numpy.ndarray, numpy.ndarray]
+
+    :raises ValueError: if `tolerance` is negative
+    :raises ImportError: if `scipy` is not installed
+    """
+    if tolerance < 0:
+        msg = f'Tolerance of matching (x,y)-coordinates must be non-negative; {tolerance} is given'
+        raise ValueError(msg)
+
+    try:
+        from scipy import spatial  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        msg = 'Matching (x,y)-coordinates within a `tolerance` requires `scipy`; install it by `pip install scipy`'
+        raise ImportError(msg) from e
+
+    if len(xy_data) == 0 or len(xy_model) == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+
+    # nearest neighbours within tolerance
+    tree = spatial.cKDTree(np.column_stack([xy_model.real, xy_model.imag]))
+    distance, j = tree.query(np.column_stack([xy_data.real, xy_data.imag]))
+    i = np.flatnonzero(distance <= tolerance)
+    return i, j[i]
+
+
+def _subset(labels: typing.Any, index: np.ndarray) -> np.ndarray:
+    """Subset of ecotope-labels, which are constructed as strings in case of packed ecotope-labels.
+
+    :param labels: ecotope-labels
+    :param index: indices of subset
+
+    :type labels: sequence, numpy.ndarray, src.labelling.Ecotopes
+    :type index: numpy.ndarray
+
+    :return: subset of ecotope-labels
+    :rtype: numpy.ndarray
+    """
+    if isinstance(labels, lab.Ecotopes):
+        return labels[index].labels()
+    return np.asarray(labels)[index]
 
 
 def csv2grid(file: str) -> glob.TypeXYLabel:
-    """Transform *.csv-file with (x, y, label)-data to {(x, y): label}-formatted data.
+    """Transform *.csv-file with (x, y, label)-data to {(x, y): label}-formatted data (see `csv2arrays()`).
 
     :param file: *.csv-file
     :type file: str
@@ -162,20 +593,141 @@ def csv2grid(file: str) -> glob.TypeXYLabel:
 
     :raises ValueError: if *.csv-file does not contain three (3) columns: x, y, label
     """
-    # read file
-    with open(file, mode='r') as f:
-        data = [line.rstrip().split(',') for line in f.readlines()]
+    x, y, labels = csv2arrays(file)
+    return dict(zip(zip(x.tolist(), y.tolist()), labels))
+
+
+def csv2arrays(file: str, **kwargs) -> typing.Tuple[np.ndarray, np.ndarray, typing.Union[lab.Ecotopes, np.ndarray]]:
+    """Read *.csv-file with (x, y, label)-data, e.g., as exported by `src.export.export2csv()`, as typed arrays. The
+    file is parsed in chunks (`numpy.loadtxt()`) into pre-allocated arrays, which are optionally memory-mapped (i.e.,
+    stored as *.npy-files in `mmap_dir`). The ecotope-labels are returned packed (`src.labelling.Ecotopes`), unless
+    the file contains labels that are not ecotope-labels.
+
+    :param file: *.csv-file
+    :param kwargs: optional arguments
+        chunk_size: number of rows per chunk, defaults to 2 ** 18
+        mmap_dir: directory of memory-mapped arrays (x-, y-coordinates, packed ecotope-labels), defaults to None
+
+    :type file: str
+    :type kwargs: optional
+        chunk_size: int
+        mmap_dir: str
+
+    :return: x-, y-coordinates, and (packed) ecotope-labels
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, src.labelling.Ecotopes | numpy.ndarray]
+
+    :raises ValueError: if *.csv-file does not contain three (3) columns: x, y, label
+    """
+    # optional arguments
+    chunk_size: int = kwargs.get('chunk_size', 2 ** 18)
+    mmap_dir: str = kwargs.get('mmap_dir')
 
     # check file content
-    if not len(data[0]) == 3:
-        msg = f'CSV-file must contain three (3) columns (x, y, label); {len(data[0])} given'
+    with open(file, mode='r') as f:
+        n_columns = len(f.readline().split(','))
+    if not n_columns == 3:
+        msg = f'CSV-file must contain three (3) columns (x, y, label); {n_columns} given'
         raise ValueError(msg)
 
-    # transform data
-    result = {(p[0], p[1]): p[2] for p in data}
+    # pre-allocate arrays
+    n_rows = _count_rows(file)
+    x = _allocate(n_rows, np.float64, mmap_dir, 'x')
+    y = _allocate(n_rows, np.float64, mmap_dir, 'y')
+    codes = _allocate(n_rows, lab.Ecotopes.DTYPE, mmap_dir, 'ecotopes')
+    labels = None
+
+    # read file: per chunk
+    i = 0
+    with open(file, mode='r') as f:
+        while i < n_rows:
+            chunk = np.loadtxt(
+                f, delimiter=',', dtype=_CSV_DTYPE, comments=None, max_rows=min(chunk_size, n_rows - i), ndmin=1
+            )
+            if len(chunk) == 0:
+                break
+            x[i:i + len(chunk)] = chunk['x']
+            y[i:i + len(chunk)] = chunk['y']
+
+            # ecotope-labels: packed until a label is not an ecotope-label
+            if labels is None:
+                try:
+                    codes[i:i + len(chunk)] = _pack_labels(chunk['label'])
+                except ValueError:
+                    labels = [lab.Ecotopes(codes[:i]).labels()]
+            if labels is not None:
+                labels.append(chunk['label'])
+            i += len(chunk)
+    _LOG.info(f'Rows read from {file}: {i}')
+
+    # packed ecotope-labels
+    if labels is None:
+        return x[:i], y[:i], lab.Ecotopes(codes[:i])
+
+    # other labels: re-read if truncated
+    labels = np.concatenate(labels)
+    if np.any(np.char.str_len(labels) == _CSV_DTYPE['label'].itemsize // 4):
+        labels = np.loadtxt(file, delimiter=',', dtype=str, comments=None, usecols=2, ndmin=1)
+    return x[:i], y[:i], labels
+
+
+def _count_rows(file: str, block_size: int = 2 ** 24) -> int:
+    """Count the number of rows of a file, i.e., its line breaks (and a final line without line break), which is read
+    in binary blocks.
+
+    :param file: file name
+    :param block_size: size of blocks [bytes], defaults to 2 ** 24
+
+    :type file: str
+    :type block_size: int, optional
+
+    :return: number of rows
+    :rtype: int
+    """
+    n_rows, last = 0, b'\n'
+    with open(file, mode='rb') as f:
+        for block in iter(functools.partial(f.read, block_size), b''):
+            n_rows += block.count(b'\n')
+            last = block[-1:]
+    return n_rows + (last != b'\n')
 
-    # return transformed data
-    return result
+
+def _allocate(size: int, dtype: typing.Union[type, np.dtype], directory: str = None, name: str = None) -> np.ndarray:
+    """Allocate a one-dimensional array, which is memory-mapped as *.npy-file if a directory is specified.
+
+    :param size: size of array
+    :param dtype: data type of array
+    :param directory: directory of memory-mapped array, defaults to None
+    :param name: name of memory-mapped array, defaults to None
+
+    :type size: int
+    :type dtype: type, numpy.dtype
+    :type directory: str, optional
+    :type name: str, optional
+
+    :return: (memory-mapped) array
+    :rtype: numpy.ndarray
+    """
+    if directory is None:
+        return np.empty(size, dtype=dtype)
+    os.makedirs(directory, exist_ok=True)
+    return np.lib.format.open_memmap(os.path.join(directory, f'{name}.npy'), mode='w+', dtype=dtype, shape=(size,))
+
+
+def _pack_labels(labels: np.ndarray) -> np.ndarray:
+    """Pack ecotope-labels formatted as strings, which fails for labels that are not ecotope-labels.
+
+    :param labels: ecotope-labels
+    :type labels: numpy.ndarray[str]
+
+    :return: packed ecotope-labels
+    :rtype: numpy.ndarray
+
+    :raises ValueError: if a label is not an ecotope-label
+    """
+    if len(labels) and np.char.str_len(labels).max() > 7:
+        msg = 'Ecotope-labels consist of at most seven (7) characters'
+        raise ValueError(msg)
+    return lab.Ecotopes.from_labels(labels).codes
 
 
 def points_in_feature(feature: dict, points: typing.Collection[geometry.Point], **kwargs) -> glob.TypeXYLabel:
@@ -200,129 +752,172 @@ def points_in_feature(feature: dict, points: typing.Collection[geometry.Point],
     # optional arguments
     quick_check: bool = kwargs.get('quick_check', False)
 
-    # extract polygons
-    polygons = feature['geometry']['coordinates']
-
-    # initiate output
-    result = dict()
+    # grid coordinates
+    x, y = shapely.get_coordinates(list(points)).T
+    polygon = _feature_polygon(feature)
 
     # skip if none of the grid points is within the squared polygon
-    if quick_check and not _quick_pif(points, polygons):
-        return result
+    x_min, y_min, x_max, y_max = polygon.bounds
+    if quick_check and not np.any((x > x_min) & (x < x_max) & (y > y_min) & (y < y_max)):
+        return dict()
 
-    # extract ecotope-label
+    # determine if points are in polygon
+    inside = shapely.contains_xy(polygon, x, y)
+    label = _feature_label(feature)
+    return {xy: label for xy in zip(x[inside].tolist(), y[inside].tolist())}
+
+
+def _feature_polygon(feature: dict) -> geometry.base.BaseGeometry:
+    """Polygon of a feature, of which the first ring is the exterior and the other rings are its interiors, i.e.,
+    holes. GeoJSON-features with a `type` (e.g., 'MultiPolygon') are converted as such.
+
+    :param feature: polygon-based description of spatial distribution of an ecotope
+    :type feature: dict
+
+    :return: polygon
+    :rtype: shapely.geometry.base.BaseGeometry
+    """
+    if 'type' in feature['geometry']:
+        return geometry.shape(feature['geometry'])
+    shell, *holes = feature['geometry']['coordinates']
+    return geometry.Polygon(shell, holes)
+
+
+def _feature_label(feature: dict) -> str:
+    """Ecotope-label of a feature, where 'overig' (i.e., other) is translated to a label of wild cards.
+
+    :param feature: polygon-based description of spatial distribution of an ecotope
+    :type feature: dict
+
+    :return: ecotope-label
+    :rtype: str
+    """
     label = feature['properties']['zes_code']
-    if label == 'overig':
-        label = 'xx.xxx'
-
-    # create `shapely.geometry.Polygon`-objects
-    polygons = [geometry.Polygon(polygon) for polygon in polygons]
-
-    # determine if points are in stacked polygons
-    for point in points:
-        # point in separate polygons
-        inside_separate = [polygon.contains(point) for polygon in polygons]
-        # point in stacked polygons
-        inside_stacked = functools.reduce(lambda a, b: a ^ b, inside_separate)
-        # append point to result (if in stacked polygons)
-        if inside_stacked:
-            result[(point.x, point.y)] = label
-
-    # return labeled feature
+    return 'xx.xxx' if label == 'overig' else label
+
+
+def _points_in_polygons(x: np.ndarray, y: np.ndarray, polygons: np.ndarray) -> np.ndarray:
+    """Determine for every grid-point the polygon in which it is located, using a spatial index (`shapely.STRtree`) of
+    the polygons: only the polygons of which the bounding box contains a grid-point are tested. When a grid-point is
+    within multiple (overlapping) polygons, the last polygon is assigned.
+
+    :param x: x-coordinates of grid-points
+    :param y: y-coordinates of grid-points
+    :param polygons: polygons
+
+    :type x: numpy.ndarray
+    :type y: numpy.ndarray
+    :type polygons: numpy.ndarray[shapely.geometry.base.BaseGeometry]
+
+    :return: index of polygon per grid-point, `-1` if not in any polygon
+    :rtype: numpy.ndarray[int]
+    """
+    # candidates: bounding boxes of polygons
+    tree = shapely.STRtree(polygons)
+    i_point, i_polygon = tree.query(shapely.points(x, y))
+
+    # grid-points in polygons
+    shapely.prepare(polygons)
+    inside = shapely.contains_xy(polygons[i_polygon], x[i_point], y[i_point])
+
+    # last polygon per grid-point
+    result = np.full(len(x), -1)
+    np.maximum.at(result, i_point[inside], i_polygon[inside])
     return result
 
 
-def _quick_pif(points: typing.Collection[geometry.Point], polygons: list) -> bool:
-    """Perform a quick check whether the grid-points are within the polygon by squaring the polygon.
+def _grid_coordinates(
+        f_grid: typing.Optional[str], grid: typing.Optional[glob.TypeXY]
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Coordinates of the grid-points, either from a file or as given (see `polygons2grid()`).
 
-    :param points: grid-points from the hydrodynamic model as a collection of `shapely.geometry.Point`-objects
-    :param polygons: polygon-definitions
+    :param f_grid: file name of grid-data
+    :param grid: grid-data
 
-    :type points: collection[shapely.geometry.Point]
-    :type polygons: list
+    :type f_grid: str, None
+    :type grid: src._globals.TypeXY, None
 
-    :return: quick-check
-    :rtype: bool
+    :return: x- and y-coordinates of grid-points
+    :rtype: tuple[numpy.ndarray, numpy.ndarray]
     """
-    # grid coordinates
-    grid_x = np.array([p.x for p in points])
-    grid_y = np.array([p.y for p in points])
+    if f_grid:
+        x, y, _ = csv2arrays(f_grid)
+    else:
+        x, y = np.array(list(grid), dtype=float).reshape(-1, 2).T
+    return x, y
 
-    # loop over polygons
-    grid_in_polygon = False
-    for polygon in polygons:
-        if len(polygon[0]) > 2:
-            polygon = sum(lst for lst in polygon)
-        x, y = zip(*polygon)
 
-        # any grid-point in square shaped polygon
-        if np.any(((grid_x > min(x)) & (grid_x < max(x))) & ((grid_y > min(y)) & (grid_y < max(y)))):
-            grid_in_polygon = True
-            break
+def _polygon_features(f_polygons: str) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Polygons and ecotope-labels of the features in a polygon-data file. The ecotope-labels end with an empty label,
+    which is assigned to grid-points outside all polygons (i.e., index `-1`).
 
-    return grid_in_polygon
+    :param f_polygons: file name of polygon-data
+    :type f_polygons: str
+
+    :return: polygons and ecotope-labels
+    :rtype: tuple[numpy.ndarray[shapely.geometry.base.BaseGeometry], numpy.ndarray[str]]
+    """
+    with open(f_polygons, mode='r') as f:
+        features = json.load(f)['features']
+
+    polygons = np.array([_feature_polygon(f) for f in features], dtype=object)
+    labels = np.array([_feature_label(f) for f in features] + [''], dtype=object)
+    return polygons, labels
 
 
 def polygons2grid(f_polygons: str, f_grid: str = None, grid: glob.TypeXY = None, **kwargs) -> glob.TypeXYLabel:
-    """Transform polygon data to grid-points by determining which grid-points are within every polygon.
+    """Transform polygon data to grid-points by determining which grid-points are within every polygon. The polygons are
+    spatially indexed (`shapely.STRtree`), such that every grid-point is only tested against the polygons of which the
+    bounding box contains it; when a grid-point is within multiple (overlapping) polygons, the ecotope-label of the last
+    feature is assigned.
 
     :param f_polygons: file name of polygon-data
     :param f_grid: file name of grid-data, defaults to None
     :param grid: grid-data, defaults to None
     :param kwargs: optional arguments
+        executor: executor of the (parallel) computations, defaults to 'processes' if `n_cores > 1`, and 'serial'
+            otherwise
+            options: {'serial', 'threads', 'processes', 'dask'}
         n_cores: number of cores available for parallel computing, defaults to 1
-        quick_check: perform a crude check if the grid-points can be within a polygon by drawing a rectangle around the
-            polygon, defaults to False
 
     :type f_polygons: str
     :type f_grid: str, optional
     :type grid: src._globals.TypeXY, optional
     :type kwargs: optional
+        executor: str
         n_cores: int
-        quick_check: bool
 
     :return: spatial distribution of ecotope-labels
     :rtype: src._globals.TypeXYLabel
 
     :raises ValueError: if both or none of `f_grid` and `grid` are defined
+    :raises ValueError: if `executor` not in {'serial', 'threads', 'processes', 'dask'}
     """
     # optional arguments
     n_cores: int = kwargs.get('n_cores', 1)
-    quick_check: bool = kwargs.get('quick_check', False)
-    _LOG.debug(f'Quick-check executed: {quick_check}')
 
     # either `f_grid` or `grid` must be defined
     if not bool(f_grid) ^ bool(grid):
         msg = f'Either `f_grid` or `grid` must be defined: `f_grid={f_grid}` and `grid={grid}`'
         raise ValueError(msg)
 
-    # open polygon data
-    with open(f_polygons, mode='r') as f:
-        data = json.load(f)
-
-    # open grid data
-    if f_grid:
-        grid = csv2grid(f_grid)
-
-    # grid to `shapely.geometry.Point`-objects
-    points = [geometry.Point(xy) for xy in grid]
-
-    # extract features
-    features = data['features']
+    # grid coordinates and polygon data
+    x, y = _grid_coordinates(f_grid, grid)
+    polygons, labels = _polygon_features(f_polygons)
 
     # parallel computing: settings
-    n_features = data['totalFeatures']
-    n_processes = min(n_cores, n_features)
+    n_processes = max(min(n_cores, len(x)), 1)
     _LOG.info(f'CPUs made available: {n_cores} / {mp.cpu_count()}')
     _LOG.info(f'CPUs used: {n_processes} / {mp.cpu_count()}')
-    _LOG.info(f'CPUs required: {n_features} / {n_processes}')
+    _LOG.info(f'Grid-points per CPU: {len(x) // n_processes} ({len(polygons)} features)')
 
     # parallel computing: translation
-    if n_processes == 1:
-        lst_results = [points_in_feature(feature, points, **kwargs) for feature in features]
-    else:
-        with mp.Pool(processes=n_processes) as p:
-            lst_results = p.map(functools.partial(points_in_feature, points=points, **kwargs), features)
+    blocks = np.array_split(np.arange(len(x)), n_processes)
+    with ex.get_executor(kwargs.get('executor'), n_processes) as pool:
+        index = np.concatenate(list(pool.map(
+            functools.partial(_points_in_polygons, polygons=polygons), [x[b] for b in blocks], [y[b] for b in blocks]
+        )))
 
     # compress results
-    return {k: v for d in lst_results for k, v in d.items()}
+    inside = index >= 0
+    return dict(zip(zip(x[inside].tolist(), y[inside].tolist()), labels[index[inside]]))
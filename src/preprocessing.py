@@ -3,42 +3,134 @@ Pre-processing of output data of hydrodynamic model.
 
 Authors: Soesja Brunink & Gijs G. Hendrickx
 """
+# pylint: disable=too-many-lines
+import functools
 import logging
 import os
+import re
 import typing
 
 import numpy as np
+import shapely
 import xarray as xr
+from shapely import geometry
 
 from src import _globals as glob
 
 _LOG = logging.getLogger(__name__)
 
+# number of chunk-sized arrays held simultaneously while processing a chunk (conservative estimate)
+_MEMORY_OVERHEAD = 8
 
-class MapData:
+
+def parse_memory(memory: typing.Union[int, str]) -> int:
+    """Parse a memory size to the number of bytes, e.g., '4GB', '512 MiB', or 1e9 (number of bytes).
+
+    :param memory: memory size
+    :type memory: int, str
+
+    :return: number of bytes
+    :rtype: int
+
+    :raise ValueError: if `memory` is not a valid memory size
+    """
+    units = {
+        'B': 1,
+        'KB': 1e3, 'MB': 1e6, 'GB': 1e9, 'TB': 1e12,
+        'KIB': 2 ** 10, 'MIB': 2 ** 20, 'GIB': 2 ** 30, 'TIB': 2 ** 40,
+    }
+
+    # number of bytes
+    if isinstance(memory, (int, float)):
+        n_bytes = memory
+
+    # formatted memory size
+    else:
+        match = re.fullmatch(r'\s*([0-9.]+)\s*([a-zA-Z]*)\s*', str(memory))
+        if match is None or match.group(2).upper() not in (*units, ''):
+            msg = f'Unknown memory size: {memory}; use, e.g., \'4GB\' or \'512MiB\''
+            raise ValueError(msg)
+        n_bytes = float(match.group(1)) * units.get(match.group(2).upper(), 1)
+
+    # validate memory size
+    if not n_bytes > 0:
+        msg = f'Memory size must be positive; {memory} given'
+        raise ValueError(msg)
+    return int(n_bytes)
+
+
+class MapData:  # pylint: disable=too-many-instance-attributes, too-many-public-methods
     """Interface to open, read, and close a netCDF-file with built-in functions to extract the relevant data and
     compress any three-dimensional data to two-dimensional data (depth-averaged).
     """
+    _TIME_DIM = 'time'
 
     def __init__(self, file_name: str, wd: str = None, **kwargs) -> None:
         """
+        The netCDF-file is opened lazily: data is only read when requested, and `.iter_chunks()` reads the variables in
+        chunks along the time-axis. The number of time-steps per chunk is based on the memory budget (`max_memory`).
+
         :param file_name: netCDF file name with map-data
         :param wd: working directory, defaults to None
+        :param kwargs: optional arguments
+            bbox: region of interest defined as bounding box (x_min, y_min, x_max, y_max), defaults to None
+            cell_block: block of (non-ghost) grid cells to read, defined as (block index, number of blocks), defaults
+                to None
+            chunks: chunk-sizes per dimension to open the dataset with `dask`-arrays (requires `dask`), defaults to None
+            dtype: floating-point data type of the time-series, e.g., 'float32' to halve the memory usage; when `None`,
+                the data type as stored is used, defaults to None
+            map_format: format of the map-file {'dfm1', 'dfm4'}, defaults to None
+            max_memory: memory budget for reading chunks of the time-series, e.g., '4GB', defaults to None
+            model_config: map-configuration, defaults to None (i.e., `src._globals.MODEL_CONFIG`)
+            roi_polygon: region of interest defined as polygon, either as `shapely`-geometry or as its vertices,
+                defaults to None
+            time_stride: stride of the time-steps to read, defaults to None
+            time_window: time-window to read, defined as (start, end) by time-step indices or date-times (see
+                `.i_time`), defaults to None
 
         :type file_name: str
         :type wd: str
+        :type kwargs: optional
+            bbox: tuple[float, float, float, float]
+            cell_block: tuple[int, int]
+            chunks: dict
+            dtype: str, numpy.dtype
+            map_format: str
+            max_memory: int, str
+            model_config: dict
+            roi_polygon: shapely.Geometry, sequence[tuple[float, float]]
+            time_stride: int
+            time_window: tuple
+
+        :raise ValueError: if `dtype` is not a floating-point data type
         """
         self.file = os.path.join(wd or os.getcwd(), file_name)
 
-        self._data = xr.open_dataset(self.file)
+        self._data = xr.open_dataset(self.file, chunks=kwargs.get('chunks'), cache=False)
         self._velocity = None
 
         _LOG.info(f'Map-file loaded: {self.file}')
 
-        if not glob.MODEL_CONFIG:
+        self._model_config: dict = kwargs.get('model_config') or glob.MODEL_CONFIG
+        if not self._model_config:
             _LOG.critical(f'No map-configuration defined when initialising {self.__class__.__name__}')
 
         self._map_format: str = kwargs.get('map_format')
+        self._cell_block: typing.Tuple[int, int] = kwargs.get('cell_block')
+        self._time_window: tuple = kwargs.get('time_window')
+        self._bbox: typing.Tuple[float, float, float, float] = kwargs.get('bbox')
+        self._roi_polygon = kwargs.get('roi_polygon')
+        if not (self._roi_polygon is None or isinstance(self._roi_polygon, shapely.Geometry)):
+            self._roi_polygon = geometry.Polygon(self._roi_polygon)
+        self._time_stride: int = kwargs.get('time_stride')
+
+        max_memory: typing.Union[int, str] = kwargs.get('max_memory')
+        self._max_memory = None if max_memory is None else parse_memory(max_memory)
+
+        self._dtype = kwargs.get('dtype')
+        if self._dtype is not None and np.dtype(self._dtype).kind != 'f':
+            msg = f'Data type must be a floating-point data type; {self._dtype} given'
+            raise ValueError(msg)
 
     def __enter__(self) -> 'MapData':
         """Open context manager.
@@ -97,17 +189,150 @@ class MapData:
         :return: variable data
         :rtype: numpy.ndarray
         """
-        # extract data
-        data = self.data[variable].to_masked_array()
+        # three-dimensional data: depth-averaged per chunk
+        array = self._select(self.data[variable])
+        if array.ndim > max_dim:
+            return np.ma.concatenate(list(self.iter_chunks(variable, max_dim=max_dim)))
+
+        # extract data (excl. ghost cells)
+        data = self._read(array)
+
+        # return processed data
+        return self._process_variable(data, max_dim=max_dim)
+
+    def iter_chunks(
+            self, variable: str, time_chunk: int = None, time_axis: int = 0, max_dim: int = 2, masked: bool = True
+    ) -> typing.Iterator[np.ndarray]:
+        """Retrieve a variable from the netCDF dataset in chunks along the time-axis, i.e., per `time_chunk` time-steps.
+        Every chunk is processed as in `.get_variable()`.
+
+        :param variable: variable key-word
+        :param time_chunk: number of time-steps per chunk, defaults to None (i.e., based on memory budget)
+        :param time_axis: time-axis in model output data, defaults to 0
+        :param max_dim: maximum number of dimensions, defaults to 2
+        :param masked: return masked arrays, or plain arrays with `NaN` for invalid values, defaults to True
+
+        :type variable: str
+        :type time_chunk: int, optional
+        :type time_axis: int, optional
+        :type max_dim: int, optional
+        :type masked: bool, optional
+
+        :return: chunks of variable data
+        :rtype: iterator[numpy.ndarray]
+        """
+        array = self._select(self.data[variable])
+        dim = array.dims[time_axis]
+        n_steps = array.sizes[dim]
+        time_chunk = time_chunk or self.time_chunk(variable, time_axis=time_axis)
+
+        for i in range(0, n_steps, time_chunk):
+            selection = {dim: slice(i, i + time_chunk)}
+            data = self._read(array.isel(selection), masked=masked)
+            thickness = self.layer_thickness(data.shape[-1], **selection) if data.ndim > max_dim else None
+            yield self._process_variable(data, max_dim=max_dim, thickness=thickness)
+
+    def _read(self, array: xr.DataArray, masked: bool = True) -> np.ndarray:
+        """Read (a selection of) a variable, which is converted to the data type of the time-series (`dtype`), if
+        defined. Only floating-point variables with a time-axis are converted, i.e., the coordinates are not.
+
+        :param array: (selection of) variable
+        :param masked: return a masked array, or a plain array with `NaN` for invalid values (as decoded when reading),
+            defaults to True
+
+        :type array: xarray.DataArray
+        :type masked: bool, optional
+
+        :return: variable data
+        :rtype: numpy.ndarray
+        """
+        data = array.to_masked_array() if masked else array.values
+        if self._dtype is None or self._TIME_DIM not in array.dims or data.dtype.kind != 'f':
+            return data
+        return data.astype(self._dtype, copy=False)
+
+    def time_chunk(self, variable: str, time_axis: int = 0) -> int:
+        """Number of time-steps per chunk such that reading and processing a chunk of the variable fits in the memory
+        budget. Without a memory budget, all time-steps are read at once.
+
+        :param variable: variable key-word
+        :param time_axis: time-axis in model output data, defaults to 0
+
+        :type variable: str
+        :type time_axis: int, optional
+
+        :return: number of time-steps per chunk
+        :rtype: int
+        """
+        array = self._select(self.data[variable])
+        n_steps = array.sizes[array.dims[time_axis]]
+        if self._max_memory is None or n_steps == 0:
+            return n_steps
+
+        bytes_per_step = array.size // n_steps * max(array.dtype.itemsize, 8) * _MEMORY_OVERHEAD
+        time_chunk = int(np.clip(self._max_memory // bytes_per_step, 1, n_steps))
+        _LOG.debug(f'Time-steps per chunk of {variable}: {time_chunk} / {n_steps}')
+        return time_chunk
+
+    def layer_thickness(self, n_layers: int, **selection: slice) -> typing.Optional[np.ndarray]:
+        """Layer thickness as defined by the map-configuration (`layer-thickness`), which is either the layer thickness
+        itself, or the vertical coordinates of the layer interfaces (e.g., sigma-coordinates), from which the layer
+        thickness is derived. Layers without a (defined) thickness are excluded from the depth-averaging. When the
+        variable is not defined, or not included in the map-data, `None` is returned, i.e., all layers are weighted
+        equally.
+
+        :param n_layers: number of layers
+        :param selection: selection of the variable per dimension, e.g., a chunk of the time-axis
+
+        :type n_layers: int
+        :type selection: slice
+
+        :return: layer thickness
+        :rtype: numpy.ndarray, None
+        """
+        variable = self._model_config.get('layer-thickness')
+        if variable is None or variable not in self.data.variables:
+            return None
+
+        # extract data (excl. ghost cells)
+        array = self._select(self.data[variable])
+        array = array.isel({k: v for k, v in selection.items() if k in array.dims})
+        thickness = np.ma.filled(array.to_masked_array().astype(float), np.nan)
+
+        # layer interfaces
+        if thickness.shape[-1] == n_layers + 1:
+            thickness = np.abs(np.diff(thickness, axis=-1))
+        elif thickness.shape[-1] != n_layers:
+            _LOG.warning(
+                f'Layer thickness ({variable}) does not match the number of layers ({n_layers}); '
+                f'layers are weighted equally'
+            )
+            return None
+
+        # return layer thickness
+        return np.nan_to_num(thickness, nan=0)
+
+    def _process_variable(self, data: np.ndarray, max_dim: int = 2, thickness: np.ndarray = None) -> np.ndarray:
+        """Process the data of a variable: Compress three-dimensional data to two-dimensional data (depth-averaged).
+        Any ghost cells are already removed when reading the data; see `._select()`.
 
+        :param data: variable data
+        :param max_dim: maximum number of dimensions, defaults to 2
+        :param thickness: layer thickness, defaults to None
+
+        :type data: numpy.ndarray
+        :type max_dim: int, optional
+        :type thickness: numpy.ndarray, optional
+
+        :return: variable data
+        :rtype: numpy.ndarray
+        """
         # reduce dimensions
         if len(data.shape) > max_dim:
-            data = np.mean(data, axis=max_dim)
+            data = depth_average(data, thickness, axis=max_dim)
 
-        # partition handler
-        if self._map_format in ('dfm1', 'dfm4'):
-            data = self.partition_handler(data)
-        elif self._map_format is not None:
+        # partition handler: applied when reading
+        if self._map_format not in (None, 'dfm1', 'dfm4'):
             _LOG.warning(f'Unknown map-format ({self._map_format}) skipped; this may influence the results.')
 
         # return data
@@ -121,8 +346,8 @@ class MapData:
         :return: sign of water depth
         :rtype: int
         """
-        assert glob.MODEL_CONFIG['depth-sign'] in ('+', '-')
-        return +1 if glob.MODEL_CONFIG['depth-sign'] == '+' else -1
+        assert self._model_config['depth-sign'] in ('+', '-')
+        return +1 if self._model_config['depth-sign'] == '+' else -1
 
     @property
     def x_coordinates(self) -> np.ndarray:
@@ -130,7 +355,7 @@ class MapData:
         :return: x-coordinates
         :rtype: numpy.ndarray
         """
-        return self.get_variable(glob.MODEL_CONFIG['x-coordinates'])
+        return self.get_variable(self._model_config['x-coordinates'])
 
     @property
     def y_coordinates(self) -> np.ndarray:
@@ -138,7 +363,7 @@ class MapData:
         :return: y-coordinates
         :rtype: numpy.ndarray
         """
-        return self.get_variable(glob.MODEL_CONFIG['y-coordinates'])
+        return self.get_variable(self._model_config['y-coordinates'])
 
     @property
     def water_depth(self) -> np.ndarray:
@@ -146,7 +371,7 @@ class MapData:
         :return: water levels [m]
         :rtype: numpy.ndarray
         """
-        return self._depth_sign * self.get_variable(glob.MODEL_CONFIG['water-depth'])
+        return self._depth_sign * self.get_variable(self._model_config['water-depth'])
 
     @property
     def velocity(self) -> np.ndarray:
@@ -155,20 +380,96 @@ class MapData:
         :rtype: numpy.ndarray
         """
         if self._velocity is None:
-            self._velocity = np.sqrt(
-                self.get_variable(glob.MODEL_CONFIG['x-velocity']) ** 2 +
-                self.get_variable(glob.MODEL_CONFIG['y-velocity']) ** 2
+            self._velocity = velocity_magnitude(
+                self.get_variable(self._model_config['x-velocity']), self.get_variable(self._model_config['y-velocity'])
             )
 
         return self._velocity
 
+    def iter_water_depth(
+            self, time_chunk: int = None, time_axis: int = 0, masked: bool = True
+    ) -> typing.Iterator[np.ndarray]:
+        """
+        :param time_chunk: number of time-steps per chunk, defaults to None
+        :param time_axis: time-axis in model output data, defaults to 0
+        :param masked: return masked arrays, or plain arrays with `NaN` for invalid values, defaults to True
+
+        :type time_chunk: int, optional
+        :type time_axis: int, optional
+        :type masked: bool, optional
+
+        :return: chunks of water levels [m]
+        :rtype: iterator[numpy.ndarray]
+        """
+        for chunk in self.iter_chunks(self._model_config['water-depth'], time_chunk, time_axis, masked=masked):
+            yield chunk if self._depth_sign > 0 else -chunk
+
+    def iter_velocity(
+            self, time_chunk: int = None, time_axis: int = 0, masked: bool = True
+    ) -> typing.Iterator[np.ndarray]:
+        """
+        :param time_chunk: number of time-steps per chunk, defaults to None
+        :param time_axis: time-axis in model output data, defaults to 0
+        :param masked: return masked arrays, or plain arrays with `NaN` for invalid values, defaults to True
+
+        :type time_chunk: int, optional
+        :type time_axis: int, optional
+        :type masked: bool, optional
+
+        :return: chunks of depth-averaged flow velocity [m/s]
+        :rtype: iterator[numpy.ndarray]
+        """
+        for ucx, ucy in self.iter_velocity_components(time_chunk, time_axis, masked=masked):
+            yield velocity_magnitude(ucx, ucy)
+
+    def iter_velocity_components(
+            self, time_chunk: int = None, time_axis: int = 0, masked: bool = True
+    ) -> typing.Iterator[typing.Tuple[np.ndarray, np.ndarray]]:
+        """
+        :param time_chunk: number of time-steps per chunk, defaults to None
+        :param time_axis: time-axis in model output data, defaults to 0
+        :param masked: return masked arrays, or plain arrays with `NaN` for invalid values, defaults to True
+
+        :type time_chunk: int, optional
+        :type time_axis: int, optional
+        :type masked: bool, optional
+
+        :return: chunks of depth-averaged x- and y-components of flow velocity [m/s]
+        :rtype: iterator[tuple[numpy.ndarray, numpy.ndarray]]
+        """
+        # two components read simultaneously
+        if time_chunk is None:
+            time_chunk = max(self.time_chunk(self._model_config['x-velocity'], time_axis=time_axis) // 2, 1)
+
+        yield from zip(
+            self.iter_chunks(self._model_config['x-velocity'], time_chunk, time_axis, masked=masked),
+            self.iter_chunks(self._model_config['y-velocity'], time_chunk, time_axis, masked=masked)
+        )
+
+    def iter_salinity(
+            self, time_chunk: int = None, time_axis: int = 0, masked: bool = True
+    ) -> typing.Iterator[np.ndarray]:
+        """
+        :param time_chunk: number of time-steps per chunk, defaults to None
+        :param time_axis: time-axis in model output data, defaults to 0
+        :param masked: return masked arrays, or plain arrays with `NaN` for invalid values, defaults to True
+
+        :type time_chunk: int, optional
+        :type time_axis: int, optional
+        :type masked: bool, optional
+
+        :return: chunks of depth-averaged salinity [psu]
+        :rtype: iterator[numpy.ndarray]
+        """
+        yield from self.iter_chunks(self._model_config['salinity'], time_chunk, time_axis, masked=masked)
+
     @property
     def salinity(self) -> np.ndarray:
         """
         :return: depth-averaged salinity [psu]
         :rtype: numpy.ndarray
         """
-        return self.get_variable(glob.MODEL_CONFIG['salinity'])
+        return self.get_variable(self._model_config['salinity'])
 
     @property
     def grain_size(self) -> typing.Optional[np.ndarray]:
@@ -180,6 +481,22 @@ class MapData:
 
     # partition handler"
 
+    @property
+    def _domain_variable(self) -> typing.Union[str, None]:
+        """
+        :return: variable key-word of the domain numbers
+        :rtype: str, None
+
+        :raise NotImplementedError: if `map_format` is unknown
+        """
+        if self._map_format is None:
+            return None
+        if self._map_format == 'dfm1':
+            return 'FlowElemDomain'
+        if self._map_format == 'dfm4':
+            return 'mesh2d_flowelem_domain'
+        raise NotImplementedError(f'No implementation for `map_format={self._map_format}`')
+
     @property
     def i_domain(self) -> typing.Union[np.ndarray, None]:
         """Domain number present in DFM map-output, which labels the grid cells to the partitioning domain of which the
@@ -191,15 +508,12 @@ class MapData:
 
         :raise NotImplementedError: if `map_format` is unknown
         """
-        if self._map_format is None:
+        variable = self._domain_variable
+        if variable is None:
             return None
-        if self._map_format == 'dfm1':
-            return self.data['FlowElemDomain'].to_masked_array()
-        if self._map_format == 'dfm4':
-            return self.data['mesh2d_flowelem_domain'].to_masked_array()
-        raise NotImplementedError(f'No implementation for `map_format={self._map_format}`')
+        return self.data[variable].to_masked_array()
 
-    @property
+    @functools.cached_property
     def i_partition(self) -> typing.Union[int, None]:
         """Domain number of the considered partition, i.e., the partition number.
 
@@ -211,19 +525,792 @@ class MapData:
             return int(i)
         return None
 
+    @functools.cached_property
+    def i_not_ghost(self) -> typing.Union[np.ndarray, slice, None]:
+        """Indices of the grid cells belonging to the considered partition, i.e., the non-ghost cells. The indices are
+        determined once, and are represented by a `slice` when they are contiguous. When there are no ghost cells to
+        remove, `None` is returned.
+
+        :return: indices of non-ghost cells
+        :rtype: numpy.ndarray, slice, None
+        """
+        if self._map_format not in ('dfm1', 'dfm4') or self.i_partition is None:
+            return None
+
+        return _contiguous(np.flatnonzero(self.i_domain == self.i_partition))
+
+    @functools.cached_property
+    def _cell_dim(self) -> str:
+        """
+        :return: dimension of the grid cells
+        :rtype: str
+        """
+        if self.i_not_ghost is not None:
+            return self.data[self._domain_variable].dims[0]
+        return self.data[self._model_config['x-coordinates']].dims[-1]
+
+    @functools.cached_property
+    def i_region(self) -> typing.Union[np.ndarray, slice, None]:
+        """Indices of the non-ghost cells within the region of interest, which is defined by a bounding box (`bbox`)
+        and/or a polygon (`roi_polygon`). Only the coordinates of the grid cells are read to select them; when their
+        extent does not intersect with the region of interest (e.g., a partition outside the region of interest), no
+        grid cells are selected without testing them individually. When no region of interest is defined, the indices
+        of the non-ghost cells are returned (see `.i_not_ghost`).
+
+        :return: indices of grid cells in region of interest
+        :rtype: numpy.ndarray, slice, None
+        """
+        index = self.i_not_ghost
+        if self._bbox is None and self._roi_polygon is None:
+            return index
+
+        # coordinates of (non-ghost) grid cells
+        if index is None:
+            index = slice(0, self.data.sizes[self._cell_dim])
+        x, y = (
+            self.data[self._model_config[k]].isel({self._cell_dim: index}).values
+            for k in ('x-coordinates', 'y-coordinates')
+        )
+
+        # bounds of region of interest
+        bounds = [-np.inf, -np.inf, np.inf, np.inf]
+        for b in filter(lambda b: b is not None, (self._bbox, getattr(self._roi_polygon, 'bounds', None))):
+            bounds = [*np.maximum(bounds[:2], b[:2]), *np.minimum(bounds[2:], b[2:])]
+
+        # grid cells in region of interest
+        if len(x) == 0 or x.max() < bounds[0] or y.max() < bounds[1] or x.min() > bounds[2] or y.min() > bounds[3]:
+            mask = np.zeros(len(x), dtype=bool)
+        else:
+            mask = (x >= bounds[0]) & (y >= bounds[1]) & (x <= bounds[2]) & (y <= bounds[3])
+            if self._roi_polygon is not None:
+                mask[mask] = shapely.intersects_xy(self._roi_polygon, x[mask], y[mask])
+        _LOG.info(f'Grid cells in region of interest: {np.count_nonzero(mask)} / {len(mask)}')
+
+        # return indices
+        if isinstance(index, slice):
+            index = np.arange(index.start, index.stop)
+        return _contiguous(index[mask])
+
+    @functools.cached_property
+    def i_cells(self) -> typing.Union[np.ndarray, slice, None]:
+        """Indices of the grid cells to read, i.e., the non-ghost cells (within the region of interest, see
+        `.i_region`), which are optionally restricted to a block of grid cells (`cell_block`). When all grid cells are
+        to be read, `None` is returned.
+
+        :return: indices of grid cells
+        :rtype: numpy.ndarray, slice, None
+        """
+        index = self.i_region
+        if self._cell_block is None:
+            return index
+
+        # all (non-ghost) grid cells
+        if index is None:
+            index = slice(0, self.data.sizes[self._cell_dim])
+        n_cells = len(range(index.start, index.stop)) if isinstance(index, slice) else len(index)
+
+        # block of grid cells
+        i_block, n_blocks = self._cell_block
+        start, stop = i_block * n_cells // n_blocks, (i_block + 1) * n_cells // n_blocks
+        if isinstance(index, slice):
+            return slice(index.start + start, index.start + stop)
+        return index[start:stop]
+
+    @property
+    def n_cells(self) -> int:
+        """Number of grid cells to read, which only requires reading the domain numbers (if any).
+
+        :return: number of grid cells
+        :rtype: int
+        """
+        index = self.i_cells
+        if index is None:
+            return self.data.sizes[self._cell_dim]
+        if isinstance(index, slice):
+            return len(range(index.start, index.stop))
+        return len(index)
+
+    @functools.cached_property
+    def i_time(self) -> typing.Optional[slice]:
+        """Time-steps to read, i.e., the time-window (`time_window`) with a stride (`time_stride`). The start and end of
+        the time-window are either time-step indices (end exclusive), or date-times (end inclusive), e.g.,
+        `('2020-01-01', '2020-01-15 12:00')`; when `None`, the time-window is open-ended. When all time-steps are to be
+        read, `None` is returned.
+
+        :return: time-steps to read
+        :rtype: slice, None
+
+        :raise ValueError: if `time_stride` is not a positive integer
+        :raise ValueError: if the time-window contains no time-steps
+        """
+        if self._time_window is None and self._time_stride in (None, 1):
+            return None
+
+        # stride
+        stride = self._time_stride
+        if stride is not None and not (isinstance(stride, (int, np.integer)) and stride > 0):
+            msg = f'Time-stride must be a positive integer; {stride} given'
+            raise ValueError(msg)
+
+        # time-window: date-times to time-step indices
+        start, end = self._time_window or (None, None)
+        if not (start is None or isinstance(start, (int, np.integer))):
+            start = self.data.indexes[self._TIME_DIM].get_slice_bound(start, side='left')
+        if not (end is None or isinstance(end, (int, np.integer))):
+            end = self.data.indexes[self._TIME_DIM].get_slice_bound(end, side='right')
+
+        # time-steps
+        index = slice(start, end, stride)
+        n_steps = len(range(self.data.sizes[self._TIME_DIM])[index])
+        if n_steps == 0:
+            msg = f'Time-window {self._time_window} contains no time-steps'
+            raise ValueError(msg)
+        _LOG.info(f'Time-steps selected: {n_steps} / {self.data.sizes[self._TIME_DIM]}')
+        return index
+
+    def _select(self, array: xr.DataArray) -> xr.DataArray:
+        """Select the grid cells and time-steps of a variable to read (lazily), such that ghost cells (and grid cells
+        outside the block of grid cells), and time-steps outside the time-window are never read.
+
+        :param array: variable
+        :type array: xarray.DataArray
+
+        :return: variable without ghost cells
+        :rtype: xarray.DataArray
+        """
+        selection = {}
+        if self.i_cells is not None and self._cell_dim in array.dims:
+            selection[self._cell_dim] = self.i_cells
+        if self._TIME_DIM in array.dims and self.i_time is not None:
+            selection[self._TIME_DIM] = self.i_time
+        return array.isel(selection) if selection else array
+
     def partition_handler(self, data: np.ndarray) -> np.ndarray:
-        """Process data to remove ghost cells present as a result
+        """Process data to remove ghost cells present as a result of the partitioning of the hydrodynamic model, where
+        the grid cells are considered to be the last dimension of the data.
 
-        :param data:
-        :return:
+        :param data: variable data (incl. ghost cells)
+        :type data: numpy.ndarray
+
+        :return: variable data (excl. ghost cells)
+        :rtype: numpy.ndarray
         """
-        if self.i_partition is not None:
-            i_not_ghost = np.flatnonzero(self.i_domain == self.i_partition)
-            return data.take(i_not_ghost, axis=len(data.shape) - 1)
+        if self.i_not_ghost is not None:
+            return data[..., self.i_not_ghost]
 
         return data
 
 
+def _contiguous(index: np.ndarray) -> typing.Union[np.ndarray, slice]:
+    """Represent indices by a `slice` when they are contiguous, which allows for efficient (lazy) reading.
+
+    :param index: indices
+    :type index: numpy.ndarray
+
+    :return: indices
+    :rtype: numpy.ndarray, slice
+    """
+    if len(index) and index[-1] - index[0] + 1 == len(index):
+        return slice(int(index[0]), int(index[-1]) + 1)
+    return index
+
+
+def depth_average(data: np.ndarray, thickness: np.ndarray = None, axis: int = -1) -> np.ndarray:
+    """Depth-average data over its layers, optionally weighted by the layer thickness. Layers without data (i.e.,
+    masked, or `NaN` for plain arrays) are excluded; when none of the layers contain data, the depth-averaged data is
+    masked (or `NaN` for plain arrays).
+
+    :param data: layered data
+    :param thickness: layer thickness, broadcastable to `data`; when `None`, the layers are weighted equally, defaults
+        to None
+    :param axis: layer-axis, defaults to -1
+
+    :type data: numpy.ndarray
+    :type thickness: numpy.ndarray, optional
+    :type axis: int, optional
+
+    :return: depth-averaged data
+    :rtype: numpy.ndarray
+    """
+    dtype = np.result_type(data.dtype, np.float16)
+    masked = np.ma.isMaskedArray(data)
+    if thickness is None and masked:
+        return np.mean(data, axis=axis).astype(dtype, copy=False)
+
+    # (weighted) average of valid data
+    valid = ~np.ma.getmaskarray(data) if masked else ~np.isnan(data)
+    weights = valid if thickness is None else np.where(valid, np.broadcast_to(thickness, data.shape), 0)
+    values = np.ma.getdata(data) if thickness is None else np.ma.getdata(data) * weights
+    total = np.sum(weights, axis=axis)
+    average = np.divide(
+        np.sum(values, axis=axis, where=valid), total, out=np.full(total.shape, np.nan, dtype=dtype), where=total > 0
+    )
+    return np.ma.masked_array(average, mask=total == 0) if masked else average
+
+
+class TimeStatistics:  # pylint: disable=too-many-instance-attributes
+    """Single-pass (streaming) temporal statistics of a time-series that is provided in chunks along the time-axis, such
+    that the memory usage depends on the chunk-size rather than the length of the time-series. The temporal mean and
+    standard deviation are updated using Welford's algorithm (in its parallel form by Chan et al., 1979); the flooding
+    characteristics (optional) carry the last sign of the time-series across chunk boundaries.
+    """
+
+    def __init__(self, time_axis: int = 0, **kwargs) -> None:
+        """
+        :param time_axis: axis with temporal variability, defaults to 0
+        :param kwargs: optional arguments
+            inundation: determine inundation duration and frequency, defaults to False
+            median: determine temporal median (and other quantiles), defaults to False
+            resolution: resolution of the streaming estimation of the temporal median (and other quantiles); when
+                `None`, the exact quantiles are determined, which requires the full time-series, defaults to None
+
+        :type time_axis: int, optional
+        :type kwargs: optional
+            inundation: bool
+            median: bool
+            resolution: float
+        """
+        self.time_axis = time_axis
+
+        # optional statistics
+        self._inundation: bool = kwargs.get('inundation', False)
+        self._median: bool = kwargs.get('median', False)
+        resolution: float = kwargs.get('resolution')
+        self._histogram = None if resolution is None else QuantileHistogram(resolution, time_axis)
+
+        # accumulated statistics
+        self._n_steps = 0
+        self._count = None
+        self._mean = None
+        self._m2 = None
+        self._max = None
+        self._n_inundated = None
+        self._n_sign_changes = None
+        self._last_sign = None
+        self._series = []
+
+    def update(self, chunk: np.ndarray) -> 'TimeStatistics':
+        """Update the temporal statistics with a chunk of the time-series. Invalid values are either masked, or `NaN`.
+
+        :param chunk: chunk of time-series
+        :type chunk: numpy.ndarray
+
+        :return: temporal statistics
+        :rtype: TimeStatistics
+        """
+        chunk = _nan_filled(chunk)
+        self._n_steps += chunk.shape[self.time_axis]
+
+        # validity of values: determined once per chunk
+        valid = ~np.isnan(chunk)
+
+        # chunk statistics: accumulated in double precision
+        count = np.count_nonzero(valid, axis=self.time_axis)
+        mean = np.divide(
+            np.sum(chunk, axis=self.time_axis, where=valid, dtype=np.float64), count, out=np.zeros(np.shape(count)),
+            where=count > 0
+        )
+        deviation = chunk - np.expand_dims(mean, self.time_axis).astype(chunk.dtype, copy=False)
+        m2 = np.sum(np.square(deviation, out=deviation), axis=self.time_axis, where=valid, dtype=np.float64)
+        maximum = np.max(chunk, axis=self.time_axis, where=valid, initial=-np.inf)
+
+        # merge statistics
+        if self._count is None:
+            self._count, self._mean, self._m2, self._max = count, mean, m2, maximum
+        else:
+            total = self._count + count
+            delta = mean - self._mean
+            weight = np.divide(count, total, out=np.zeros(total.shape), where=total > 0)
+            self._mean = self._mean + delta * weight
+            self._m2 = self._m2 + m2 + delta ** 2 * self._count * weight
+            self._count = total
+            self._max = np.fmax(self._max, maximum)
+
+        # flooding characteristics
+        if self._inundation:
+            self._update_inundation(chunk)
+
+        # complete time-series, or its histogram
+        if self._median and self._histogram is None:
+            self._series.append(chunk)
+        elif self._median:
+            self._histogram.update(chunk)
+
+        return self
+
+    def _update_inundation(self, chunk: np.ndarray) -> None:
+        """Update the flooding characteristics, i.e., the number of time-steps with a positive value (inundation) and
+        the number of sign changes (flooding and drying). The sign at the end of the previous chunk is included to
+        account for sign changes across chunk boundaries.
+
+        :param chunk: chunk of time-series, with `NaN` for invalid values
+        :type chunk: numpy.ndarray
+        """
+        inundated = np.count_nonzero(chunk > 0, axis=self.time_axis)
+
+        # signs as small integers: invalid values are considered positive, i.e., no flooding or drying
+        signs = np.ones(chunk.shape, dtype=np.int8)
+        signs[chunk == 0] = 0
+        signs[chunk < 0] = -1
+        if self._last_sign is not None:
+            signs = np.concatenate([self._last_sign, signs], axis=self.time_axis)
+        sign_changes = np.count_nonzero(np.diff(signs, axis=self.time_axis), axis=self.time_axis)
+        self._last_sign = np.take(signs, [-1], axis=self.time_axis)
+
+        if self._n_inundated is None:
+            self._n_inundated, self._n_sign_changes = inundated, sign_changes
+        else:
+            self._n_inundated = self._n_inundated + inundated
+            self._n_sign_changes = self._n_sign_changes + sign_changes
+
+    def _masked(self, data: np.ndarray) -> np.ndarray:
+        """Mask statistics without any (unmasked) data.
+
+        :param data: statistics
+        :type data: numpy.ndarray
+
+        :return: masked statistics
+        :rtype: numpy.ndarray
+        """
+        return np.ma.masked_array(data, mask=self._count == 0)
+
+    @property
+    def mean(self) -> np.ndarray:
+        """
+        :return: temporal mean
+        :rtype: numpy.ndarray
+        """
+        return self._masked(self._mean)
+
+    @property
+    def std(self) -> np.ndarray:
+        """
+        :return: temporal standard deviation
+        :rtype: numpy.ndarray
+        """
+        variance = np.divide(self._m2, self._count, out=np.zeros(self._m2.shape), where=self._count > 0)
+        return self._masked(np.sqrt(variance))
+
+    @property
+    def max(self) -> np.ndarray:
+        """
+        :return: temporal maximum
+        :rtype: numpy.ndarray
+        """
+        return self._masked(self._max)
+
+    @property
+    def median(self) -> np.ndarray:
+        """
+        :return: temporal median
+        :rtype: numpy.ndarray
+        """
+        return self.quantile(.5)
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Temporal quantile, which is either exact, or estimated with the resolution as specified at initiation.
+
+        :param q: quantile, between 0 and 1
+        :type q: float
+
+        :return: temporal quantile
+        :rtype: numpy.ndarray
+        """
+        assert self._median, 'Temporal quantiles not determined: initiate with `median=True`'
+
+        # estimated quantile
+        if self._histogram is not None:
+            return self._histogram.quantile(q)
+
+        # exact quantile
+        return _exact_quantile(self._series, q, self.time_axis)
+
+    @property
+    def duration(self) -> np.ndarray:
+        """
+        :return: inundation duration, i.e., fraction of time-steps with a positive value [-]
+        :rtype: numpy.ndarray
+        """
+        assert self._inundation, 'Flooding characteristics not determined: initiate with `inundation=True`'
+        return self._masked(self._n_inundated / self._n_steps)
+
+    @property
+    def frequency(self) -> np.ndarray:
+        """
+        :return: inundation frequency, i.e., number of flooding and drying cycles [-]
+        :rtype: numpy.ndarray
+        """
+        assert self._inundation, 'Flooding characteristics not determined: initiate with `inundation=True`'
+        return self._n_sign_changes / 2
+
+
+class QuantileHistogram:
+    """Bounded-memory estimation of temporal quantiles from a time-series that is provided in chunks along the time-
+    axis. The values are counted per cell in bins of fixed width (`resolution`), which are extended whenever a chunk
+    exceeds the current range. The order statistics are estimated by assuming the values to be uniformly distributed
+    within their bin, and so the error of the estimated quantiles is bounded by the bin width. Thus, the memory usage
+    scales with the range of the values divided by the resolution, instead of the length of the time-series.
+    """
+
+    def __init__(self, resolution: float, time_axis: int = 0) -> None:
+        """
+        :param resolution: bin width, i.e., maximum error of the estimated quantiles
+        :param time_axis: axis with temporal variability, defaults to 0
+
+        :type resolution: float
+        :type time_axis: int, optional
+
+        :raise ValueError: if `resolution` is not positive
+        """
+        if not resolution > 0:
+            msg = f'Resolution of the quantile estimation must be positive; {resolution} given'
+            raise ValueError(msg)
+
+        self.resolution = resolution
+        self.time_axis = time_axis
+
+        self._shape = None
+        self._offset = 0
+        self._counts = None
+
+    def update(self, chunk: np.ndarray) -> 'QuantileHistogram':
+        """Update the histograms with a chunk of the time-series.
+
+        :param chunk: chunk of time-series
+        :type chunk: numpy.ndarray
+
+        :return: quantile histogram
+        :rtype: QuantileHistogram
+        """
+        # (cells, time)-formatted data
+        data = np.moveaxis(_nan_filled(chunk).astype(float, copy=False), self.time_axis, -1)
+        self._shape = data.shape[:-1]
+        data = data.reshape(-1, data.shape[-1])
+        n_cells = len(data)
+
+        # bin indices of valid data
+        i_cell, i_time = np.nonzero(~np.isnan(data))
+        i_bin = np.floor(data[i_cell, i_time] / self.resolution).astype(np.int64)
+        if i_bin.size == 0:
+            return self
+
+        # extend histograms
+        lower, upper = i_bin.min(), i_bin.max() + 1
+        if self._counts is None:
+            self._offset = lower
+            self._counts = np.zeros((n_cells, upper - lower), dtype=np.uint32)
+        else:
+            pad = max(self._offset - lower, 0), max(upper - self._offset - self._counts.shape[1], 0)
+            if any(pad):
+                self._counts = np.pad(self._counts, ((0, 0), pad))
+                self._offset -= pad[0]
+
+        # count values
+        n_bins = self._counts.shape[1]
+        counts = np.bincount(i_cell * n_bins + (i_bin - self._offset), minlength=n_cells * n_bins)
+        self._counts += counts.reshape(n_cells, n_bins).astype(np.uint32)
+
+        return self
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Estimate a temporal quantile.
+
+        :param q: quantile, between 0 and 1
+        :type q: float
+
+        :return: temporal quantile
+        :rtype: numpy.ndarray
+
+        :raise ValueError: if `q` is not between 0 and 1
+        """
+        if not 0 <= q <= 1:
+            msg = f'Quantile must be between 0 and 1; {q} given'
+            raise ValueError(msg)
+
+        # no data
+        if self._counts is None:
+            return np.ma.masked_all(self._shape or (0,))
+
+        # linear interpolation between order statistics (cf. `numpy.quantile`)
+        counts = self._counts.astype(np.int64)
+        cumulative = np.cumsum(counts, axis=1)
+        n_values = cumulative[:, -1]
+        rank = q * np.maximum(n_values - 1, 0)
+        lower = self._order_statistic(np.floor(rank).astype(np.int64), counts, cumulative)
+        upper = self._order_statistic(np.ceil(rank).astype(np.int64), counts, cumulative)
+        quantile = lower + (rank - np.floor(rank)) * (upper - lower)
+
+        # return quantile
+        return np.ma.masked_array(quantile, mask=n_values == 0).reshape(self._shape)
+
+    def _order_statistic(self, rank: np.ndarray, counts: np.ndarray, cumulative: np.ndarray) -> np.ndarray:
+        """Estimate the order statistic of a given rank per cell by assuming the values to be uniformly distributed
+        within their bin.
+
+        :param rank: rank (zero-based) per cell
+        :param counts: histograms
+        :param cumulative: cumulative histograms
+
+        :type rank: numpy.ndarray
+        :type counts: numpy.ndarray
+        :type cumulative: numpy.ndarray
+
+        :return: order statistic
+        :rtype: numpy.ndarray
+        """
+        i_bin = np.argmax(cumulative > rank[:, None], axis=1)
+        n_bin = np.take_along_axis(counts, i_bin[:, None], axis=1)[:, 0]
+        n_before = np.take_along_axis(cumulative, i_bin[:, None], axis=1)[:, 0] - n_bin
+        fraction = np.divide(rank - n_before + .5, n_bin, out=np.zeros(len(n_bin)), where=n_bin > 0)
+        return (self._offset + i_bin + fraction) * self.resolution
+
+
+class VelocityStatistics:
+    """Single-pass (streaming) temporal statistics of the flow velocity, which is provided in chunks of its components
+    along the time-axis. The flow velocity is computed in-place in the buffers of its components (see
+    `velocity_magnitude()`), and the temporal maximum is tracked on the squared flow velocity, such that a single square
+    root is taken at the end. Only when the temporal median (or other quantiles) is requested, the flow velocity itself
+    is computed per chunk.
+    """
+
+    def __init__(self, time_axis: int = 0, **kwargs) -> None:
+        """
+        :param time_axis: axis with temporal variability, defaults to 0
+        :param kwargs: optional arguments
+            median: determine temporal median (and other quantiles), defaults to False
+            resolution: resolution of the streaming estimation of the temporal median (and other quantiles); when
+                `None`, the exact quantiles are determined, which requires the full time-series, defaults to None
+
+        :type time_axis: int, optional
+        :type kwargs: optional
+            median: bool
+            resolution: float
+        """
+        self.time_axis = time_axis
+
+        # optional statistics
+        self._median: bool = kwargs.get('median', False)
+        resolution: float = kwargs.get('resolution')
+        self._histogram = None if resolution is None else QuantileHistogram(resolution, time_axis)
+
+        # accumulated statistics
+        self._count = None
+        self._max_squared = None
+        self._series = []
+
+    def update(self, x_velocity: np.ndarray, y_velocity: np.ndarray) -> 'VelocityStatistics':
+        """Update the temporal statistics with a chunk of the flow velocity components. Invalid values are either
+        masked, or `NaN`. Note that the chunks are overwritten (see `velocity_magnitude()`).
+
+        :param x_velocity: chunk of x-component of flow velocity
+        :param y_velocity: chunk of y-component of flow velocity
+
+        :type x_velocity: numpy.ndarray
+        :type y_velocity: numpy.ndarray
+
+        :return: temporal statistics
+        :rtype: VelocityStatistics
+        """
+        squared = _nan_filled(velocity_magnitude(x_velocity, y_velocity, squared=True))
+        valid = ~np.isnan(squared)
+
+        # chunk statistics
+        count = np.count_nonzero(valid, axis=self.time_axis)
+        maximum = np.max(squared, axis=self.time_axis, where=valid, initial=-np.inf)
+
+        # merge statistics
+        if self._count is None:
+            self._count, self._max_squared = count, maximum
+        else:
+            self._count = self._count + count
+            np.fmax(self._max_squared, maximum, out=self._max_squared)
+
+        # flow velocity: in-place
+        if self._median:
+            speed = np.sqrt(squared, out=squared)
+            if self._histogram is None:
+                self._series.append(speed)
+            else:
+                self._histogram.update(speed)
+
+        return self
+
+    @property
+    def max(self) -> np.ndarray:
+        """
+        :return: temporal maximum
+        :rtype: numpy.ndarray
+        """
+        valid = self._max_squared >= 0
+        maximum = np.sqrt(self._max_squared, out=np.full(self._max_squared.shape, -np.inf), where=valid)
+        return np.ma.masked_array(maximum, mask=self._count == 0)
+
+    @property
+    def median(self) -> np.ndarray:
+        """
+        :return: temporal median
+        :rtype: numpy.ndarray
+        """
+        return self.quantile(.5)
+
+    def quantile(self, q: float) -> np.ndarray:
+        """Temporal quantile, which is either exact, or estimated with the resolution as specified at initiation.
+
+        :param q: quantile, between 0 and 1
+        :type q: float
+
+        :return: temporal quantile
+        :rtype: numpy.ndarray
+        """
+        assert self._median, 'Temporal quantiles not determined: initiate with `median=True`'
+
+        # estimated quantile
+        if self._histogram is not None:
+            return self._histogram.quantile(q)
+
+        # exact quantile: flow velocity in own buffers
+        return _exact_quantile(self._series, q, self.time_axis, overwrite=True)
+
+
+def velocity_magnitude(x_velocity: np.ndarray, y_velocity: np.ndarray, squared: bool = False) -> np.ndarray:
+    """Magnitude of the flow velocity from its components, which is computed in-place, i.e., without any temporary
+    arrays: the result is written to the buffer of the x-component, and the buffer of the y-component is overwritten as
+    well. Thus, the components must not be used afterwards; e.g., freshly read chunks of the components (see
+    `MapData.iter_velocity_components()`). Masked components result in a masked flow velocity.
+
+    :param x_velocity: x-component of flow velocity
+    :param y_velocity: y-component of flow velocity
+    :param squared: return the squared flow velocity, defaults to False
+
+    :type x_velocity: numpy.ndarray
+    :type y_velocity: numpy.ndarray
+    :type squared: bool, optional
+
+    :return: (squared) flow velocity
+    :rtype: numpy.ndarray
+    """
+    masked = np.ma.isMaskedArray(x_velocity) or np.ma.isMaskedArray(y_velocity)
+    mask = np.ma.mask_or(np.ma.getmask(x_velocity), np.ma.getmask(y_velocity))
+
+    # floating-point buffers
+    dtype = np.result_type(x_velocity, y_velocity, np.float16)
+    x = np.ma.getdata(x_velocity).astype(dtype, copy=False)
+    y = np.ma.getdata(y_velocity).astype(dtype, copy=False)
+
+    # in-place computation
+    np.multiply(x, x, out=x)
+    np.multiply(y, y, out=y)
+    np.add(x, y, out=x)
+    if not squared:
+        np.sqrt(x, out=x)
+
+    return np.ma.masked_array(x, mask=mask) if masked else x
+
+
+def _nan_filled(data: np.ndarray) -> np.ndarray:
+    """Floating-point array with `NaN` for invalid (i.e., masked) values. The statistics are determined on these plain
+    arrays instead of masked arrays, i.e., without carrying a mask along the computations; masked arrays are only
+    returned by the statistics for compatibility.
+
+    :param data: (masked) data
+    :type data: numpy.ndarray
+
+    :return: data with `NaN` for invalid values
+    :rtype: numpy.ndarray
+    """
+    data = np.asanyarray(data)
+    dtype = np.result_type(data.dtype, np.float16)
+    if np.ma.isMaskedArray(data):
+        return np.ma.filled(data.astype(dtype, copy=False), np.nan)
+    return data.astype(dtype, copy=False)
+
+
+def _exact_quantile(
+        series: typing.List[np.ndarray], q: float, time_axis: int = 0, overwrite: bool = False
+) -> np.ndarray:
+    """Exact temporal quantile of a time-series that is provided in chunks along the time-axis, with `NaN` for invalid
+    values. The temporal median is determined from the sorted time-series, in which the invalid values are sorted last.
+
+    :param series: chunks of time-series
+    :param q: quantile, between 0 and 1
+    :param time_axis: axis with temporal variability, defaults to 0
+    :param overwrite: a single chunk may be sorted in-place, defaults to False
+
+    :type series: list[numpy.ndarray]
+    :type q: float
+    :type time_axis: int, optional
+    :type overwrite: bool, optional
+
+    :return: temporal quantile
+    :rtype: numpy.ndarray
+    """
+    series = series[0] if overwrite and len(series) == 1 else np.concatenate(series, axis=time_axis)
+    if q != .5:
+        return np.ma.masked_invalid(np.nanquantile(series, q, axis=time_axis))
+
+    # median: middle (pair of) valid values
+    series.sort(axis=time_axis)
+    count = np.count_nonzero(~np.isnan(series), axis=time_axis)
+    lower, upper = (
+        np.take_along_axis(series, np.expand_dims(np.maximum(i, 0), time_axis), axis=time_axis).squeeze(time_axis)
+        for i in ((count - 1) // 2, count // 2)
+    )
+    return np.ma.masked_array((lower + upper) / 2, mask=count == 0)
+
+
+def process_map_data(
+        data: MapData, time_chunk: int = None, time_axis: int = 0, median_resolution: float = None
+) -> typing.Dict[str, np.ndarray]:
+    """Pre-process the salinity, water depth, and flow velocity time-series of the map-data in a single pass over the
+    time-axis. The variables are read in chunks of `time_chunk` time-steps, so the memory usage depends on the chunk-
+    size rather than the length of the simulation; by default, the full time-series are read at once.
+
+    Note that the exact median flow velocity requires the full flow velocity time-series to be kept in memory. This is
+    avoided by estimating the median flow velocity with a given resolution (`median_resolution`); see
+    `QuantileHistogram`.
+
+    :param data: map-data
+    :param time_chunk: number of time-steps per chunk, defaults to None
+    :param time_axis: axis with temporal variability, defaults to 0
+    :param median_resolution: resolution of the estimated median flow velocity [m/s], defaults to None
+
+    :type data: MapData
+    :type time_chunk: int, optional
+    :type time_axis: int, optional
+    :type median_resolution: float, optional
+
+    :return: pre-processed model data: mean and standard deviation of the salinity, mean water depth, inundation
+        duration and frequency, and median and maximum flow velocity
+    :rtype: dict[str, numpy.ndarray]
+    """
+    # single pass over time-axis
+    salinity = TimeStatistics(time_axis)
+    for chunk in data.iter_salinity(time_chunk, time_axis, masked=False):
+        salinity.update(chunk)
+
+    water_depth = TimeStatistics(time_axis, inundation=True)
+    for chunk in data.iter_water_depth(time_chunk, time_axis, masked=False):
+        water_depth.update(chunk)
+
+    velocity = VelocityStatistics(time_axis, median=True, resolution=median_resolution)
+    for ucx, ucy in data.iter_velocity_components(time_chunk, time_axis, masked=False):
+        velocity.update(ucx, ucy)
+
+    # logging
+    _LOG.info('Salinity-, water depth-, and flow velocity-data pre-processed')
+
+    # return processed data
+    return {
+        'mean_salinity': salinity.mean,
+        'std_salinity': salinity.std,
+        'mean_depth': water_depth.mean,
+        'duration': water_depth.duration,
+        'frequency': water_depth.frequency,
+        'median_velocity': velocity.median,
+        'max_velocity': velocity.max,
+    }
+
+
 def process_salinity(salinity: np.ndarray, time_axis: int = 0) -> typing.Tuple[np.ndarray, np.ndarray]:
     """Pre-process (depth-averaged) salinity time-series.
 
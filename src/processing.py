@@ -6,6 +6,8 @@ Authors: Soesja Brunink & Gijs G. Hendrickx
 import functools
 import logging
 import multiprocessing as mp
+from multiprocessing import shared_memory
+import os
 import time
 import typing
 
@@ -14,44 +16,63 @@ import numpy as np
 from config import config_file
 from src import (
     _globals as glob,
+    cache as ca,
+    executors as ex,
     export as exp,
     labelling as lab,
-    preprocessing as pre
+    preprocessing as pre,
+    session as se
 )
 
 _LOG = logging.getLogger(__name__)
 
+# settings of the ecotope-labelling that can be varied per scenario (see `map_scenarios()`)
+_SCENARIO_KEYS = (
+    'f_eco_config', 'friction_coefficient', 'shields', 'chezy', 'relative_density', 'mlws', 'mhwn', 'substratum_1'
+)
+
 
 def map_ecotopes(*f_map: str, **kwargs) -> typing.Union[glob.TypeXYLabel, tuple, None]:
     """Map ecotopes from hydrodynamic model data.
 
-    The spatial distribution of the ecotopes can be returned in two ways (or not at all, `return_ecotopes=False`):
+    The spatial distribution of the ecotopes can be returned in three ways (or not at all, `return_ecotopes=False`):
      1. As dictionary (`return_ecotopes='dict'`), which is formatted as {(x, y): ecotope} (default);
-     2. As tuple of arrays (`return_ecotopes='tuple'`), which is formatted as (x, y, ecotopes).
+     2. As tuple of arrays (`return_ecotopes='tuple'`), which is formatted as (x, y, ecotopes);
+     3. As tuple of arrays with packed ecotope-labels (`return_ecotopes='packed'`), which is formatted as
+        (x, y, ecotopes) with `ecotopes` a `src.labelling.Ecotopes`-object.
 
     :param f_map: file name(s) of hydrodynamic model output data (*.nc)
     :param kwargs: optional arguments
+        executor: executor of the (parallel) computations, defaults to 'processes' if `n_cores > 1`, and 'serial'
+            otherwise
+            options: {'serial', 'threads', 'processes', 'dask'}
         f_export: file name for exporting ecotope map(s) (or `True` to use default output-file), defaults to None
             supported file-types: {'*.csv',}
+        n_blocks: number of blocks of grid cells per file that are processed separately (in parallel), defaults to
+            `n_cores` for a single file, and 1 otherwise
         n_cores: number of cores available for parallel computations, defaults to 1
         return_ecotopes: return the spatial distribution of the ecotopes, defaults to True
-            options: {True, False, 'dict', 'tuple'}
+            options: {True, False, 'dict', 'tuple', 'packed'}
         wd_export: working directory for exporting ecotope map(s), defaults to None
         optional arguments to `.__log_config()`
         optional arguments to `.__determine_ecotopes()`
 
     :type f_map: str
     :type kwargs: optional
+        executor: str
         f_export: str, bool
+        n_blocks: int
         n_cores: int
         return_ecotopes: bool, str
         wd_export: str
 
     :return: spatial distribution of ecotopes (optional)
-    :rtype: src._globals.TypeXYLabel, tuple[np.ndarray], None
+    :rtype: src._globals.TypeXYLabel, tuple[np.ndarray], tuple[np.ndarray, np.ndarray, src.labelling.Ecotopes], None
 
-    :raise ValueError: if `return_ecotopes` is neither a boolean, nor in {'dict', 'tuple'}
+    :raise ValueError: if `return_ecotopes` is neither a boolean, nor in {'dict', 'tuple', 'packed'}
+    :raise ValueError: if `executor` not in {'serial', 'threads', 'processes', 'dask'}
     :raise ValueError: if `substratum_1` not in {None, 'soft', 'hard'}
+    :raise ValueError: if no grid cells are within the region of interest (`bbox`, `roi_polygon`)
     """
     # start time
     t0 = time.perf_counter()
@@ -68,42 +89,20 @@ def map_ecotopes(*f_map: str, **kwargs) -> typing.Union[glob.TypeXYLabel, tuple,
     f_export: typing.Union[bool, str, None] = kwargs.get('f_export', wd_export is not None)
 
     # > return ecotopes
-    return_ecotopes: typing.Union[str, bool] = kwargs.get('return_ecotopes', True)
-    if isinstance(return_ecotopes, str):
-        return_options = 'dict', 'tuple'
-        if return_ecotopes not in return_options:
-            msg = f'`return_ecotopes` must be either a `bool`, or in {return_options}; {return_ecotopes} is given.'
-            raise ValueError(msg)
-    elif return_ecotopes:
-        return_ecotopes = 'dict'
+    return_ecotopes = __return_option(kwargs.get('return_ecotopes', True))
 
     # > parallel computing
     n_cores: int = kwargs.get('n_cores', 1)
-    n_files = len(f_map)
+    n_blocks: int = kwargs.get('n_blocks', n_cores if len(f_map) == 1 else 1)
 
-    # extract model data
-    if n_files == 1:
-        # single `*_map.nc`-file
-        output = __determine_ecotopes(f_map[0], init_log=False, **kwargs)
+    # labelling settings and map configuration: validated before reading model data, and shared by all tasks
+    kwargs.update(settings=label_settings(**kwargs), model_config=__map_config(**kwargs))
 
-    else:
-        # multiple `*_map.nc`-files
-        n_processes = min(n_cores, n_files)
-        _LOG.debug(f'CPUs made available: {n_cores} / {mp.cpu_count()}')
-        _LOG.debug(f'CPUs used: {n_processes} / {mp.cpu_count()}')
-        _LOG.debug(f'CPUs required: {n_files} / {n_processes}')
+    # tasks: blocks of grid cells (in region of interest) per file
+    tasks, n_cells = __region_tasks([(f, (i, n_blocks)) for f in f_map for i in range(n_blocks)], **kwargs)
 
-        # parallel computation
-        if n_processes > 1:
-            with mp.Pool(processes=n_processes) as p:
-                results = p.map(functools.partial(__determine_ecotopes, _map_files=list(f_map), **kwargs), f_map)
-
-        # serial computation
-        else:
-            results = [__determine_ecotopes(f, init_log=False, **kwargs) for f in f_map]
-
-        # concatenate output data
-        output = [np.concatenate(arrays) for arrays in zip(*results)]
+    # extract model data and label ecotopes
+    output = __map_tasks(tasks, n_cells, **kwargs)
 
     # export ecotope-data
     if f_export:
@@ -119,16 +118,214 @@ def map_ecotopes(*f_map: str, **kwargs) -> typing.Union[glob.TypeXYLabel, tuple,
     _LOG.info(f'Ecotope-map generated in {t1 - t0:.1f} seconds')
 
     # return ecotope-map (optional)
+    return __return_output(output, return_ecotopes)
+
+
+def __return_option(return_ecotopes: typing.Union[str, bool]) -> typing.Optional[str]:
+    """Format in which the ecotope-map is returned, if any.
+
+    :param return_ecotopes: return the spatial distribution of the ecotopes
+        options: {True, False, 'dict', 'tuple', 'packed'}
+    :type return_ecotopes: bool, str
+
+    :return: format of the returned ecotope-map (if any)
+    :rtype: str, None
+
+    :raise ValueError: if `return_ecotopes` is neither a boolean, nor in {'dict', 'tuple', 'packed'}
+    """
+    if isinstance(return_ecotopes, str):
+        return_options = 'dict', 'tuple', 'packed'
+        if return_ecotopes not in return_options:
+            msg = f'`return_ecotopes` must be either a `bool`, or in {return_options}; {return_ecotopes} is given.'
+            raise ValueError(msg)
+        return return_ecotopes
+    return 'dict' if return_ecotopes else None
+
+
+def __return_output(
+        output: typing.Tuple[np.ndarray, np.ndarray, lab.Ecotopes], return_ecotopes: typing.Optional[str]
+) -> typing.Union[glob.TypeXYLabel, tuple, None]:
+    """Ecotope-map formatted as requested (see `.map_ecotopes()`).
+
+    :param output: spatial distribution of ecotopes, with packed ecotope-labels
+    :param return_ecotopes: format of the returned ecotope-map (see `.__return_option()`)
+
+    :type output: tuple[numpy.ndarray, numpy.ndarray, src.labelling.Ecotopes]
+    :type return_ecotopes: str, None
+
+    :return: spatial distribution of ecotopes (optional)
+    :rtype: src._globals.TypeXYLabel, tuple[np.ndarray], tuple[np.ndarray, np.ndarray, src.labelling.Ecotopes], None
+    """
     # > as dictionary
     if return_ecotopes == 'dict':
         return convert2dict(*output)
     # > as tuple of arrays
     if return_ecotopes == 'tuple':
+        return output[0], output[1], output[2].labels()
+    # > as tuple of arrays with packed ecotope-labels
+    if return_ecotopes == 'packed':
         return output
     # > empty
     return None
 
 
+def __map_tasks(
+        tasks: typing.Sequence[typing.Tuple[str, typing.Tuple[int, int]]], n_cells: typing.Optional[typing.List[int]],
+        **kwargs
+) -> typing.Tuple[np.ndarray, np.ndarray, lab.Ecotopes]:
+    """Map ecotopes per task, i.e., per block of grid cells of hydrodynamic model data, and gather the results of all
+    tasks in a single ecotope-map.
+
+    :param tasks: file names and blocks of grid cells
+    :param n_cells: number of grid cells per task (if determined)
+    :param kwargs: optional arguments
+        executor: executor of the (parallel) computations, defaults to 'processes' if `n_cores > 1`, and 'serial'
+            otherwise
+        n_cores: number of cores available for parallel computations, defaults to 1
+        optional arguments to `.__determine_ecotopes()`
+
+    :type tasks: sequence[tuple]
+    :type n_cells: list[int], None
+    :type kwargs: optional
+        executor: str
+        n_cores: int
+
+    :return: spatial distribution of ecotopes, with packed ecotope-labels
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, src.labelling.Ecotopes]
+
+    :raise ValueError: if `executor` not in {'serial', 'threads', 'processes', 'dask'}
+    """
+    # parallel computing
+    n_cores: int = kwargs.get('n_cores', 1)
+    n_tasks = len(tasks)
+    n_processes = min(n_cores, n_tasks)
+    executor: str = ex.executor_name(kwargs.get('executor'), n_processes)
+
+    # single `*_map.nc`-file
+    if n_tasks == 1:
+        return __determine_ecotopes(tasks[0][0], init_log=False, cell_block=tasks[0][1], **kwargs)
+
+    # multiple `*_map.nc`-files and/or blocks of grid cells
+    _LOG.debug(f'CPUs made available: {n_cores} / {mp.cpu_count()}')
+    _LOG.debug(f'CPUs used: {n_processes} / {mp.cpu_count()}')
+    _LOG.debug(f'CPUs required: {n_tasks} / {n_processes}')
+    _LOG.debug(f'Executor: {executor}')
+
+    # output data: the number of grid cells per task is determined up-front, such that every task writes its results
+    # directly into the (preallocated) output data
+    offsets = np.cumsum([0, *(n_cells or __count_cells(tasks, **kwargs))])
+    dtypes = float, float, lab.Ecotopes.DTYPE
+
+    # in-process computation (serial, threads): results are written into the output data
+    if ex.in_process(executor, n_processes):
+        arrays = [np.empty(offsets[-1], dtype=dtype) for dtype in dtypes]
+        __execute_tasks(tasks, n_processes, outputs=arrays, offsets=offsets, init_log=False, **kwargs)
+
+    # out-of-process computation (processes, dask): results are written into shared memory
+    else:
+        buffers = [ex.SharedBuffer(offsets[-1], dtype) for dtype in dtypes]
+        try:
+            outputs = [(b.name, b.dtype) for b in buffers]
+            __execute_tasks(tasks, n_processes, outputs=outputs, offsets=offsets, **kwargs)
+        finally:
+            for buffer in buffers:
+                buffer.unlink()
+        arrays = [np.asarray(b) for b in buffers]
+
+    # return ecotope-map
+    return arrays[0], arrays[1], lab.Ecotopes(arrays[2])
+
+
+def map_scenarios(
+        *f_map: str, scenarios: typing.Sequence[dict], **kwargs
+) -> typing.Tuple[np.ndarray, np.ndarray, lab.Ecotopes, typing.List[typing.Dict[str, int]]]:
+    """Map ecotopes from hydrodynamic model data for multiple scenarios of the ecotope-labelling, e.g., for sensitivity
+    studies. The model data is read and pre-processed only once, after which every scenario is labelled in a vectorised
+    pass over all grid cells.
+
+    A scenario is defined by a dictionary with (a subset of) the following keys, which overwrite the optional arguments
+    for that scenario: {'f_eco_config', 'friction_coefficient', 'shields', 'chezy', 'relative_density', 'mlws',
+    'mhwn', 'substratum_1'}.
+
+    :param f_map: file name(s) of hydrodynamic model output data (*.nc)
+    :param scenarios: settings of the ecotope-labelling per scenario
+    :param kwargs: optional arguments
+        executor: executor of the (parallel) pre-processing of multiple files, defaults to 'processes' if
+            `n_cores > 1`, and 'serial' otherwise
+        n_cores: number of cores available for parallel computations, defaults to 1
+        optional arguments to `.__log_config()`
+        optional arguments to `.extract_model_data()`
+        optional arguments to `.label_settings()`
+
+    :type f_map: str
+    :type scenarios: sequence[dict]
+    :type kwargs: optional
+        executor: str
+        n_cores: int
+
+    :return: x-, y-coordinates, packed ecotope-labels per scenario (scenario x grid cell), and number of instances per
+        ecotope-label per scenario
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, src.labelling.Ecotopes, list[dict[str, int]]]
+
+    :raise ValueError: if a scenario contains other keys than the settings of the ecotope-labelling
+    :raise ValueError: if `substratum_1` not in {None, 'soft', 'hard'}
+    """
+    # start time
+    t0 = time.perf_counter()
+
+    # set logging configuration
+    __log_config(**kwargs)
+
+    # labelling settings per scenario: validated before reading model data
+    for i, scenario in enumerate(scenarios):
+        unknown = set(scenario) - set(_SCENARIO_KEYS)
+        if unknown:
+            msg = f'Scenario {i} contains unknown key(s): {unknown}; choose from {_SCENARIO_KEYS}'
+            raise ValueError(msg)
+    settings = [label_settings(**{**kwargs, **scenario}) for scenario in scenarios]
+
+    # extract model data: once for all scenarios
+    model_data = extract_model_data(*f_map, **kwargs)
+
+    # ecotope-labelling per scenario
+    codes = np.stack([label_ecotopes(model_data, **s).codes for s in settings])
+    counts = [lab.Ecotopes(c).counts() for c in codes]
+
+    # computation time
+    t1 = time.perf_counter()
+    _LOG.info(f'Ecotope-maps of {len(scenarios)} scenarios generated in {t1 - t0:.1f} seconds')
+
+    # return ecotope-maps
+    return model_data['x_coordinates'].data, model_data['y_coordinates'].data, lab.Ecotopes(codes), counts
+
+
+def extract_model_data(*f_map: str, **kwargs) -> typing.Dict[str, np.ndarray]:
+    """Extract and pre-process the hydrodynamic model data of one or more map-files, which can be labelled repeatedly
+    (see `label_ecotopes()`).
+
+    :param f_map: file name(s) of hydrodynamic model output data (*.nc)
+    :param kwargs: optional arguments
+        executor: executor of the (parallel) pre-processing of multiple files, defaults to 'processes' if
+            `n_cores > 1`, and 'serial' otherwise
+        n_cores: number of cores available for parallel computations, defaults to 1
+        optional arguments to `.__model_data()`
+
+    :type f_map: str
+    :type kwargs: optional
+        executor: str
+        n_cores: int
+
+    :return: (x,y)-coordinates and pre-processed model data (see `src.preprocessing.process_map_data()`)
+    :rtype: dict[str, numpy.ndarray]
+    """
+    kwargs['model_config'] = __map_config(**kwargs)
+    f_map = [f for f, _ in __region_tasks([(f, None) for f in f_map], **kwargs)[0]]
+    n_processes = min(kwargs.get('n_cores', 1), len(f_map))
+    with ex.get_executor(kwargs.get('executor'), n_processes) as pool:
+        model_data = list(pool.map(functools.partial(__model_data, **kwargs), f_map))
+    return {k: np.ma.concatenate([d[k] for d in model_data]) for k in model_data[0]}
+
+
 def __log_config(part_id: int = None, **kwargs) -> None:
     """Set logging configuration.
 
@@ -165,13 +362,26 @@ def __log_config(part_id: int = None, **kwargs) -> None:
         logging.basicConfig(level=log_level.upper())
 
 
-# TODO: Split in components that can be tested
-def __determine_ecotopes(file_name: str, **kwargs) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Map ecotopes from hydrodynamic model data.
+def __determine_ecotopes(
+        file_name: str, settings: dict = None, model_config: dict = None, **kwargs
+) -> typing.Tuple[np.ndarray, np.ndarray, lab.Ecotopes]:
+    """Map ecotopes from hydrodynamic model data. The labelling settings and the map-configuration are passed explicitly
+    when shared by multiple tasks, and determined from the optional arguments otherwise.
 
     :param f_map: file name of hydrodynamic model output data (*.nc)
+    :param settings: labelling settings (see `.label_settings()`), defaults to None
+    :param model_config: map-configuration (see `.__map_config()`), defaults to None
     :param kwargs: optional arguments
+        bbox: region of interest defined as bounding box (x_min, y_min, x_max, y_max), defaults to None
+        cache: cache the pre-processed model data on disk to skip reading the model data in repeated runs, either as
+            directory of the cache or `True` to use the default directory ('[wd_export or wd]/.emma_cache'), defaults to
+            False
+        cache_max_age: maximum age of the cached model data since its last use [days], defaults to None
+        cache_max_size: maximum size of the cache (e.g., '1GB'), defaults to None
+        cell_block: block of grid cells to process, defined as (block index, number of blocks), defaults to None
         chezy: Chezy coefficient, defaults to 50
+        dtype: floating-point data type of the model output data, e.g., 'float32' to halve the memory usage; the
+            temporal statistics are accumulated in double precision, defaults to None (i.e., as stored)
         export_log: export log-file, defaults to None
         f_eco_config: file name of ecotopes configuration file, defaults to None
         f_export: file name for exporting ecotope map(s), defaults to None
@@ -179,61 +389,123 @@ def __determine_ecotopes(file_name: str, **kwargs) -> typing.Tuple[np.ndarray, n
         friction_coefficient: proxy friction coefficient combining `shields`, `chezy`, and `relative_density`,
             defaults to None
         log_level: level of log-statements printed/filed, defaults to 'warning'
+        max_memory: memory budget for reading model output data in chunks (e.g., '4GB'), defaults to None
+        median_resolution: resolution of the bounded-memory estimation of the median flow velocity [m/s]; when
+            `None`, the exact median flow velocity is determined, defaults to None
         mhwn: mean high water, neap tide, defaults to None
         mlws: mean low water, spring tide, defaults to None
         model_sediment: sediment data is included in model output data, defaults to False [not implemented]
         relative_density: relative density of sediment w.r.t. (sea) water, defaults to 1.58
         return_ecotopes: return a dictionary with the ecotopes using (x,y)-coordinates as keys, defaults to True
+        roi_polygon: region of interest defined as polygon, either as `shapely`-geometry or as its vertices; only the
+            grid cells within the region of interest are read, defaults to None
         shields: critical Shields parameter, defaults to 0.07
         substratum_1: definition of substratum {None, 'soft', 'hard'}, defaults to None
         time_axis: time-axis in model output data, defaults to 0
+        time_chunk: number of time-steps read at once from model output data, defaults to None (i.e., based on
+            `max_memory`, or all time-steps if no memory budget is given)
+        time_stride: stride of the time-steps read from model output data, e.g., for a quick preview, defaults to None
+        time_window: time-window read from model output data, e.g., to exclude the spin-up, defined as (start, end)
+            by time-step indices or date-times (see `src.preprocessing.MapData.i_time`), defaults to None
         wd: working directory, defaults to None
         wd_config: working directory of configuration file(s), defaults to None
         wd_export: working directory for exporting ecotope map(s), defaults to None
 
     :type f_map: str, typing.Sized
+    :type settings: dict, optional
+    :type model_config: dict, optional
     :type kwargs: optional
+        bbox: tuple[float, float, float, float]
+        cache: bool, str
+        cache_max_age: float
+        cache_max_size: int, str
+        cell_block: tuple[int, int]
         chezy: float
+        dtype: str
         export_log: bool, str
         f_eco_config: str
         f_export: str
         f_map_config: str
         friction_coefficient: float
         log_level: str
+        max_memory: int, str
+        median_resolution: float
         mhwn: float
         mlws: float
         model_sediment: bool
         relative_density: float
         return_ecotopes: bool
+        roi_polygon: shapely.Geometry, sequence[tuple[float, float]]
         shields: float
         substratum_1: str
         time_axis: int
+        time_chunk: int
+        time_stride: int
+        time_window: tuple
         wd: str
         wd_config: str
         wd_export: str
 
-    :return: spatial distribution of ecotopes
-    :rtype: tuple
+    :return: spatial distribution of ecotopes, with packed ecotope-labels
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, src.labelling.Ecotopes]
 
     :raise ValueError: if `substratum_1` not in {None, 'soft', 'hard'}
     """
     # partition ID
-    _map_files: list = kwargs.pop('_map_files', [])
-    part_id: int = _map_files.index(file_name) if _map_files else None
+    part_id: int = kwargs.pop('_part_id', None)
 
     # set logging configuration
     if kwargs.get('init_log', True):
         __log_config(part_id, **kwargs)
 
-    # optional arguments
-    wd: str = kwargs.get('wd')
-    time_axis: int = kwargs.get('time_axis', 0)
-    model_sediment: bool = kwargs.get('model_sediment', False)
+    # labelling settings: validated before reading model data
+    if settings is None:
+        settings = label_settings(**kwargs)
+
+    # extract model data
+    model_data = __model_data(file_name, model_config=model_config, **kwargs)
 
+    # ecotope-labelling
+    ecotopes = label_ecotopes(model_data, **settings)
+
+    # return (x,y)-coordinates and ecotope-labels
+    return model_data['x_coordinates'], model_data['y_coordinates'], ecotopes
+
+
+def label_settings(**kwargs) -> dict:
+    """Settings of the ecotope-labelling, incl. the (compiled) ecotope configuration.
+
+    :param kwargs: optional arguments
+        chezy: Chezy coefficient, defaults to 50
+        f_eco_config: file name of ecotopes configuration file, defaults to None
+        friction_coefficient: proxy friction coefficient combining `shields`, `chezy`, and `relative_density`,
+            defaults to None
+        mhwn: mean high water, neap tide, defaults to None
+        mlws: mean low water, spring tide, defaults to None
+        relative_density: relative density of sediment w.r.t. (sea) water, defaults to 1.58
+        shields: critical Shields parameter, defaults to 0.07
+        substratum_1: definition of substratum {None, 'soft', 'hard'}, defaults to None
+        wd_config: working directory of configuration file(s), defaults to None
+
+    :type kwargs: optional
+        chezy: float
+        f_eco_config: str, dict
+        friction_coefficient: float
+        mhwn: float
+        mlws: float
+        relative_density: float
+        shields: float
+        substratum_1: str
+        wd_config: str
+
+    :return: labelling settings, i.e., arguments to `.label_ecotopes()`
+    :rtype: dict
+
+    :raise ValueError: if `substratum_1` not in {None, 'soft', 'hard'}
+    """
+    # optional arguments
     # > configuration file
-    wd_config: str = kwargs.get('wd_config')
     eco_config: str = kwargs.get('f_eco_config')
-    map_config: str = kwargs.get('f_map_config')
 
     # > substratum 1
     substratum_1: str = kwargs.get('substratum_1')
@@ -261,59 +533,410 @@ def __determine_ecotopes(file_name: str, **kwargs) -> typing.Tuple[np.ndarray, n
             f'hard-coded values in the configuration-file ({eco_config or "emma.json"}) are used'
         )
 
-    # set configurations
-    # > ecotope configuration
-    glob.LABEL_CONFIG = config_file.load_config('emma.json', eco_config, wd_config)
-    # > map configuration
-    glob.MODEL_CONFIG = config_file.load_config('dfm1.json', map_config, wd_config)
+    # compiled ecotope configuration
+    label_config = lab.compile_config(ecotope_config(**kwargs), mlws=mlws, mhwn=mhwn)
 
-    # extract model data
-    map_format = (map_config or 'dfm1.json')[:-5]
-    with pre.MapData(file_name, wd=wd, map_format=map_format) as data:
-        x_coordinates = data.x_coordinates
-        y_coordinates = data.y_coordinates
-        water_depth = data.water_depth
-        if np.mean(water_depth) < 0:
-            _LOG.warning(
-                'Average water depth is negative, while water depth is considered positive downwards. '
-                'Check the model configuration and update the configuration file accordingly.'
-            )
-        velocity = data.velocity
-        salinity = data.salinity
-        if model_sediment:
+    # return settings
+    return dict(
+        label_config=label_config, substratum_1=substratum_1,
+        shields=shields, chezy=chezy, r_density=r_density, c_friction=c_friction
+    )
+
+
+def ecotope_config(**kwargs) -> dict:
+    """Ecotope configuration (not compiled), i.e., the default configuration updated with the user-defined
+    configuration (if any).
+
+    :param kwargs: optional arguments
+        f_eco_config: file name of ecotopes configuration file, defaults to None
+        wd_config: working directory of configuration file(s), defaults to None
+
+    :type kwargs: optional
+        f_eco_config: str, dict
+        wd_config: str
+
+    :return: ecotope configuration
+    :rtype: dict
+    """
+    return config_file.load_config('emma.json', kwargs.get('f_eco_config'), kwargs.get('wd_config'))
+
+
+def __map_config(**kwargs) -> dict:
+    """Map-configuration, i.e., the variable names of the model output data, which is loaded once and passed to the
+    tasks explicitly (instead of by `src._globals.MODEL_CONFIG`).
+
+    :param kwargs: optional arguments
+        f_map_config: file name of mapping configuration file, defaults to None
+        wd_config: working directory of configuration file(s), defaults to None
+
+    :type kwargs: optional
+        f_map_config: str
+        wd_config: str
+
+    :return: map-configuration
+    :rtype: dict
+    """
+    return config_file.load_config('dfm1.json', kwargs.get('f_map_config'), kwargs.get('wd_config'))
+
+
+def __model_data(file_name: str, model_config: dict = None, **kwargs) -> typing.Dict[str, np.ndarray]:
+    """Extract and pre-process the hydrodynamic model data, optionally from the cache of pre-processed model data.
+
+    :param file_name: file name of hydrodynamic model output data (*.nc)
+    :param model_config: map-configuration (see `.__map_config()`), defaults to None
+    :param kwargs: optional arguments
+        bbox: region of interest defined as bounding box (x_min, y_min, x_max, y_max), defaults to None
+        cache: cache the pre-processed model data on disk, defaults to False
+        cache_max_age: maximum age of the cached model data since its last use [days], defaults to None
+        cache_max_size: maximum size of the cache (e.g., '1GB'), defaults to None
+        cell_block: block of grid cells to process, defined as (block index, number of blocks), defaults to None
+        dtype: floating-point data type of the model output data, e.g., 'float32', defaults to None
+        f_map_config: file name of mapping configuration file, defaults to None
+        max_memory: memory budget for reading model output data in chunks (e.g., '4GB'), defaults to None
+        median_resolution: resolution of the bounded-memory estimation of the median flow velocity [m/s], defaults to
+            None
+        model_sediment: sediment data is included in model output data, defaults to False [not implemented]
+        roi_polygon: region of interest defined as polygon, either as `shapely`-geometry or as its vertices, defaults
+            to None
+        time_axis: time-axis in model output data, defaults to 0
+        time_chunk: number of time-steps read at once from model output data, defaults to None
+        time_stride: stride of the time-steps read from model output data, defaults to None
+        time_window: time-window read from model output data, defined as (start, end) by time-step indices or
+            date-times (see `src.preprocessing.MapData.i_time`), defaults to None
+        wd: working directory, defaults to None
+        wd_config: working directory of configuration file(s), defaults to None
+        wd_export: working directory for exporting ecotope map(s), defaults to None
+
+    :type file_name: str
+    :type model_config: dict, optional
+    :type kwargs: optional
+        bbox: tuple[float, float, float, float]
+        cache: bool, str
+        cache_max_age: float
+        cache_max_size: int, str
+        cell_block: tuple[int, int]
+        dtype: str
+        f_map_config: str
+        max_memory: int, str
+        median_resolution: float
+        model_sediment: bool
+        roi_polygon: shapely.Geometry, sequence[tuple[float, float]]
+        time_axis: int
+        time_chunk: int
+        time_stride: int
+        time_window: tuple
+        wd: str
+        wd_config: str
+        wd_export: str
+
+    :return: (x,y)-coordinates and pre-processed model data (see `src.preprocessing.process_map_data()`)
+    :rtype: dict[str, numpy.ndarray]
+    """
+    # map configuration
+    if model_config is None:
+        model_config = __map_config(**kwargs)
+    map_format = (kwargs.get('f_map_config') or 'dfm1.json')[:-5]
+
+    # cached (pre-processed) model data
+    cache, cache_key = __model_cache(file_name, map_format, model_config=model_config, **kwargs)
+    if cache is not None:
+        model_data = cache.load(cache_key)
+        if model_data is not None:
+            return model_data
+
+    # model data
+    model_data = __read_model_data(file_name, map_format, model_config=model_config, **kwargs)
+
+    # store pre-processed model data
+    if cache is not None:
+        cache.store(cache_key, model_data)
+
+    # return model data
+    return model_data
+
+
+def __model_cache(
+        file_name: str, map_format: str, **kwargs
+) -> typing.Tuple[typing.Optional[ca.StatisticsCache], typing.Optional[str]]:
+    """Cache of pre-processed model data, and the key of the model data of the map-file in it.
+
+    :param file_name: file name of hydrodynamic model output data (*.nc)
+    :param map_format: format of the model output data
+    :param kwargs: optional arguments (see `.__model_data()`), of which those affecting the pre-processed model data
+        are part of the key
+
+    :type file_name: str
+    :type map_format: str
+    :type kwargs: optional
+
+    :return: cache and key of the model data, or (None, None) if no cache is used
+    :rtype: tuple[src.cache.StatisticsCache, str], tuple[None, None]
+    """
+    # optional arguments
+    cache: typing.Union[bool, str] = kwargs.get('cache', False)
+    wd: str = kwargs.get('wd')
+    if not cache:
+        return None, None
+
+    # cache of pre-processed model data
+    if not isinstance(cache, str):
+        cache = os.path.join(kwargs.get('wd_export') or wd or os.getcwd(), '.emma_cache')
+    cache = ca.StatisticsCache(cache, max_size=kwargs.get('cache_max_size'), max_age=kwargs.get('cache_max_age'))
+
+    # key of model data
+    key = cache.key(
+        os.path.join(wd or os.getcwd(), file_name), map_format=map_format, model_config=kwargs.get('model_config'),
+        cell_block=kwargs.get('cell_block'),
+        time_axis=kwargs.get('time_axis', 0), median_resolution=kwargs.get('median_resolution'),
+        model_sediment=kwargs.get('model_sediment', False), time_window=kwargs.get('time_window'),
+        time_stride=kwargs.get('time_stride'), bbox=kwargs.get('bbox'), roi_polygon=kwargs.get('roi_polygon'),
+        dtype=kwargs.get('dtype')
+    )
+    return cache, key
+
+
+def __read_model_data(file_name: str, map_format: str, **kwargs) -> typing.Dict[str, np.ndarray]:
+    """Read and pre-process the hydrodynamic model data in a single pass over the time-axis.
+
+    :param file_name: file name of hydrodynamic model output data (*.nc)
+    :param map_format: format of the model output data
+    :param kwargs: optional arguments (see `.__model_data()`)
+
+    :type file_name: str
+    :type map_format: str
+    :type kwargs: optional
+
+    :return: (x,y)-coordinates and pre-processed model data (see `src.preprocessing.process_map_data()`)
+    :rtype: dict[str, numpy.ndarray]
+    """
+    with pre.MapData(
+            file_name, wd=kwargs.get('wd'), map_format=map_format, max_memory=kwargs.get('max_memory'),
+            cell_block=kwargs.get('cell_block'), time_window=kwargs.get('time_window'),
+            time_stride=kwargs.get('time_stride'), bbox=kwargs.get('bbox'), roi_polygon=kwargs.get('roi_polygon'),
+            dtype=kwargs.get('dtype'), model_config=kwargs.get('model_config')
+    ) as data:
+        model_data = dict(x_coordinates=data.x_coordinates, y_coordinates=data.y_coordinates)
+        # pre-process model data: single pass over time-axis
+        model_data.update(pre.process_map_data(
+            data, time_chunk=kwargs.get('time_chunk'), time_axis=kwargs.get('time_axis', 0),
+            median_resolution=kwargs.get('median_resolution')
+        ))
+        if kwargs.get('model_sediment', False):
             _LOG.warning('Retrieving grain sizes from the model not implemented')
-            grain_sizes = data.grain_size
-        else:
-            grain_sizes = None
+            if data.grain_size is not None:
+                model_data['grain_size'] = data.grain_size
+
+    # return model data
+    return model_data
+
+
+def label_ecotopes(
+        model_data: typing.Dict[str, np.ndarray], label_config: lab.LabelConfig, substratum_1: str = None, **kwargs
+) -> lab.Ecotopes:
+    """Label the ecotopes based on the pre-processed hydrodynamic model data.
+
+    :param model_data: pre-processed model data
+    :param label_config: compiled ecotope configuration
+    :param substratum_1: definition of substratum {None, 'soft', 'hard'}, defaults to None
+    :param kwargs: optional arguments to `src.preprocessing.grain_size_estimation()`
 
+    :type model_data: dict[str, numpy.ndarray]
+    :type label_config: src.labelling.LabelConfig
+    :type substratum_1: str, optional
+    :type kwargs: optional
+
+    :return: packed ecotope-labels
+    :rtype: src.labelling.Ecotopes
+    """
     # pre-process model data
-    mean_salinity, std_salinity = pre.process_salinity(salinity, time_axis=time_axis)
-    mean_depth, in_duration, in_frequency = pre.process_water_depth(water_depth, time_axis=time_axis)
-    med_velocity, max_velocity = pre.process_velocity(velocity, time_axis=time_axis)
-    if grain_sizes is None:
-        grain_sizes = pre.grain_size_estimation(
-            med_velocity, shields=shields, chezy=chezy, r_density=r_density, c_friction=c_friction
+    if np.mean(model_data['mean_depth']) < 0:
+        _LOG.warning(
+            'Average water depth is negative, while water depth is considered positive downwards. '
+            'Check the model configuration and update the configuration file accordingly.'
         )
+    grain_sizes = model_data.get('grain_size')
+    if grain_sizes is None:
+        grain_sizes = pre.grain_size_estimation(model_data['median_velocity'], **kwargs)
     _LOG.info('Model data pre-processed')
 
     # ecotope-labelling
-    char_1 = np.vectorize(lab.salinity_code)(mean_salinity, std_salinity)
-    char_2 = np.full(char_1.shape, lab.substratum_1_code(substratum_1), dtype=str)
-    char_3 = np.vectorize(lab.depth_1_code)(mean_depth, mlws, mhwn)
-    char_4 = np.vectorize(lab.hydrodynamics_code)(max_velocity, char_3)
-    char_5 = np.vectorize(lab.depth_2_code)(char_2, char_3, mean_depth, in_duration, in_frequency)
-    char_6 = np.vectorize(lab.substratum_2_code)(char_2, char_4, grain_sizes)
-
-    # construct ecotope-labels
-    ecotopes = np.array([
-        f'{c1}{c2}.{c3}{c4}{c5}{c6}'
-        for c1, c2, c3, c4, c5, c6
-        in zip(char_1, char_2, char_3, char_4, char_5, char_6)
-    ])
-    _LOG.info(f'Ecotopes defined: {len(ecotopes)} instances; {len(np.unique(ecotopes))} unique ecotopes')
+    session = se.LabellingSession(model_data, label_config, substratum_1=substratum_1, grain_sizes=grain_sizes)
+    ecotopes = session.ecotopes
+    _LOG.info(f'Ecotopes defined: {len(ecotopes)} instances; {len(np.unique(ecotopes.codes))} unique ecotopes')
 
-    # return (x,y)-coordinates and ecotope-labels
-    return x_coordinates, y_coordinates, ecotopes
+    # return packed ecotope-labels
+    return ecotopes
+
+
+def __count_cells(tasks: typing.Sequence[typing.Tuple[str, typing.Tuple[int, int]]], **kwargs) -> typing.List[int]:
+    """Number of grid cells per task, which only requires the (lazily opened) map-files' dimensions and domain numbers,
+    or the (x,y)-coordinates of the cached model data (see `.__model_cache()`).
+
+    :param tasks: file names and blocks of grid cells
+    :param kwargs: optional arguments
+        bbox: region of interest defined as bounding box (x_min, y_min, x_max, y_max), defaults to None
+        f_map_config: file name of mapping configuration file, defaults to None
+        model_config: map-configuration (see `.__map_config()`), defaults to None
+        roi_polygon: region of interest defined as polygon, either as `shapely`-geometry or as its vertices, defaults
+            to None
+        wd: working directory, defaults to None
+        wd_config: working directory of configuration file(s), defaults to None
+        optional arguments to `.__model_cache()`
+
+    :type tasks: sequence[tuple]
+    :type kwargs: optional
+        bbox: tuple[float, float, float, float]
+        f_map_config: str
+        model_config: dict
+        roi_polygon: shapely.Geometry, sequence[tuple[float, float]]
+        wd: str
+        wd_config: str
+
+    :return: number of grid cells per task
+    :rtype: list[int]
+    """
+    # optional arguments
+    wd: str = kwargs.get('wd')
+    map_format = (kwargs.get('f_map_config') or 'dfm1.json')[:-5]
+    model_config: dict = kwargs.get('model_config') or __map_config(**kwargs)
+
+    # number of grid cells: from the cached model data (if any), or from the map-file
+    n_cells = []
+    for file_name, cell_block in tasks:
+        cache, key = __model_cache(
+            file_name, map_format, **{**kwargs, 'cell_block': cell_block, 'model_config': model_config}
+        )
+        n = None if cache is None else cache.n_cells(key)
+        if n is None:
+            with pre.MapData(
+                    file_name, wd=wd, map_format=map_format, model_config=model_config, cell_block=cell_block,
+                    bbox=kwargs.get('bbox'), roi_polygon=kwargs.get('roi_polygon')
+            ) as data:
+                n = data.n_cells
+        n_cells.append(n)
+    return n_cells
+
+
+def __region_tasks(
+        tasks: typing.Sequence[typing.Tuple[str, typing.Tuple[int, int]]], **kwargs
+) -> typing.Tuple[list, typing.Optional[typing.List[int]]]:
+    """Tasks with grid cells in the region of interest (if defined), such that partitions (and blocks of grid cells)
+    outside the region of interest are skipped without reading their time-dependent data.
+
+    :param tasks: file names and blocks of grid cells
+    :param kwargs: optional arguments
+        bbox: region of interest defined as bounding box (x_min, y_min, x_max, y_max), defaults to None
+        roi_polygon: region of interest defined as polygon, either as `shapely`-geometry or as its vertices, defaults
+            to None
+        optional arguments to `.__count_cells()`
+
+    :type tasks: sequence[tuple]
+    :type kwargs: optional
+        bbox: tuple[float, float, float, float]
+        roi_polygon: shapely.Geometry, sequence[tuple[float, float]]
+
+    :return: tasks with grid cells in region of interest, and their number of grid cells (if determined)
+    :rtype: tuple[list, list[int]]
+
+    :raise ValueError: if none of the tasks have grid cells in the region of interest
+    """
+    if kwargs.get('bbox') is None and kwargs.get('roi_polygon') is None:
+        return list(tasks), None
+
+    # tasks in region of interest
+    selection = [(t, n) for t, n in zip(tasks, __count_cells(tasks, **kwargs)) if n > 0]
+    _LOG.info(f'Tasks with grid cells in region of interest: {len(selection)} / {len(tasks)}')
+    if not selection:
+        msg = 'No grid cells in the region of interest'
+        raise ValueError(msg)
+
+    # return tasks
+    tasks, n_cells = map(list, zip(*selection))
+    return tasks, n_cells
+
+
+def __execute_tasks(
+        tasks: typing.Sequence[typing.Tuple[str, typing.Tuple[int, int]]], n_workers: int, **kwargs
+) -> None:
+    """Execute the tasks, i.e., map ecotopes per block of grid cells of hydrodynamic model data.
+
+    :param tasks: file names and blocks of grid cells
+    :param n_workers: number of workers
+    :param kwargs: optional arguments
+        executor: executor {'serial', 'threads', 'processes', 'dask'}, defaults to None
+        optional arguments to `.__determine_task()`
+
+    :type tasks: sequence[tuple]
+    :type n_workers: int
+    :type kwargs: optional
+        executor: str
+    """
+    # optional arguments
+    executor: str = kwargs.get('executor')
+
+    # execute tasks
+    with ex.get_executor(executor, n_workers) as pool:
+        # consume results to raise exceptions of the tasks (if any)
+        for _ in pool.map(functools.partial(__determine_task, **kwargs), enumerate(tasks)):
+            pass
+
+
+def __determine_task(
+        task: typing.Tuple[int, typing.Tuple[str, typing.Tuple[int, int]]],
+        outputs: typing.Sequence[typing.Union[np.ndarray, typing.Tuple[str, np.dtype]]], offsets: np.ndarray,
+        **kwargs
+) -> None:
+    """Map ecotopes from a block of grid cells of hydrodynamic model data as a separate task, i.e., in parallel. The
+    results are written into the output data directly, or into shared memory when executed in another process, which
+    prevents pickling them back to the calling process.
+
+    :param task: task ID, and file name and block of grid cells
+    :param outputs: output data of the x-, y-coordinates, and packed ecotope-labels; as arrays, or as names and data
+        types of the shared-memory blocks
+    :param offsets: offsets of the tasks' results in the output data
+    :param kwargs: optional arguments to `.__determine_ecotopes()`
+
+    :type task: tuple
+    :type outputs: sequence[numpy.ndarray, tuple[str, numpy.dtype]]
+    :type offsets: numpy.ndarray
+    :type kwargs: optional
+    """
+    part_id, (file_name, cell_block) = task
+    x, y, ecotopes = __determine_ecotopes(file_name, _part_id=part_id, cell_block=cell_block, **kwargs)
+
+    # write results into output data
+    index = slice(offsets[part_id], offsets[part_id + 1])
+    for output, values in zip(outputs, (x, y, ecotopes.codes)):
+        __write_output(output, values, index, offsets[-1])
+
+
+def __write_output(
+        output: typing.Union[np.ndarray, typing.Tuple[str, np.dtype]], values: np.ndarray, index: slice, size: int
+) -> None:
+    """Write the results of a task into the output data, either directly (in-process) or into shared memory.
+
+    :param output: output data; as array, or as name and data type of the shared-memory block
+    :param values: results of the task
+    :param index: location of the task's results in the output data
+    :param size: size of the output data
+
+    :type output: numpy.ndarray, tuple[str, numpy.dtype]
+    :type values: numpy.ndarray
+    :type index: slice
+    :type size: int
+    """
+    # in-process
+    if isinstance(output, np.ndarray):
+        output[index] = values
+        return
+
+    # shared memory
+    name, dtype = output
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        np.ndarray(size, dtype=dtype, buffer=shm.buf)[index] = values
+    finally:
+        shm.close()
 
 
 def convert2dict(x: typing.Sequence, y: typing.Sequence, ecotope: typing.Sequence) -> glob.TypeXYLabel:
@@ -326,7 +949,7 @@ def convert2dict(x: typing.Sequence, y: typing.Sequence, ecotope: typing.Sequenc
 
     :type x: sequence[float]
     :type y: sequence[float]
-    :type ecotope: sequence[str]
+    :type ecotope: sequence[str], src.labelling.Ecotopes
 
     :return: dictionary-based spatial distribution of ecotopes
     :rtype: str._globals.TypeXYLabel
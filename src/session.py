@@ -0,0 +1,213 @@
+"""
+Labelling session for the incremental (re)labelling of ecotopes, e.g., for interactive tuning of the ecotope
+configuration.
+
+Author: Gijs G. Hendrickx
+"""
+import logging
+import typing
+
+import numpy as np
+
+from src import labelling as lab
+
+_LOG = logging.getLogger(__name__)
+
+# label-characters depending on the entries of the (compiled) ecotope configuration
+_CONFIG_DEPENDENCIES = {
+    'salinity_variable': 0,
+    'salinity': 0,
+    'depth_1': 2,
+    'hydrodynamics_stagnant': 3,
+    'hydrodynamics_sub_littoral': 3,
+    'hydrodynamics_littoral': 3,
+    'depth_2_sub_littoral': 4,
+    'depth_2_littoral': 4,
+    'depth_2_supra_littoral': 4,
+    'substratum_2_soft': 5,
+}
+
+# label-characters depending on other label-characters, i.e., downstream label-characters
+_CHARACTER_DEPENDENCIES = {
+    0: (),
+    1: (4, 5),
+    2: (3, 4),
+    3: (5,),
+    4: (),
+    5: (),
+}
+
+
+class LabellingSession:
+    """Labelling of the ecotopes that keeps the label-characters per grid cell, such that updating the ecotope
+    configuration, the substratum, or the grain sizes only recomputes the affected label-characters and the label-
+    characters depending on them:
+     1. salinity: salinity (configuration);
+     2. substratum 1: substratum;
+     3. depth 1: depth 1 (configuration);
+     4. hydrodynamics: hydrodynamics (configuration), and depth 1;
+     5. depth 2: depth 2 (configuration), substratum 1, and depth 1;
+     6. substratum 2: substratum 2 (configuration), grain sizes, substratum 1, and hydrodynamics.
+    """
+
+    def __init__(
+            self, model_data: typing.Dict[str, np.ndarray], config: lab.LabelConfig, substratum_1: str = None,
+            grain_sizes: np.ndarray = None
+    ) -> None:
+        """
+        :param model_data: pre-processed model data (see `src.preprocessing.process_map_data()`)
+        :param config: compiled ecotope configuration
+        :param substratum_1: definition of substratum {None, 'soft', 'hard'}, defaults to None
+        :param grain_sizes: grain sizes [um], defaults to None
+
+        :type model_data: dict[str, numpy.ndarray]
+        :type config: src.labelling.LabelConfig
+        :type substratum_1: str, optional
+        :type grain_sizes: numpy.ndarray, optional
+        """
+        self._data = model_data
+        self._config = config
+        self._substratum_1 = substratum_1
+        self._grain_sizes = grain_sizes
+
+        self._characters: typing.List[typing.Optional[np.ndarray]] = [None] * len(lab.Ecotopes.CHARACTERS)
+        self._codes: typing.List[typing.Optional[np.ndarray]] = [None] * len(lab.Ecotopes.CHARACTERS)
+        self._update(set(range(len(lab.Ecotopes.CHARACTERS))))
+
+    @property
+    def config(self) -> lab.LabelConfig:
+        """
+        :return: compiled ecotope configuration
+        :rtype: src.labelling.LabelConfig
+        """
+        return self._config
+
+    @property
+    def ecotopes(self) -> lab.Ecotopes:
+        """
+        :return: packed ecotope-labels
+        :rtype: src.labelling.Ecotopes
+        """
+        return lab.Ecotopes(sum(self._codes))
+
+    def characters(self, position: int) -> np.ndarray:
+        """Label-characters at a given position.
+
+        :param position: position of label-character
+        :type position: int
+
+        :return: label-characters
+        :rtype: numpy.ndarray
+        """
+        return self._characters[position]
+
+    def update(self, config: lab.LabelConfig = None, **kwargs) -> typing.Set[int]:
+        """Update the ecotope configuration, substratum, and/or grain sizes, and recompute the affected label-
+        characters.
+
+        :param config: compiled ecotope configuration, defaults to None
+        :param kwargs: optional arguments
+            grain_sizes: grain sizes [um]
+            substratum_1: definition of substratum {None, 'soft', 'hard'}
+
+        :type config: src.labelling.LabelConfig, optional
+        :type kwargs: optional
+            grain_sizes: numpy.ndarray
+            substratum_1: str
+
+        :return: positions of recomputed label-characters
+        :rtype: set[int]
+        """
+        changed = set()
+
+        # ecotope configuration
+        if config is not None:
+            for field, position in _CONFIG_DEPENDENCIES.items():
+                if not _equal(getattr(self._config, field), getattr(config, field)):
+                    changed.add(position)
+            self._config = config
+
+        # substratum 1
+        if 'substratum_1' in kwargs and kwargs['substratum_1'] != self._substratum_1:
+            self._substratum_1 = kwargs['substratum_1']
+            changed.add(1)
+
+        # grain sizes
+        if 'grain_sizes' in kwargs and not _equal(kwargs['grain_sizes'], self._grain_sizes):
+            self._grain_sizes = kwargs['grain_sizes']
+            changed.add(5)
+
+        # recompute label-characters
+        return self._update(changed)
+
+    def _update(self, changed: typing.Set[int]) -> typing.Set[int]:
+        """Recompute the changed label-characters and the label-characters depending on them, in order of their
+        position (which respects their dependencies).
+
+        :param changed: positions of changed label-characters
+        :type changed: set[int]
+
+        :return: positions of recomputed label-characters
+        :rtype: set[int]
+        """
+        # downstream label-characters
+        updated = set()
+        queue = list(changed)
+        while queue:
+            position = queue.pop()
+            if position not in updated:
+                updated.add(position)
+                queue.extend(_CHARACTER_DEPENDENCIES[position])
+
+        # recompute label-characters
+        for position in sorted(updated):
+            self._characters[position] = characters = self._label(position)
+            self._codes[position] = lab.Ecotopes.from_position(position, characters)
+
+        _LOG.info(f'Label-characters recomputed: {sorted(updated)}')
+        return updated
+
+    def _label(self, position: int) -> np.ndarray:
+        """Determine the label-characters at a given position.
+
+        :param position: position of label-character
+        :type position: int
+
+        :return: label-characters
+        :rtype: numpy.ndarray
+        """
+        data, config, characters = self._data, self._config, self._characters
+        if position == 0:
+            return lab.salinity_codes(data['mean_salinity'], data['std_salinity'], config)
+        if position == 1:
+            return np.full(np.shape(data['mean_depth']), lab.substratum_1_code(self._substratum_1), dtype=str)
+        if position == 2:
+            return lab.depth_1_codes(data['mean_depth'], config)
+        if position == 3:
+            return lab.hydrodynamics_codes(data['max_velocity'], characters[2], config)
+        if position == 4:
+            return lab.depth_2_codes(
+                characters[1], characters[2], data['mean_depth'], data['duration'], data['frequency'], config
+            )
+        return lab.substratum_2_codes(characters[1], characters[3], self._grain_sizes, config)
+
+
+def _equal(a: typing.Any, b: typing.Any) -> bool:
+    """Equality of (compiled) configuration entries and/or arrays.
+
+    :param a: first entry
+    :param b: second entry
+
+    :type a: any
+    :type b: any
+
+    :return: entries are equal
+    :rtype: bool
+    """
+    if a is b:
+        return True
+    if isinstance(a, lab.Thresholds) and isinstance(b, lab.Thresholds):
+        return np.array_equal(a.edges, b.edges) and np.array_equal(a.codes, b.codes)
+    if a is None or b is None:
+        return False
+    return np.array_equal(a, b, equal_nan=np.asarray(a).dtype.kind == 'f')
@@ -0,0 +1,39 @@
+"""
+Shared fixtures of the tests.
+
+Author: Gijs G. Hendrickx
+"""
+import pytest
+
+import numpy as np
+import xarray as xr
+
+
+@pytest.fixture(name='map_file')
+def fixture_map_file(tmp_path):
+    """Synthetic map-file of a hydrodynamic model (D-Flow FM) with two-dimensional output, including dry cells."""
+    rng = np.random.default_rng(0)
+    n_time, n_cells = 50, 200
+    file = tmp_path / 'test_map.nc'
+    xr.Dataset({
+        'FlowElem_xcc': (('nFlowElem',), rng.uniform(0, 1e3, n_cells)),
+        'FlowElem_ycc': (('nFlowElem',), rng.uniform(0, 1e3, n_cells)),
+        'waterdepth': (
+            ('time', 'nFlowElem'), np.maximum(rng.uniform(-3, 20, n_cells) + rng.normal(size=(n_time, 1)), 0)
+        ),
+        'ucx': (('time', 'nFlowElem'), rng.normal(0, .5, (n_time, n_cells))),
+        'ucy': (('time', 'nFlowElem'), rng.normal(0, .5, (n_time, n_cells))),
+        'sa1': (('time', 'nFlowElem'), rng.uniform(0, 30, (n_time, n_cells))),
+    }).to_netcdf(file)
+    return file
+
+
+@pytest.fixture(name='split_map_files')
+def fixture_split_map_files(map_file):
+    """Map-files of the western (x < 500) and eastern part of the synthetic map-file (see `map_file`), stored next to
+    it."""
+    with xr.open_dataset(map_file) as ds:
+        west = ds['FlowElem_xcc'].values < 500
+        ds.isel(nFlowElem=west).to_netcdf(map_file.parent / 'test_west_map.nc')
+        ds.isel(nFlowElem=~west).to_netcdf(map_file.parent / 'test_east_map.nc')
+    return 'test_west_map.nc', 'test_east_map.nc'
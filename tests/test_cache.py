@@ -0,0 +1,109 @@
+"""
+Tests for `src/cache.py`.
+
+Author: Gijs G. Hendrickx
+"""
+# pylint: disable=locally-disabled, missing-function-docstring, protected-access
+import os
+
+import pytest
+
+import numpy as np
+import numpy.testing as npt
+import shapely
+
+from config import config_file
+from src import cache as ca
+
+# setting configuration
+ca.glob.MODEL_CONFIG = config_file.load_config('dfm1.json')
+
+
+class TestStatisticsCache:
+    """Tests for `StatisticsCache`, which should return the cached data only for an identical map-file and settings."""
+
+    @staticmethod
+    def data():
+        return {
+            'x_coordinates': np.arange(10.),
+            'mean_depth': np.ma.masked_array(np.arange(10.), mask=np.arange(10) % 3 == 0),
+        }
+
+    def test_round_trip(self, tmp_path, map_file):
+        cache = ca.StatisticsCache(str(tmp_path / 'cache'))
+        key = cache.key(str(map_file), time_axis=0)
+        assert cache.load(key) is None
+
+        cache.store(key, self.data())
+        out = cache.load(key)
+        npt.assert_array_equal(out['x_coordinates'], self.data()['x_coordinates'])
+        npt.assert_array_equal(out['mean_depth'].mask, self.data()['mean_depth'].mask)
+        npt.assert_array_equal(out['mean_depth'].compressed(), self.data()['mean_depth'].compressed())
+
+    def test_key(self, map_file):
+        key = ca.StatisticsCache.key(str(map_file), time_axis=0)
+        assert key == ca.StatisticsCache.key(str(map_file), time_axis=0)
+        assert key != ca.StatisticsCache.key(str(map_file), time_axis=1)
+
+        map_file.write_bytes(map_file.read_bytes() + b'\0')
+        assert key != ca.StatisticsCache.key(str(map_file), time_axis=0)
+
+    def test_key_arrays(self, map_file):
+        polygon = np.random.default_rng(0).uniform(size=(2000, 2))
+        other = polygon.copy()
+        other[1000] += 1e-9
+        assert len({
+            ca.StatisticsCache.key(str(map_file), roi_polygon=p)
+            for p in (polygon, other, shapely.Polygon(polygon), shapely.Polygon(other))
+        }) == 4
+        assert ca.StatisticsCache.key(str(map_file), roi_polygon=polygon) == \
+            ca.StatisticsCache.key(str(map_file), roi_polygon=polygon.copy())
+
+    def test_n_cells(self, tmp_path):
+        cache = ca.StatisticsCache(str(tmp_path))
+        assert cache.n_cells('key') is None
+        cache.store('key', self.data())
+        assert cache.n_cells('key') == 10
+
+    def test_store_failure(self, tmp_path, monkeypatch):
+        def savez(*_, **__):
+            raise OSError('disk full')
+
+        cache = ca.StatisticsCache(str(tmp_path))
+        monkeypatch.setattr(ca.np, 'savez', savez)
+        with pytest.raises(OSError):
+            cache.store('key', self.data())
+        assert not os.listdir(tmp_path)
+
+    def test_evict_removed(self, tmp_path, monkeypatch):
+        ca.StatisticsCache(str(tmp_path)).store('key', self.data())
+        cache = ca.StatisticsCache(str(tmp_path), max_size=1)
+        stat = os.stat
+
+        def removed(path, *args, **kwargs):
+            if str(path).endswith(cache._SUFFIX):
+                raise FileNotFoundError(path)
+            return stat(path, *args, **kwargs)
+
+        with monkeypatch.context() as m:
+            m.setattr(ca.os, 'stat', removed)
+            cache.evict()
+        assert cache.load('key') is not None
+
+    def test_corrupt(self, tmp_path):
+        cache = ca.StatisticsCache(str(tmp_path))
+        (tmp_path / f'key{cache._SUFFIX}').write_text('corrupt')
+        assert cache.load('key') is None
+
+    def test_max_size(self, tmp_path):
+        cache = ca.StatisticsCache(str(tmp_path), max_size=1)
+        cache.store('key', self.data())
+        assert cache.load('key') is None
+
+    def test_max_age(self, tmp_path):
+        cache = ca.StatisticsCache(str(tmp_path), max_age=1)
+        cache.store('old', self.data())
+        os.utime(tmp_path / f'old{cache._SUFFIX}', (0, 0))
+        cache.store('new', self.data())
+        assert cache.load('old') is None
+        assert cache.load('new') is not None
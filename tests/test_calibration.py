@@ -0,0 +1,86 @@
+"""
+Tests for `src/calibration.py`.
+
+Author: Gijs G. Hendrickx
+"""
+# pylint: disable=locally-disabled, missing-function-docstring
+import pytest
+
+import numpy as np
+import numpy.testing as npt
+
+from src import calibration as cal
+from src import processing
+
+
+@pytest.mark.parametrize(
+    'truth, parameters',
+    [
+        (dict(friction_coefficient=500), {'friction_coefficient': [300, 500, 1300]}),
+        (dict(mlws=-1, mhwn=1), {'mlws': [-2, -1], 'mhwn': [1, 2]}),
+        (
+            dict(f_eco_config={'hydrodynamics': {'littoral': .4}}, friction_coefficient=1300),
+            {'hydrodynamics/littoral': [.2, .4, .6]}
+        ),
+    ]
+)
+def test_calibrate(map_file, truth, parameters):
+    kwargs = dict(wd=str(map_file.parent), substratum_1='soft')
+    reference = processing.map_ecotopes(map_file.name, return_ecotopes='tuple', **kwargs, **truth)
+
+    result = cal.calibrate(map_file.name, reference=reference, parameters=parameters, **kwargs)
+    assert result.score == 1
+    assert len(result.candidates) == np.prod([len(v) for v in parameters.values()])
+
+    expected = {p: truth.get(p, .4) for p in parameters}
+    assert [s for c, s in result.candidates if c == expected] == [1]
+    for parameter, value in expected.items():
+        values, scores = result.curve(parameter)
+        npt.assert_array_equal(values, sorted(parameters[parameter]))
+        assert scores[values == value] == 1
+
+
+def test_calibrate_friction(map_file):
+    kwargs = dict(wd=str(map_file.parent), substratum_1='soft')
+    reference = processing.map_ecotopes(
+        map_file.name, return_ecotopes='tuple', friction_coefficient=1e6 / (.05 * 1.58 * 50 ** 2), **kwargs
+    )
+
+    result = cal.calibrate(map_file.name, reference=reference, parameters={'shields': [.01, .05, .5]}, **kwargs)
+    assert result.parameters == {'shields': .05}
+    assert result.score == 1
+    assert len(np.unique(result.curve('shields')[1])) == 3
+
+    with pytest.raises(ValueError):
+        cal.calibrate(
+            map_file.name, reference=reference, parameters={'shields': [.05], 'friction_coefficient': [1300]}, **kwargs
+        )
+
+
+def test_calibrate_invalid_candidate(map_file):
+    kwargs = dict(wd=str(map_file.parent), substratum_1='soft')
+    reference = processing.map_ecotopes(map_file.name, return_ecotopes='tuple', **kwargs)
+
+    result = cal.calibrate(map_file.name, reference=reference, parameters={'salinity/fresh': [5.4, 50]}, **kwargs)
+    assert result.parameters == {'salinity/fresh': 5.4}
+    assert np.isnan(result.candidates[1][1])
+
+
+@pytest.mark.parametrize('parameter', ['hydrodynamics', 'hydrodynamics/unknown', 'unknown'])
+def test_calibrate_unknown_parameter(map_file, parameter):
+    with pytest.raises(ValueError):
+        cal.calibrate(map_file.name, reference={}, parameters={parameter: [0]}, wd=str(map_file.parent))
+
+
+def test_calibrate_tolerance(map_file):
+    pytest.importorskip('scipy')
+    kwargs = dict(wd=str(map_file.parent), substratum_1='soft')
+    x, y, labels = processing.map_ecotopes(map_file.name, return_ecotopes='tuple', **kwargs)
+    reference = np.round(x, 3), np.round(y, 3), labels
+
+    with pytest.raises(ValueError):
+        cal.calibrate(map_file.name, reference=reference, parameters={'friction_coefficient': [1300]}, **kwargs)
+    result = cal.calibrate(
+        map_file.name, reference=reference, parameters={'friction_coefficient': [1300]}, tolerance=1e-3, **kwargs
+    )
+    assert result.score == 1
@@ -0,0 +1,86 @@
+"""
+Tests for `src/executors.py`.
+
+Author: Gijs G. Hendrickx
+"""
+# pylint: disable=locally-disabled, missing-function-docstring
+import importlib.util
+import operator
+
+import pytest
+
+import numpy as np
+import numpy.testing as npt
+
+from src import executors as ex
+
+
+@pytest.mark.parametrize('executor', ['serial', 'threads', 'processes'])
+def test_map(executor):
+    with ex.get_executor(executor, n_workers=2) as pool:
+        result = list(pool.map(operator.neg, range(10)))
+    assert result == [-i for i in range(10)]
+
+
+def test_map_dask():
+    pytest.importorskip('distributed')
+    with ex.get_executor('dask', n_workers=2) as pool:
+        result = list(pool.map(operator.neg, range(10)))
+    assert result == [-i for i in range(10)]
+
+
+def test_serial_exception():
+    with ex.get_executor('serial') as pool:
+        future = pool.submit(operator.truediv, 1, 0)
+    with pytest.raises(ZeroDivisionError):
+        future.result()
+
+
+@pytest.mark.parametrize(
+    'executor, n_workers, name',
+    [
+        (None, 1, 'serial'),
+        (None, 2, 'processes'),
+        ('threads', 2, 'threads'),
+        ('dask', 1, 'dask'),
+    ]
+)
+def test_executor_name(executor, n_workers, name):
+    assert ex.executor_name(executor, n_workers) == name
+
+
+@pytest.mark.parametrize(
+    'executor, n_workers, in_process',
+    [
+        (None, 1, True),
+        (None, 2, False),
+        ('threads', 2, True),
+        ('dask', 2, False),
+    ]
+)
+def test_in_process(executor, n_workers, in_process):
+    assert ex.in_process(executor, n_workers) == in_process
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        ex.get_executor('mpi')
+
+
+@pytest.mark.skipif(importlib.util.find_spec('distributed') is not None, reason='`dask.distributed` installed')
+def test_dask_missing():
+    with pytest.raises(ImportError):
+        ex.get_executor('dask')
+
+
+def test_shared_buffer():
+    buffer = ex.SharedBuffer(10, np.uint16)
+    shm = ex.shared_memory.SharedMemory(name=buffer.name)
+    np.ndarray(10, dtype=np.uint16, buffer=shm.buf)[:] = np.arange(10)
+    shm.close()
+    buffer.unlink()
+
+    array = np.asarray(buffer)
+    del buffer
+    assert array.dtype == np.uint16
+    npt.assert_array_equal(array, np.arange(10))
@@ -8,7 +8,10 @@ import os
 
 import pytest
 
-from src import export as exp
+from src import (
+    export as exp,
+    labelling as lab
+)
 
 
 @pytest.mark.parametrize(
@@ -60,3 +63,13 @@ def test_file_name_decorator(file, default, extension, expected):
         return exp.file_dir(file_name, wd)
 
     assert fn_func(file_name=file) == expected
+
+
+@pytest.mark.parametrize('container', [list, lab.Ecotopes.from_labels, lambda labels: dict(enumerate(labels)).values()])
+def test_export2csv(tmp_path, container):
+    labels = ['Z2.222f', 'Z1.221', 'xx.xxx'] * 30000
+    ecotopes = container(labels)
+    x = list(range(len(labels)))
+    exp.export2csv(x, [.5 * i for i in x], ecotopes, file_name=str(tmp_path / 'ecotopes.csv'))
+    lines = (tmp_path / 'ecotopes.csv').read_text().splitlines()
+    assert lines == [f'{i},{.5 * i},{label}' for i, label in zip(x, labels)]
@@ -4,6 +4,8 @@ Tests for `src/labelling.py`.
 Author: Gijs G. Hendrickx
 """
 # pylint: disable=locally-disabled, missing-function-docstring, protected-access
+import numpy as np
+import numpy.testing as npt
 import pytest
 
 from config import config_file
@@ -118,3 +120,174 @@ def test_substratum2_label(sub1, hydro, grain_size, label):
     """Test labelling of Substratum 2."""
     out = lab.substratum_2_code(str(sub1), str(hydro), grain_size)
     assert out.lower() == str(label)
+
+
+# tests: compiled configuration
+
+
+@pytest.mark.parametrize(
+    'config, error',
+    [
+        ({'salinity': {'fresh': 20}}, ValueError),
+        ({'depth-2': {'supra-littoral': {'frequency-1': 10}}}, ValueError),
+        ({'substratum-2': {'soft': {'silt': 'silt'}}}, TypeError),
+        ({'hydrodynamics': {'stagnant': None}}, TypeError),
+    ]
+)
+def test_compile_config_errors(config, error):
+    with pytest.raises(error):
+        lab.compile_config(config_file.load_config('emma.json', config))
+
+
+def test_compile_config_missing_key():
+    config = config_file.load_config('emma.json')
+    del config['salinity']
+    with pytest.raises(KeyError):
+        lab.compile_config(config)
+
+
+def test_compile_config_immutable():
+    with pytest.raises(ValueError):
+        LABEL_CONFIG.salinity.edges[0] = 0
+
+
+def test_compile_config_tide():
+    config = lab.compile_config(mlws=-1, mhwn=1)
+    npt.assert_array_equal(lab.depth_1_codes(np.array([2, 1, 0, -1, -2]), config), ['1', '2', '2', '2', '3'])
+
+
+# tests: vectorised labelling
+
+# dummy data
+LABEL_CONFIG = lab.compile_config()
+RNG = np.random.default_rng(0)
+N_CELLS = 1000
+CODES_SUB_1 = RNG.choice(['1', '2'], N_CELLS)
+CODES_DEPTH_1 = RNG.choice(['1', '2', '3'], N_CELLS)
+CODES_HYDRO = RNG.choice(['1', '2', '3', 'x'], N_CELLS)
+
+
+def test_salinity_codes():
+    mean, std = RNG.uniform(0, 30, N_CELLS), RNG.uniform(0, 5, N_CELLS)
+    mean[:2], std[:2] = 5.4, 18
+    truth = np.vectorize(lab.salinity_code)(mean, std)
+    npt.assert_array_equal(lab.salinity_codes(mean, std, LABEL_CONFIG), truth)
+
+
+@pytest.mark.parametrize(
+    'key, label',
+    [
+        (None, 'x'),
+        ('hard', 1),
+        ('soft', 2),
+    ]
+)
+def test_substratum1_codes(key, label):
+    out = lab.substratum_1_codes(np.full(N_CELLS, key))
+    assert np.all(out == str(label))
+
+
+@pytest.mark.parametrize(
+    'mlws, mhwn',
+    [
+        (None, None),
+        (-1, 1),
+    ]
+)
+def test_depth1_codes(mlws, mhwn):
+    depth = RNG.uniform(-5, 5, N_CELLS)
+    depth[:4] = 2.31, -1.85, 1, -1
+    truth = np.vectorize(lab.depth_1_code)(depth, mlws, mhwn)
+    config = lab.compile_config(mlws=mlws, mhwn=mhwn)
+    npt.assert_array_equal(lab.depth_1_codes(depth, config), truth)
+
+
+def test_hydrodynamics_codes():
+    velocity = RNG.choice([0, .5, .7, 1.], N_CELLS)
+    truth = np.vectorize(lab.hydrodynamics_code)(velocity, CODES_DEPTH_1)
+    npt.assert_array_equal(lab.hydrodynamics_codes(velocity, CODES_DEPTH_1, LABEL_CONFIG), truth)
+
+
+def test_depth2_codes():
+    depth = RNG.choice([0, 10, 20, 30, 40], N_CELLS)
+    inundated = RNG.choice([0, .25, .5, .75, 1], N_CELLS)
+    frequency = RNG.choice([0, 50, 100, 150, 300, 400], N_CELLS)
+    truth = np.vectorize(lab.depth_2_code)(CODES_SUB_1, CODES_DEPTH_1, depth, inundated, frequency)
+    out = lab.depth_2_codes(CODES_SUB_1, CODES_DEPTH_1, depth, inundated, frequency, LABEL_CONFIG)
+    npt.assert_array_equal(out, truth)
+
+
+def test_substratum2_codes():
+    grain_size = RNG.choice([0, 25, 100, 250, 1000, 2000, 3000], N_CELLS)
+    truth = np.vectorize(lab.substratum_2_code)(CODES_SUB_1, CODES_HYDRO, grain_size)
+    npt.assert_array_equal(lab.substratum_2_codes(CODES_SUB_1, CODES_HYDRO, grain_size, LABEL_CONFIG), truth)
+
+
+def test_unknown_codes():
+    values = np.ma.masked_array([1., np.nan, 1.], mask=[True, False, False])
+    npt.assert_array_equal(lab.salinity_codes(values, values, LABEL_CONFIG), ['x', 'x', 'V'])
+    npt.assert_array_equal(lab.depth_1_codes(values, LABEL_CONFIG), ['x', 'x', '2'])
+    npt.assert_array_equal(lab.hydrodynamics_codes(values, ['2', '2', '2'], LABEL_CONFIG), ['x', 'x', '1'])
+    npt.assert_array_equal(
+        lab.depth_2_codes(['2', '1', '2'], ['x', 'x', '2'], 0, values, 0, LABEL_CONFIG), ['x', '', '1']
+    )
+    npt.assert_array_equal(
+        lab.substratum_2_codes(['2', 'x', '1'], ['1', '1', 'x'], None, LABEL_CONFIG), ['x', 'x', 'x']
+    )
+
+
+# tests: packed ecotope-labels
+
+
+@pytest.mark.parametrize(
+    'labels',
+    [
+        ['Z2.222f'],
+        ['Z2.222f', 'Z1.221', 'xx.xxx', 'Bx.113x', 'Z2.222f'],
+        ['V2.314g', 'F1.331', 'Z2.xxxs'],
+    ]
+)
+def test_ecotopes_labels(labels):
+    ecotopes = lab.Ecotopes.from_labels(labels)
+    assert ecotopes.codes.dtype == np.uint16
+    npt.assert_array_equal(ecotopes.labels(), labels)
+    assert list(ecotopes) == labels
+    assert [ecotopes[i] for i in range(len(labels))] == labels
+
+
+def test_ecotopes_characters():
+    characters = [np.array(c) for c in (['Z', 'F'], ['2', '1'], ['1', '3'], ['2', '3'], ['3', ''], ['s', '1'])]
+    ecotopes = lab.Ecotopes.from_characters(*characters)
+    npt.assert_array_equal(ecotopes.labels(), ['Z2.123s', 'F1.331'])
+    for i, c in enumerate(characters):
+        npt.assert_array_equal(ecotopes.characters(i), c)
+
+
+def test_ecotopes_concatenate():
+    ecotopes = lab.Ecotopes.concatenate([lab.Ecotopes.from_labels(['Z2.222f']), lab.Ecotopes.from_labels(['F1.331'])])
+    npt.assert_array_equal(ecotopes.labels(), ['Z2.222f', 'F1.331'])
+    assert ecotopes.label_dictionary == {int(c): l for c, l in zip(ecotopes.codes, ['Z2.222f', 'F1.331'])}
+
+
+def test_ecotopes_counts():
+    ecotopes = lab.Ecotopes.from_labels(['Z2.222f', 'Z1.221', 'Z2.222f'])
+    assert ecotopes.counts() == {'Z2.222f': 2, 'Z1.221': 1}
+
+
+def test_ecotopes_unknown_character():
+    with pytest.raises(ValueError):
+        lab.Ecotopes.from_labels(['Q2.222f'])
+
+
+@pytest.mark.parametrize('label', ['Z2_222f', 'Z2222f', ''])
+def test_ecotopes_separator(label):
+    with pytest.raises(ValueError):
+        lab.Ecotopes.from_labels([label])
+
+
+def test_ecotopes_array():
+    ecotopes = lab.Ecotopes.from_labels(['Z2.222f', 'Z1.221'])
+    npt.assert_array_equal(np.asarray(ecotopes), ['Z2.222f', 'Z1.221'])
+    assert np.asarray(ecotopes, dtype='U10').dtype == 'U10'
+    with pytest.raises(ValueError):
+        np.asarray(ecotopes, copy=False)
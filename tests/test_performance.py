@@ -6,7 +6,10 @@ Author: Gijs G. Hendrickx
 # pylint: disable=locally-disabled, missing-function-docstring, protected-access
 import pytest
 
+import numpy as np
+
 from src import performance as pf
+from src.labelling import Ecotopes
 
 # global variables
 __XY_LABELS_1 = {
@@ -123,3 +126,138 @@ def test_specific_label(out1, out2, level, correct):
 def test_errors(out1, out2, level, label, error):
     with pytest.raises(error):
         comparison_exec(out1, out2, level=level, label=label)
+
+
+@pytest.mark.parametrize(
+    'out1, out2, correct',
+    [
+        (__XY_LABELS_1, __XY_LABELS_2, (3, 1)),
+        (__XY_LABELS_1, __XY_LABELS_3, (3, 1)),
+    ]
+)
+def test_packed_labels(out1, out2, correct):
+    x, y = zip(*out2)
+    out = comparison_exec(out1, (x, y, Ecotopes.from_labels(list(out2.values()))))
+    assert tuple_correct(out) == correct
+
+
+def test_repeated_exec():
+    comp = pf.Comparison(__XY_LABELS_1, __XY_LABELS_2)
+    assert tuple_correct(comp.exec(None)) == (3, 1)
+    assert tuple_correct(comp.exec(4)) == (4, 0)
+    assert tuple_correct(comp.exec(4, specific_label=True)) == (3, 1)
+
+
+def test_partial_overlap():
+    data = {**__XY_LABELS_1, (2, 2): 'Z2.222f'}
+    model = {(1., 1.): 'Z2.221s', (1., 0.): 'Z2.221s', (3., 3.): 'Z2.222f'}
+    out = comparison_exec(data, model)
+    assert out == {(1, 0): False, (1, 1): True}
+
+
+def test_duplicate_coordinates():
+    comp = pf.Comparison(__XY_LABELS_1, ([1, 1], [0, 0], ['Z2.222f', 'Z2.222s']))
+    assert comp.exec(None) == {(1, 0): True}
+
+
+def test_aligned():
+    x, y = zip(*__XY_LABELS_2)
+    comp = pf.Comparison(__XY_LABELS_1, (x[::-1], y[::-1], Ecotopes.from_labels(list(__XY_LABELS_2.values())[::-1])))
+    data, model = comp.aligned
+    assert list(data) == list(__XY_LABELS_1.values())
+    assert list(model) == list(__XY_LABELS_2.values())
+
+
+@pytest.mark.parametrize(
+    'data, model, level, expected',
+    [
+        (['Z2.222f', 'Z1.221'], ['Z2.222f', 'Z1.221'], None, [True, True]),
+        (['Z2.222f', 'Z1.221'], ['Z2.222s', 'Z1.22'], None, [False, False]),
+        (['Z2.222f', 'Z1.221'], ['Z2.222s', 'Z1.22'], 4, [True, True]),
+        (['Z2.222x', 'xx.xxx'], ['Z2.222f', 'Z1.221'], None, [True, True]),
+        (['Z2.222ä'], ['Z2.222ä'], None, [True]),
+    ]
+)
+def test_compare_labels(data, model, level, expected):
+    assert list(pf.compare_labels(data, model, level)) == expected
+
+
+@pytest.mark.parametrize('wild_card', [True, False])
+def test_report(wild_card):
+    comp = pf.Comparison(__XY_LABELS_3, __XY_LABELS_1)
+    report = comp.report(enable_wild_card=wild_card)
+    for level in range(6):
+        assert report.cumulative[level] == n_correct(comp.exec(level + 1, enable_wild_card=wild_card)) / 4
+        out = comp.exec(level, enable_wild_card=wild_card, specific_label=True)
+        assert report.specific[level] == n_correct(out) / 4
+
+
+def test_report_confusion_matrices():
+    report = pf.Comparison(__XY_LABELS_3, __XY_LABELS_1).report()
+    assert len(report.characters) == 6
+    assert list(report.characters[4].classes) == ['1', '2', 'x']
+    assert report.characters[4].matrix.tolist() == [[1, 0, 0], [0, 2, 0], [0, 1, 0]]
+    assert list(report.labels.classes) == ['Z2.221s', 'Z2.222f', 'Z2.222s', 'Z2.22xs']
+    assert report.labels.total == 4
+    assert report.labels.accuracy == .75
+
+
+def test_report_hard_substratum():
+    report = pf.Comparison({(0, 0): 'H2', (1, 0): 'H1'}, {(0, 0): 'H2', (1, 0): 'H2'}).report()
+    assert len(report.cumulative) == len(report.specific) == 6
+    assert list(report.cumulative[:2]) == list(report.specific[:2]) == [1, .5]
+    assert np.all(np.isnan(report.cumulative[2:])) and np.all(np.isnan(report.specific[2:]))
+    assert len(report.characters) == 6
+    assert list(report.characters[2].classes) == ['']
+    assert report.characters[2].matrix.tolist() == [[2]]
+
+
+@pytest.mark.parametrize(
+    'data, model, accuracy, kappa, f1',
+    [
+        ('aabb', 'aabb', 1, 1, [1, 1]),
+        ('aabb', 'abab', .5, 0, [.5, .5]),
+        ('aaab', 'aabb', .75, .5, [.8, 2 / 3]),
+    ]
+)
+def test_confusion_matrix(data, model, accuracy, kappa, f1):
+    cm = pf.confusion_matrix(list(data), list(model))
+    assert cm.accuracy == pytest.approx(accuracy)
+    assert cm.kappa == pytest.approx(kappa)
+    assert list(cm.f1) == pytest.approx(f1)
+    assert cm.macro_f1 == pytest.approx(sum(f1) / 2)
+
+
+def test_confusion_matrix_codes():
+    data, model = np.array([1, 1, 2, 200], dtype=np.uint8), np.array([1, 2, 2, 1], dtype=np.uint8)
+    cm, truth = pf.confusion_matrix(data, model), pf.confusion_matrix(data.astype(int), model.astype(int))
+    assert list(cm.classes) == list(truth.classes) == [1, 2, 200]
+    assert cm.matrix.tolist() == truth.matrix.tolist() == [[1, 1, 0], [0, 1, 0], [1, 0, 0]]
+
+
+@pytest.mark.parametrize(
+    'tolerance, correct',
+    [
+        (None, (1, 0)),
+        (0, (1, 0)),
+        (1e-6, (2, 1)),
+        (1, (3, 1)),
+    ]
+)
+def test_tolerance(tolerance, correct):
+    pytest.importorskip('scipy')
+    model = {(x + 1e-7, y): v for x, y, v in ((*k, v) for k, v in __XY_LABELS_2.items()) if x > 0}
+    model[(0, 0)] = 'Z2.222f'
+    out = pf.Comparison(__XY_LABELS_1, model, tolerance=tolerance).exec(None)
+    assert tuple_correct(out) == correct
+
+
+def test_tolerance_nearest():
+    pytest.importorskip('scipy')
+    comp = pf.Comparison({(0, 0): 'Z2.222f'}, {(.5, 0): 'Z2.221s', (.2, .2): 'Z2.222f'}, tolerance=.5)
+    assert [list(labels) for labels in comp.aligned] == [['Z2.222f'], ['Z2.222f']]
+
+
+def test_tolerance_error():
+    with pytest.raises(ValueError):
+        pf.Comparison(__XY_LABELS_1, __XY_LABELS_2, tolerance=-1)
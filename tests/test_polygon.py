@@ -4,10 +4,19 @@ Tests for `src/performance.py`, polygon and grid handling functions.
 Author: Gijs G. Hendrickx
 """
 # pylint: disable=locally-disabled, missing-function-docstring, protected-access
+import json
+
 import pytest
 from shapely.geometry import Point
 
-from src import performance as pf
+import numpy as np
+import numpy.testing as npt
+
+from src import (
+    export,
+    labelling as lab,
+    performance as pf
+)
 
 # dummy feature
 FEATURE = dict(
@@ -24,6 +33,26 @@ FEATURE = dict(
     )
 )
 
+# dummy feature with hole
+FEATURE_HOLE = dict(
+    geometry=dict(
+        coordinates=[
+            [[0, 0], [0, 10], [10, 10], [10, 0]],
+            [[4, 4], [4, 6], [6, 6], [6, 4]],
+        ]
+    ),
+    properties=dict(
+        zes_code='overig'
+    )
+)
+
+
+@pytest.fixture(name='f_polygons')
+def fixture_f_polygons(tmp_path):
+    file = tmp_path / 'polygons.json'
+    file.write_text(json.dumps(dict(features=[FEATURE_HOLE, FEATURE], totalFeatures=2)))
+    return str(file)
+
 
 # tests
 
@@ -57,3 +86,86 @@ def test_assign_zes_code():
 def test_quick_check(point, length):
     out = pf.points_in_feature(FEATURE, point, quick_check=True)
     assert len(out) == length
+
+
+@pytest.mark.parametrize(
+    'point, label',
+    [
+        (Point(2, 2), 'xx.xxx'),
+        (Point(5, 5), None),
+        (Point(12, 12), None),
+    ]
+)
+def test_point_in_feature_hole(point, label):
+    out = pf.points_in_feature(FEATURE_HOLE, [point])
+    assert out.get((point.x, point.y)) == label
+
+
+@pytest.mark.parametrize('n_cores', [1, 2])
+def test_polygons2grid(f_polygons, n_cores):
+    grid = [(2, 2), (5, 5), (7, 7), (12, 12), (4.5, 4.5)]
+    out = pf.polygons2grid(f_polygons, grid=grid, n_cores=n_cores, executor='threads')
+    assert out == {(2., 2.): 'Z2.222f', (7., 7.): 'xx.xxx', (4.5, 4.5): 'Z2.222f'}
+
+
+def test_polygons2grid_csv(f_polygons, tmp_path):
+    f_grid = tmp_path / 'grid.csv'
+    f_grid.write_text('2,2,a\n5,5,b\n7,7,c\n')
+    out = pf.polygons2grid(f_polygons, f_grid=str(f_grid))
+    assert out == {(2., 2.): 'Z2.222f', (7., 7.): 'xx.xxx'}
+
+
+def test_polygons2grid_error(f_polygons):
+    with pytest.raises(ValueError):
+        pf.polygons2grid(f_polygons)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 100])
+def test_csv2arrays(tmp_path, chunk_size):
+    x, y = np.array([.1, 2 / 3, 1e5]), np.array([-1.5, 1 / 7, 4e5])
+    ecotopes = lab.Ecotopes.from_labels(['Z2.222f', 'Z1.221', 'xx.xxx'])
+    export.export2csv(x, y, ecotopes, file_name=str(tmp_path / 'ecotopes.csv'))
+
+    out = pf.csv2arrays(str(tmp_path / 'ecotopes.csv'), chunk_size=chunk_size)
+    npt.assert_array_equal(out[0], x)
+    npt.assert_array_equal(out[1], y)
+    assert isinstance(out[2], lab.Ecotopes)
+    npt.assert_array_equal(out[2].codes, ecotopes.codes)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 100])
+@pytest.mark.parametrize(
+    'labels',
+    [
+        ['Z2.222f', 'overig', 'Z1.221'],
+        ['Z2.222f', 'Z1.221', 'a-label-of-more-than-sixteen-characters'],
+    ]
+)
+def test_csv2arrays_labels(tmp_path, chunk_size, labels):
+    file = tmp_path / 'grid.csv'
+    file.write_text(''.join(f'{i},{i},{label}\n' for i, label in enumerate(labels)))
+    out = pf.csv2arrays(str(file), chunk_size=chunk_size)
+    assert list(out[2]) == labels
+
+
+def test_csv2arrays_mmap(tmp_path):
+    file = tmp_path / 'grid.csv'
+    file.write_text('1,2,Z2.222f\n3,4,Z1.221')
+    x, y, ecotopes = pf.csv2arrays(str(file), mmap_dir=str(tmp_path / 'mmap'))
+    npt.assert_array_equal(np.load(tmp_path / 'mmap' / 'x.npy', mmap_mode='r'), x)
+    npt.assert_array_equal(y, [2, 4])
+    assert list(ecotopes) == ['Z2.222f', 'Z1.221']
+
+
+def test_csv2grid(tmp_path):
+    file = tmp_path / 'grid.csv'
+    file.write_text('1.5,2,Z2.222f\n3,4,Z1.221\n')
+    assert pf.csv2grid(str(file)) == {(1.5, 2.): 'Z2.222f', (3., 4.): 'Z1.221'}
+
+
+@pytest.mark.parametrize('content', ['1,2\n3,4\n', '1,2,a,b\n'])
+def test_csv2grid_error(tmp_path, content):
+    file = tmp_path / 'grid.csv'
+    file.write_text(content)
+    with pytest.raises(ValueError):
+        pf.csv2grid(str(file))
@@ -8,6 +8,7 @@ import pytest
 
 import numpy as np
 import numpy.testing as npt
+import xarray as xr
 
 from config import config_file
 from src import preprocessing as pre
@@ -74,3 +75,448 @@ def test_grain_size_estimation(shields, chezy, r_density, c_friction, expected):
         np.array([0, 1]), shields=shields, chezy=chezy, r_density=r_density, c_friction=c_friction
     )
     npt.assert_array_almost_equal(out, expected)
+
+
+class TestTimeStatistics:
+    """Tests for `TimeStatistics`, which should reproduce `process_salinity()`, `process_water_depth()`, and
+    `process_velocity()` when the time-series is provided in chunks.
+    """
+
+    @staticmethod
+    def statistics(time_series, time_chunk, time_axis=0, **kwargs):
+        stats = pre.TimeStatistics(time_axis, **kwargs)
+        for i in range(0, time_series.shape[time_axis], time_chunk):
+            stats.update(np.take(time_series, range(i, min(i + time_chunk, time_series.shape[time_axis])), time_axis))
+        return stats
+
+    @pytest.mark.parametrize('time_chunk', [1, 7, 100])
+    def test_mean_std(self, time_chunk):
+        truth = pre.process_salinity(TIME_SERIES)
+        stats = self.statistics(TIME_SERIES, time_chunk)
+        npt.assert_allclose(stats.mean, truth[0])
+        npt.assert_allclose(stats.std, truth[1])
+
+    @pytest.mark.parametrize('time_chunk', [1, 7, 100])
+    def test_mean_std_time_axis(self, time_chunk):
+        truth = pre.process_salinity(TIME_SERIES, time_axis=1)
+        stats = self.statistics(TIME_SERIES, time_chunk, time_axis=1)
+        npt.assert_allclose(stats.mean, truth[0])
+        npt.assert_allclose(stats.std, truth[1])
+
+    @pytest.mark.parametrize('time_chunk', [1, 7, 100])
+    def test_inundation(self, time_chunk):
+        time_series = TIME_SERIES - .5
+        truth = pre.process_water_depth(time_series)
+        stats = self.statistics(time_series, time_chunk, inundation=True)
+        npt.assert_allclose(stats.mean, truth[0])
+        npt.assert_array_equal(stats.duration, truth[1])
+        npt.assert_array_equal(stats.frequency, truth[2])
+
+    @pytest.mark.parametrize('time_chunk', [1, 7, 100])
+    def test_median_max(self, time_chunk):
+        truth = pre.process_velocity(TIME_SERIES)
+        stats = self.statistics(TIME_SERIES, time_chunk, median=True)
+        npt.assert_array_equal(stats.median, truth[0])
+        npt.assert_array_equal(stats.max, truth[1])
+
+    def test_masked(self):
+        time_series = np.ma.masked_array(TIME_SERIES, mask=TIME_SERIES > .9)
+        time_series[:, 0] = np.ma.masked
+        stats = self.statistics(time_series, 7)
+        npt.assert_allclose(stats.mean, np.ma.mean(time_series, axis=0))
+        npt.assert_allclose(stats.std, np.ma.std(time_series, axis=0))
+        npt.assert_array_equal(stats.max, np.ma.max(time_series, axis=0))
+        assert stats.mean.mask[0]
+
+    def test_nan(self):
+        time_series = np.ma.masked_array(TIME_SERIES - .5, mask=TIME_SERIES > .9)
+        time_series[:, 0] = np.ma.masked
+        truth = self.statistics(time_series, 7, inundation=True, median=True)
+        stats = self.statistics(time_series.filled(np.nan), 7, inundation=True, median=True)
+        for statistic in ('mean', 'std', 'max', 'median', 'duration', 'frequency'):
+            out, expected = getattr(stats, statistic), getattr(truth, statistic)
+            npt.assert_array_equal(out, expected)
+            npt.assert_array_equal(np.ma.getmaskarray(out), np.ma.getmaskarray(expected))
+
+    def test_median_masked(self):
+        time_series = np.ma.masked_array(TIME_SERIES, mask=TIME_SERIES > .7)
+        stats = self.statistics(time_series, 7, median=True)
+        npt.assert_array_equal(stats.median, np.ma.median(time_series, axis=0))
+
+    def test_single_precision(self):
+        time_series = (TIME_SERIES + 1e3).astype(np.float32)
+        stats = self.statistics(time_series, 7)
+        assert stats.mean.dtype == stats.std.dtype == np.float64
+        npt.assert_allclose(stats.mean, np.mean(time_series, axis=0, dtype=np.float64), rtol=1e-12)
+        npt.assert_allclose(stats.std, np.std(time_series.astype(float), axis=0), rtol=1e-4)
+
+
+class TestQuantileHistogram:
+    """Tests for `QuantileHistogram`, which should estimate temporal quantiles within the specified resolution."""
+
+    @staticmethod
+    def histogram(time_series, resolution, time_chunk=10):
+        hist = pre.QuantileHistogram(resolution)
+        for i in range(0, len(time_series), time_chunk):
+            hist.update(time_series[i:i + time_chunk])
+        return hist
+
+    @pytest.mark.parametrize('resolution', [.1, .01, .001])
+    @pytest.mark.parametrize('q', [0, .1, .5, .9, 1])
+    def test_quantile(self, resolution, q):
+        hist = self.histogram(TIME_SERIES, resolution)
+        truth = np.quantile(TIME_SERIES, q, axis=0)
+        assert np.all(np.abs(hist.quantile(q) - truth) <= resolution)
+
+    def test_extend_range(self):
+        time_series = TIME_SERIES * np.linspace(-5, 5, len(TIME_SERIES))[:, None]
+        hist = self.histogram(time_series, .01)
+        assert np.all(np.abs(hist.quantile(.5) - np.median(time_series, axis=0)) <= .01)
+
+    def test_masked(self):
+        time_series = np.ma.masked_array(TIME_SERIES, mask=TIME_SERIES > .9)
+        time_series[:, 0] = np.ma.masked
+        out = self.histogram(time_series, .01).quantile(.5)
+        assert out.mask[0]
+        assert np.all(np.abs(out[1:] - np.ma.median(time_series, axis=0)[1:]) <= .01)
+
+    def test_time_statistics(self):
+        stats = pre.TimeStatistics(median=True, resolution=.01).update(TIME_SERIES)
+        assert np.all(np.abs(stats.median - np.median(TIME_SERIES, axis=0)) <= .01)
+
+    @pytest.mark.parametrize('resolution', [0, -1])
+    def test_resolution_error(self, resolution):
+        with pytest.raises(ValueError):
+            pre.QuantileHistogram(resolution)
+
+    @pytest.mark.parametrize('q', [-.1, 1.1])
+    def test_quantile_error(self, q):
+        with pytest.raises(ValueError):
+            self.histogram(TIME_SERIES, .1).quantile(q)
+
+
+class TestVelocityStatistics:
+    """Tests for `VelocityStatistics` and `velocity_magnitude()`, which should reproduce `process_velocity()` of the
+    flow velocity determined from its components.
+    """
+    X_VELOCITY = TIME_SERIES - .5
+    Y_VELOCITY = .5 - TIME_SERIES.T
+
+    @classmethod
+    def statistics(cls, time_chunk, x_velocity=None, y_velocity=None, **kwargs):
+        x_velocity = cls.X_VELOCITY if x_velocity is None else x_velocity
+        y_velocity = cls.Y_VELOCITY if y_velocity is None else y_velocity
+        stats = pre.VelocityStatistics(**kwargs)
+        for i in range(0, len(x_velocity), time_chunk):
+            stats.update(x_velocity[i:i + time_chunk].copy(), y_velocity[i:i + time_chunk].copy())
+        return stats
+
+    @pytest.mark.parametrize('squared', [False, True])
+    def test_velocity_magnitude(self, squared):
+        truth = self.X_VELOCITY ** 2 + self.Y_VELOCITY ** 2
+        out = pre.velocity_magnitude(self.X_VELOCITY.copy(), self.Y_VELOCITY.copy(), squared=squared)
+        npt.assert_array_equal(out, truth if squared else np.sqrt(truth))
+
+    def test_velocity_magnitude_in_place(self):
+        x_velocity, y_velocity = self.X_VELOCITY.copy(), self.Y_VELOCITY.copy()
+        out = pre.velocity_magnitude(x_velocity, y_velocity)
+        assert np.shares_memory(out, x_velocity)
+
+    def test_velocity_magnitude_dtype(self):
+        out = pre.velocity_magnitude(np.array([3, 0]), np.array([4, 1]))
+        npt.assert_array_equal(out, [5., 1.])
+        assert out.dtype == float
+
+    @pytest.mark.parametrize('time_chunk', [1, 7, 100])
+    def test_median_max(self, time_chunk):
+        truth = pre.process_velocity(np.sqrt(self.X_VELOCITY ** 2 + self.Y_VELOCITY ** 2))
+        stats = self.statistics(time_chunk, median=True)
+        npt.assert_array_equal(stats.median, truth[0])
+        npt.assert_array_equal(stats.max, truth[1])
+
+    def test_resolution(self):
+        truth = np.median(np.sqrt(self.X_VELOCITY ** 2 + self.Y_VELOCITY ** 2), axis=0)
+        stats = self.statistics(7, median=True, resolution=.01)
+        assert np.all(np.abs(stats.median - truth) <= .01)
+
+    def test_masked(self):
+        x_velocity = np.ma.masked_array(self.X_VELOCITY, mask=self.X_VELOCITY > .4)
+        x_velocity[:, 0] = np.ma.masked
+        stats = self.statistics(7, x_velocity=x_velocity, median=True)
+        truth = np.ma.sqrt(x_velocity ** 2 + self.Y_VELOCITY ** 2)
+        npt.assert_array_equal(stats.max, np.ma.max(truth, axis=0))
+        npt.assert_array_equal(stats.median, np.ma.median(truth, axis=0))
+        assert stats.max.mask[0] and stats.median.mask[0]
+
+    def test_nan(self):
+        x_velocity = np.ma.masked_array(self.X_VELOCITY, mask=self.X_VELOCITY > .4)
+        x_velocity[:, 0] = np.ma.masked
+        truth = self.statistics(7, x_velocity=x_velocity, median=True)
+        stats = self.statistics(7, x_velocity=x_velocity.filled(np.nan), median=True)
+        npt.assert_array_equal(stats.max, truth.max)
+        npt.assert_array_equal(stats.median, truth.median)
+        assert stats.max.mask[0] and stats.median.mask[0]
+
+    def test_no_median(self):
+        stats = self.statistics(7)
+        with pytest.raises(AssertionError):
+            _ = stats.median
+
+
+@pytest.mark.parametrize(
+    'memory, expected',
+    [
+        (1000, 1000),
+        ('1000', 1000),
+        ('4GB', 4e9),
+        ('1.5 kb', 1500),
+        ('512MiB', 512 * 2 ** 20),
+    ]
+)
+def test_parse_memory(memory, expected):
+    assert pre.parse_memory(memory) == expected
+
+
+@pytest.mark.parametrize('memory', ['4 GBs', 'GB', '-1GB', 0])
+def test_parse_memory_error(memory):
+    with pytest.raises(ValueError):
+        pre.parse_memory(memory)
+
+
+@pytest.fixture(name='map_file')
+def fixture_map_file(tmp_path):
+    file = tmp_path / 'test_map.nc'
+    xr.Dataset({
+        'FlowElem_xcc': (('nFlowElem',), np.arange(100.)),
+        'sa1': (('time', 'nFlowElem'), TIME_SERIES),
+        'ucx': (('time', 'nFlowElem', 'laydim'), np.stack([TIME_SERIES, TIME_SERIES], axis=-1)),
+    }).to_netcdf(file)
+    return file
+
+
+@pytest.mark.parametrize(
+    'max_memory, time_chunk, expected',
+    [
+        (None, None, 100),
+        (None, 30, 30),
+        (100 * 8 * 8 * 10, None, 10),
+        (100 * 8 * 8 * 10, 30, 30),
+        (1, None, 1),
+    ]
+)
+def test_iter_chunks(map_file, max_memory, time_chunk, expected):
+    with pre.MapData(str(map_file), max_memory=max_memory) as data:
+        chunks = list(data.iter_chunks('sa1', time_chunk=time_chunk))
+    assert len(chunks[0]) == expected
+    npt.assert_array_equal(np.ma.concatenate(chunks), TIME_SERIES)
+
+
+def test_iter_chunks_not_masked(map_file):
+    with pre.MapData(str(map_file)) as data:
+        chunks = list(data.iter_chunks('sa1', time_chunk=30, masked=False))
+    assert not any(np.ma.isMaskedArray(c) for c in chunks)
+    npt.assert_array_equal(np.concatenate(chunks), TIME_SERIES)
+
+
+def test_iter_chunks_depth_averaged(map_file):
+    with pre.MapData(str(map_file), max_memory=100 * 8 * 8 * 10) as data:
+        assert data.time_chunk('ucx') == 5
+        chunks = list(data.iter_chunks('ucx'))
+    npt.assert_array_almost_equal(np.ma.concatenate(chunks), TIME_SERIES)
+
+
+def test_dtype(map_file):
+    with pre.MapData(str(map_file), dtype='float32') as data:
+        assert data.get_variable('sa1').dtype == np.float32
+        assert data.get_variable('ucx').dtype == np.float32
+        assert all(c.dtype == np.float32 for c in data.iter_chunks('sa1', 7))
+        assert data.get_variable('FlowElem_xcc').dtype == np.float64
+        npt.assert_array_almost_equal(data.get_variable('sa1'), TIME_SERIES)
+
+
+def test_dtype_error(map_file):
+    with pytest.raises(ValueError):
+        pre.MapData(str(map_file), dtype='int32')
+
+
+@pytest.mark.parametrize(
+    'bbox, roi_polygon, expected',
+    [
+        (None, None, np.arange(100)),
+        ((10, 0, 29.5, 0), None, np.arange(10, 30)),
+        (None, [(10, -1), (29.5, -1), (29.5, 1), (10, 1)], np.arange(10, 30)),
+        ((20, -1, 50, 1), [(10, -1), (29.5, -1), (29.5, 1), (10, 1)], np.arange(20, 30)),
+        ((200, -1, 300, 1), None, np.arange(0)),
+    ]
+)
+@pytest.mark.parametrize('domain', [None, np.arange(100) % 2])
+def test_region_of_interest(tmp_path, bbox, roi_polygon, expected, domain):
+    file = tmp_path / 'test_map.nc'
+    variables = {
+        'FlowElem_xcc': (('nFlowElem',), np.arange(100.)),
+        'FlowElem_ycc': (('nFlowElem',), np.zeros(100)),
+        'sa1': (('time', 'nFlowElem'), TIME_SERIES),
+    }
+    if domain is not None:
+        variables['FlowElemDomain'] = (('nFlowElem',), domain)
+        file = tmp_path / 'test_0001_map.nc'
+        expected = expected[domain[expected] == 1]
+    xr.Dataset(variables).to_netcdf(file)
+
+    with pre.MapData(str(file), map_format='dfm1', bbox=bbox, roi_polygon=roi_polygon, cell_block=(0, 1)) as data:
+        assert data.n_cells == len(expected)
+        npt.assert_array_equal(data.x_coordinates, expected)
+        npt.assert_array_equal(data.get_variable('sa1'), TIME_SERIES[:, expected])
+
+
+@pytest.mark.parametrize(
+    'time_window, time_stride, expected',
+    [
+        (None, None, slice(None)),
+        (None, 1, slice(None)),
+        ((10, 40), None, slice(10, 40)),
+        ((None, 40), 3, slice(None, 40, 3)),
+        ((10, None), 7, slice(10, None, 7)),
+        (('2020-01-01T10:00', '2020-01-02T15:00'), None, slice(10, 40)),
+        (('2020-01-01T10:00', 40), 3, slice(10, 40, 3)),
+        (('2020-01-02', None), None, slice(24, None)),
+    ]
+)
+def test_time_window(tmp_path, time_window, time_stride, expected):
+    file = tmp_path / 'test_map.nc'
+    xr.Dataset(
+        {
+            'FlowElem_xcc': (('nFlowElem',), np.arange(100.)),
+            'sa1': (('time', 'nFlowElem'), TIME_SERIES),
+        },
+        coords={'time': np.arange('2020-01-01T00', '2020-01-05T04', dtype='datetime64[h]')}
+    ).to_netcdf(file)
+
+    with pre.MapData(str(file), time_window=time_window, time_stride=time_stride, max_memory=1) as data:
+        assert (data.i_time is None) == (expected == slice(None))
+        npt.assert_array_equal(data.get_variable('sa1'), TIME_SERIES[expected])
+        npt.assert_array_equal(np.ma.concatenate(list(data.iter_chunks('sa1'))), TIME_SERIES[expected])
+        npt.assert_array_equal(data.get_variable('FlowElem_xcc'), np.arange(100.))
+
+
+@pytest.mark.parametrize(
+    'time_window, time_stride',
+    [
+        ((50, 40), None),
+        (None, 0),
+        (None, 1.5),
+    ]
+)
+def test_time_window_error(map_file, time_window, time_stride):
+    with pre.MapData(str(map_file), time_window=time_window, time_stride=time_stride) as data:
+        with pytest.raises(ValueError):
+            data.get_variable('sa1')
+
+
+@pytest.mark.parametrize(
+    'thickness, expected',
+    [
+        (None, [2, 3]),
+        ([1, 3], [2.5, 3]),
+        ([0, 1], [3, 3]),
+    ]
+)
+def test_depth_average(thickness, expected):
+    data = np.ma.masked_array([[1, 3], [2, 3]], mask=[[False, False], [True, False]])
+    out = pre.depth_average(data, None if thickness is None else np.array(thickness))
+    npt.assert_array_almost_equal(out, expected)
+
+
+def test_depth_average_masked():
+    data = np.ma.masked_array([[1, 3], [2, 3]], mask=[[True, True], [False, False]])
+    out = pre.depth_average(data, np.ones(2))
+    assert out.mask[0] and not out.mask[1]
+
+
+@pytest.mark.parametrize('thickness', [None, [1, 3]])
+def test_depth_average_nan(thickness):
+    data = np.ma.masked_array([[1., 3], [2, 3], [4, 5]], mask=[[False, False], [True, False], [True, True]])
+    thickness = None if thickness is None else np.array(thickness)
+    out = pre.depth_average(data.filled(np.nan), thickness)
+    assert not np.ma.isMaskedArray(out)
+    npt.assert_array_equal(out, pre.depth_average(data, thickness).filled(np.nan))
+
+
+@pytest.mark.parametrize(
+    'variable, dims, values',
+    [
+        ('LayCoord_w', ('wdim',), np.array([-1, -.75, 0])),
+        ('thickness', ('laydim',), np.array([.25, .75])),
+        ('zw', ('time', 'nFlowElem', 'wdim'), np.broadcast_to([-10, -7.5, 0], (100, 100, 3))),
+    ]
+)
+def test_layer_thickness(tmp_path, variable, dims, values):
+    file = tmp_path / 'test_map.nc'
+    xr.Dataset({
+        'FlowElem_xcc': (('nFlowElem',), np.arange(100.)),
+        'ucx': (('time', 'nFlowElem', 'laydim'), np.stack([TIME_SERIES, 2 * TIME_SERIES], axis=-1)),
+        variable: (dims, values),
+    }).to_netcdf(file)
+
+    model_config = {**pre.glob.MODEL_CONFIG, 'layer-thickness': variable}
+    with pre.MapData(str(file), max_memory=100 * 8 * 8 * 10, model_config=model_config) as data:
+        thickness = data.layer_thickness(2, time=slice(0, 5))
+        npt.assert_array_almost_equal(
+            thickness / np.sum(thickness, axis=-1, keepdims=True), np.broadcast_to([.25, .75], thickness.shape)
+        )
+        chunks = list(data.iter_chunks('ucx'))
+        full = data.get_variable('ucx')
+
+    npt.assert_array_almost_equal(np.ma.concatenate(chunks), 1.75 * TIME_SERIES)
+    npt.assert_array_almost_equal(full, 1.75 * TIME_SERIES)
+
+
+def test_layer_thickness_undefined(map_file):
+    with pre.MapData(str(map_file)) as data:
+        assert data.layer_thickness(2) is None
+        npt.assert_array_almost_equal(data.get_variable('ucx'), TIME_SERIES)
+
+
+@pytest.mark.parametrize(
+    'domain, expected',
+    [
+        (np.r_[np.zeros(10), np.ones(90)], slice(10, 100)),
+        (np.arange(100) % 2, np.arange(1, 100, 2)),
+        (np.ones(100), slice(0, 100)),
+    ]
+)
+def test_partition_handler(tmp_path, domain, expected):
+    file = tmp_path / 'test_0001_map.nc'
+    xr.Dataset({
+        'FlowElem_xcc': (('nFlowElem',), np.arange(100.)),
+        'FlowElemDomain': (('nFlowElem',), domain),
+        'sa1': (('time', 'nFlowElem'), TIME_SERIES),
+        'ucx': (('time', 'nFlowElem', 'laydim'), np.stack([TIME_SERIES, TIME_SERIES], axis=-1)),
+    }).to_netcdf(file)
+
+    with pre.MapData(str(file), map_format='dfm1') as data:
+        assert data.i_partition == 1
+        if isinstance(expected, slice):
+            assert data.i_not_ghost == expected
+        else:
+            npt.assert_array_equal(data.i_not_ghost, expected)
+        npt.assert_array_equal(data.get_variable('FlowElem_xcc'), np.arange(100.)[expected])
+        npt.assert_array_equal(np.ma.concatenate(list(data.iter_chunks('sa1', 7))), TIME_SERIES[:, expected])
+        npt.assert_array_almost_equal(data.get_variable('ucx'), TIME_SERIES[:, expected])
+        npt.assert_array_equal(data.partition_handler(TIME_SERIES), TIME_SERIES[:, expected])
+
+
+@pytest.mark.parametrize('n_blocks', [1, 3, 7])
+@pytest.mark.parametrize('domain', [np.ones(100), np.arange(100) % 2])
+def test_cell_blocks(tmp_path, n_blocks, domain):
+    file = tmp_path / 'test_0001_map.nc'
+    xr.Dataset({
+        'FlowElem_xcc': (('nFlowElem',), np.arange(100.)),
+        'FlowElemDomain': (('nFlowElem',), domain),
+    }).to_netcdf(file)
+
+    blocks = []
+    for i in range(n_blocks):
+        with pre.MapData(str(file), map_format='dfm1', cell_block=(i, n_blocks)) as data:
+            blocks.append(data.get_variable('FlowElem_xcc'))
+    npt.assert_array_equal(np.concatenate(blocks), np.flatnonzero(domain == 1))
@@ -9,6 +9,7 @@ import os
 import numpy as np
 import numpy.testing as npt
 import pytest
+import xarray as xr
 
 from src import processing
 
@@ -85,3 +86,131 @@ def test_map_ecotopes():
 
     for i, (x, y) in enumerate(zip(test, expected)):
         npt.assert_array_equal(x, np.array(y, dtype=(str if i == 2 else float)))
+
+
+@pytest.mark.parametrize('n_blocks', [2, 5])
+def test_map_ecotopes_blocks(map_file, n_blocks):
+    kwargs = dict(wd=str(map_file.parent), return_ecotopes='tuple', f_export=False, substratum_1='soft')
+    expected = processing.map_ecotopes(map_file.name, **kwargs)
+    test = processing.map_ecotopes(map_file.name, n_blocks=n_blocks, **kwargs)
+
+    for x, y in zip(test, expected):
+        npt.assert_array_equal(x, y)
+
+
+@pytest.mark.parametrize('executor', ['serial', 'threads', 'processes'])
+def test_map_ecotopes_parallel(map_file, executor):
+    kwargs = dict(wd=str(map_file.parent), return_ecotopes='packed', f_export=False, substratum_1='soft')
+    expected = processing.map_ecotopes(map_file.name, **kwargs)
+    test = processing.map_ecotopes(map_file.name, n_cores=2, n_blocks=3, executor=executor, **kwargs)
+
+    for x, y in zip(test[:2], expected[:2]):
+        npt.assert_array_equal(x, y)
+    npt.assert_array_equal(test[2].codes, expected[2].codes)
+
+
+def test_map_ecotopes_dask(map_file):
+    pytest.importorskip('distributed')
+    kwargs = dict(wd=str(map_file.parent), return_ecotopes='packed', f_export=False, substratum_1='soft')
+    expected = processing.map_ecotopes(map_file.name, **kwargs)
+    test = processing.map_ecotopes(map_file.name, n_cores=2, n_blocks=3, executor='dask', **kwargs)
+
+    for x, y in zip(test[:2], expected[:2]):
+        npt.assert_array_equal(x, y)
+    npt.assert_array_equal(test[2].codes, expected[2].codes)
+
+
+def test_map_ecotopes_globals(map_file, monkeypatch):
+    monkeypatch.setattr(processing.glob, 'LABEL_CONFIG', {})
+    monkeypatch.setattr(processing.glob, 'MODEL_CONFIG', {})
+    kwargs = dict(wd=str(map_file.parent), f_export=False, substratum_1='soft')
+
+    processing.map_ecotopes(map_file.name, n_blocks=4, n_cores=2, executor='threads', **kwargs)
+    processing.extract_model_data(map_file.name, **kwargs)
+    assert processing.glob.LABEL_CONFIG == {}
+    assert processing.glob.MODEL_CONFIG == {}
+
+
+def test_map_ecotopes_cache(map_file, tmp_path):
+    kwargs = dict(wd=str(map_file.parent), return_ecotopes='tuple', f_export=False, substratum_1='soft')
+    cache = str(tmp_path / 'cache')
+    expected = processing.map_ecotopes(map_file.name, **kwargs)
+    processing.map_ecotopes(map_file.name, cache=cache, **kwargs)
+    assert len(os.listdir(cache)) == 1
+
+    test = processing.map_ecotopes(map_file.name, cache=cache, mlws=-1, mhwn=1, **kwargs)
+    assert len(os.listdir(cache)) == 1
+    assert not np.array_equal(test[2], expected[2])
+
+    test = processing.map_ecotopes(map_file.name, cache=cache, **kwargs)
+    for x, y in zip(test, expected):
+        npt.assert_array_equal(x, y)
+
+
+def test_map_ecotopes_cache_blocks(map_file, tmp_path, monkeypatch):
+    kwargs = dict(wd=str(map_file.parent), return_ecotopes='tuple', f_export=False, cache=str(tmp_path / 'cache'))
+    expected = processing.map_ecotopes(map_file.name, n_blocks=2, **kwargs)
+
+    # cached model data: map-file is not opened, not even to count its grid cells
+    monkeypatch.setattr(processing.pre, 'MapData', None)
+    test = processing.map_ecotopes(map_file.name, n_blocks=2, **kwargs)
+    for x, y in zip(test, expected):
+        npt.assert_array_equal(x, y)
+
+
+def test_map_ecotopes_time_window(map_file):
+    kwargs = dict(wd=str(map_file.parent), return_ecotopes='tuple', f_export=False, substratum_1='soft')
+    with xr.open_dataset(map_file) as ds:
+        ds.isel(time=slice(10, 40, 3)).to_netcdf(map_file.parent / 'test_window_map.nc')
+    expected = processing.map_ecotopes('test_window_map.nc', **kwargs)
+    test = processing.map_ecotopes(map_file.name, time_window=(10, 40), time_stride=3, n_blocks=2, **kwargs)
+
+    for x, y in zip(test, expected):
+        npt.assert_array_equal(x, y)
+
+
+@pytest.mark.parametrize('n_blocks', [1, 2])
+def test_map_ecotopes_region(map_file, split_map_files, n_blocks):
+    kwargs = dict(wd=str(map_file.parent), return_ecotopes='tuple', f_export=False, substratum_1='soft')
+    files = split_map_files
+    bbox = 0, 0, 400, 1e3
+    polygon = [(0, 0), (400, 0), (0, 1e3)]
+
+    x, y, labels = processing.map_ecotopes(*files, **kwargs)
+    for region in (dict(bbox=bbox), dict(roi_polygon=polygon)):
+        test = processing.map_ecotopes(*files, n_blocks=n_blocks, **region, **kwargs)
+        select = x <= 400 if 'bbox' in region else x / 400 + y / 1e3 <= 1
+        for t, e in zip(test, (x, y, labels)):
+            npt.assert_array_equal(t, e[select])
+
+    with pytest.raises(ValueError):
+        processing.map_ecotopes(*files, bbox=(-10, -10, -1, -1), **kwargs)
+
+
+@pytest.mark.parametrize('kwargs', [dict(), dict(n_blocks=2, time_chunk=7), dict(median_resolution=.001)])
+def test_map_ecotopes_float32(map_file, kwargs):
+    kwargs = dict(wd=str(map_file.parent), return_ecotopes='tuple', f_export=False, substratum_1='soft', **kwargs)
+    expected = processing.map_ecotopes(map_file.name, **kwargs)
+    test = processing.map_ecotopes(map_file.name, dtype='float32', **kwargs)
+
+    for x, y in zip(test, expected):
+        npt.assert_array_equal(x, y)
+
+
+def test_map_scenarios(map_file):
+    kwargs = dict(wd=str(map_file.parent), substratum_1='soft')
+    scenarios = [dict(), dict(mlws=-1, mhwn=1), dict(friction_coefficient=500), dict(substratum_1='hard')]
+    x, y, ecotopes, counts = processing.map_scenarios(map_file.name, scenarios=scenarios, **kwargs)
+    assert ecotopes.codes.shape == (len(scenarios), len(x))
+
+    for scenario, codes, count in zip(scenarios, ecotopes.codes, counts):
+        expected = processing.map_ecotopes(map_file.name, return_ecotopes='packed', **{**kwargs, **scenario})
+        npt.assert_array_equal(x, expected[0])
+        npt.assert_array_equal(y, expected[1])
+        npt.assert_array_equal(codes, expected[2].codes)
+        assert count == expected[2].counts()
+
+
+def test_map_scenarios_unknown_key(map_file):
+    with pytest.raises(ValueError):
+        processing.map_scenarios(map_file.name, scenarios=[dict(time_axis=1)], wd=str(map_file.parent))
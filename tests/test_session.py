@@ -0,0 +1,70 @@
+"""
+Tests for `src/session.py`.
+
+Author: Gijs G. Hendrickx
+"""
+# pylint: disable=locally-disabled, missing-function-docstring
+import pytest
+
+import numpy as np
+import numpy.testing as npt
+
+from config import config_file
+from src import labelling as lab
+from src import session as se
+
+# setting configuration
+CONFIG = config_file.load_config('emma.json')
+
+# dummy model data
+RNG = np.random.default_rng(0)
+N_CELLS = 1000
+MODEL_DATA = {
+    'mean_salinity': RNG.uniform(0, 35, N_CELLS),
+    'std_salinity': RNG.uniform(0, 5, N_CELLS),
+    'mean_depth': RNG.uniform(-5, 20, N_CELLS),
+    'duration': RNG.uniform(0, 1, N_CELLS),
+    'frequency': RNG.uniform(0, 400, N_CELLS),
+    'max_velocity': RNG.uniform(0, 2, N_CELLS),
+}
+GRAIN_SIZES = RNG.uniform(0, 3000, N_CELLS)
+
+
+def relabel(config, substratum_1='soft', grain_sizes=GRAIN_SIZES):
+    return se.LabellingSession(MODEL_DATA, config, substratum_1=substratum_1, grain_sizes=grain_sizes).ecotopes
+
+
+@pytest.mark.parametrize(
+    'config, expected',
+    [
+        (lab.compile_config(CONFIG), set()),
+        (lab.compile_config({**CONFIG, 'substratum-2': {'soft': {'silt': 25, 'fines': 250, 'sand': 1000}}}), {5}),
+        (lab.compile_config(CONFIG, mlws=-1, mhwn=1), {2, 3, 4, 5}),
+        (lab.compile_config({**CONFIG, 'salinity': {'variable': 2, 'fresh': 5.4, 'marine': 18}}), {0}),
+    ]
+)
+def test_update_config(config, expected):
+    session = se.LabellingSession(MODEL_DATA, lab.compile_config(CONFIG), substratum_1='soft', grain_sizes=GRAIN_SIZES)
+    assert session.update(config) == expected
+    npt.assert_array_equal(session.ecotopes.codes, relabel(config).codes)
+
+
+@pytest.mark.parametrize(
+    'kwargs, expected',
+    [
+        (dict(substratum_1='soft'), set()),
+        (dict(substratum_1='hard'), {1, 4, 5}),
+        (dict(grain_sizes=GRAIN_SIZES / 2), {5}),
+    ]
+)
+def test_update_settings(kwargs, expected):
+    session = se.LabellingSession(MODEL_DATA, lab.compile_config(CONFIG), substratum_1='soft', grain_sizes=GRAIN_SIZES)
+    assert session.update(**kwargs) == expected
+    ecotopes = relabel(lab.compile_config(CONFIG), **{'substratum_1': 'soft', 'grain_sizes': GRAIN_SIZES, **kwargs})
+    npt.assert_array_equal(session.ecotopes.codes, ecotopes.codes)
+
+
+def test_characters():
+    session = se.LabellingSession(MODEL_DATA, lab.compile_config(CONFIG), substratum_1='soft', grain_sizes=GRAIN_SIZES)
+    for i in range(6):
+        npt.assert_array_equal(session.characters(i), session.ecotopes.characters(i))